@@ -107,6 +107,11 @@ JWT_SECRET = env("JWT_SECRET", default=SECRET_KEY)
 JWT_ALGORITHM = "HS256"
 JWT_ACCESS_TTL_SECONDS = env("JWT_ACCESS_TTL_SECONDS")
 JWT_REFRESH_TTL_SECONDS = env("JWT_REFRESH_TTL_SECONDS")
+JWT_PRINCIPAL_CACHE_TTL_SECONDS = env.float("JWT_PRINCIPAL_CACHE_TTL_SECONDS", default=30.0)
+JWT_PRINCIPAL_CACHE_MAX_ENTRIES = env.int("JWT_PRINCIPAL_CACHE_MAX_ENTRIES", default=10_000)
+JWT_VERIFY_TRUST_CLAIMS = env.bool("JWT_VERIFY_TRUST_CLAIMS", default=True)
+JWT_REVOCATION_REFRESH_SECONDS = env.float("JWT_REVOCATION_REFRESH_SECONDS", default=2.0)
+JWT_REVOCATION_OVERLAP_SECONDS = env.float("JWT_REVOCATION_OVERLAP_SECONDS", default=30.0)
 
 JWT_COOKIE_SECURE = env.bool("JWT_COOKIE_SECURE", default=False)
 JWT_COOKIE_SAMESITE = env("JWT_COOKIE_SAMESITE", default="Lax")
@@ -122,4 +127,25 @@ else:
     CORS_ALLOWED_ORIGINS = env.list("CORS_ALLOWED_ORIGINS", default=[])
 
 
-CSRF_TRUSTED_ORIGINS = env.list("CSRF_TRUSTED_ORIGINS", default=[])
\ No newline at end of file
+CSRF_TRUSTED_ORIGINS = env.list("CSRF_TRUSTED_ORIGINS", default=[])
+
+# Team5 recommendation worker warmup (see team5/services/warmup.py).
+TEAM5_WARMUP_ON_STARTUP = env.bool("TEAM5_WARMUP_ON_STARTUP", default=False)
+TEAM5_WARMUP_BUDGET_SECONDS = env.float("TEAM5_WARMUP_BUDGET_SECONDS", default=30.0)
+TEAM5_MODEL_ARTIFACT_DIR = env("TEAM5_MODEL_ARTIFACT_DIR", default="")
+TEAM5_COMMENT_SENTIMENT_WORKERS = env.int("TEAM5_COMMENT_SENTIMENT_WORKERS", default=2)
+TEAM5_FEEDBACK_BATCH_SIZE = env.int("TEAM5_FEEDBACK_BATCH_SIZE", default=200)
+TEAM5_FEEDBACK_FLUSH_SECONDS = env.float("TEAM5_FEEDBACK_FLUSH_SECONDS", default=1.0)
+TEAM5_FEEDBACK_SHUTDOWN_SECONDS = env.float("TEAM5_FEEDBACK_SHUTDOWN_SECONDS", default=10.0)
+TEAM5_FEEDBACK_ARCHIVE_DIR = env("TEAM5_FEEDBACK_ARCHIVE_DIR", default="")
+TEAM5_FEEDBACK_RETENTION_DAYS = env.int("TEAM5_FEEDBACK_RETENTION_DAYS", default=90)
+TEAM5_GEOIP_DATABASE = env("TEAM5_GEOIP_DATABASE", default="")
+TEAM5_GEO_CACHE_PATH = env("TEAM5_GEO_CACHE_PATH", default="")
+TEAM5_GEO_CACHE_TTL_SECONDS = env.float("TEAM5_GEO_CACHE_TTL_SECONDS", default=24 * 3600.0)
+TEAM5_GEO_CACHE_NEGATIVE_TTL_SECONDS = env.float("TEAM5_GEO_CACHE_NEGATIVE_TTL_SECONDS", default=600.0)
+TEAM5_GUNICORN_BIND = env("TEAM5_GUNICORN_BIND", default="0.0.0.0:8000")
+TEAM5_GUNICORN_WORKERS = env.int("TEAM5_GUNICORN_WORKERS", default=0)
+TEAM5_GUNICORN_THREADS = env.int("TEAM5_GUNICORN_THREADS", default=4)
+TEAM5_GUNICORN_TIMEOUT = env.int("TEAM5_GUNICORN_TIMEOUT", default=60)
+TEAM5_GUNICORN_MAX_REQUESTS = env.int("TEAM5_GUNICORN_MAX_REQUESTS", default=0)
+TEAM5_GUNICORN_PRELOAD = env.bool("TEAM5_GUNICORN_PRELOAD", default=True)
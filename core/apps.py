@@ -4,3 +4,16 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.contrib.auth import get_user_model
+        from django.db.models.signals import post_delete, post_save, pre_save
+
+        from core.principal_cache import invalidate_user
+        from core.revocations import record_revocation, remember_revocation_fields
+
+        user_model = get_user_model()
+        post_save.connect(invalidate_user, sender=user_model, dispatch_uid="core_principal_cache_save")
+        post_delete.connect(invalidate_user, sender=user_model, dispatch_uid="core_principal_cache_delete")
+        pre_save.connect(remember_revocation_fields, sender=user_model, dispatch_uid="core_token_revocation_stored")
+        post_save.connect(record_revocation, sender=user_model, dispatch_uid="core_token_revocation")
@@ -7,11 +7,18 @@ def _now() -> int:
     return int(time.time())
 
 
+# Profile claims let /api/auth/verify/ answer without loading the user.
+PROFILE_CLAIMS = ("email", "first_name", "last_name", "age")
+
+
 def create_access_token(user) -> str:
     payload = {
         "type": "access",
         "sub": str(user.id),
         "email": user.email,
+        "first_name": user.first_name or "",
+        "last_name": user.last_name or "",
+        "age": user.age,
         "tv": user.token_version,
         "iat": _now(),
         "exp": _now() + settings.JWT_ACCESS_TTL_SECONDS,
@@ -32,3 +39,13 @@ def create_refresh_token(user) -> str:
 
 def decode_token(token: str) -> dict:
     return jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+
+
+def get_request_token(request) -> str | None:
+    """Access token from the ``access_token`` cookie or an ``Authorization: Bearer`` header."""
+    token = request.COOKIES.get("access_token")
+    if not token:
+        auth = request.headers.get("Authorization", "")
+        if auth.startswith("Bearer "):
+            token = auth.split(" ", 1)[1].strip()
+    return token or None
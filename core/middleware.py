@@ -1,45 +1,38 @@
-from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
 from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
 from jwt import ExpiredSignatureError, InvalidTokenError
 
-from core.jwt_utils import decode_token
-
-User = get_user_model()
+from core.jwt_utils import decode_token, get_request_token
+from core.principal_cache import principal_cache
 
 
 class JWTAuthenticationMiddleware(MiddlewareMixin):
     """
     If a valid access_token cookie (or Authorization header) exists, set request.user accordingly.
+    The user is loaded on first access, so views that only need the token claims
+    (e.g. /api/auth/verify/) never touch the database.
     """
 
     def process_request(self, request):
         if hasattr(request, "user") and getattr(request.user, "is_authenticated", False):
             return
 
-        token = request.COOKIES.get("access_token")
-        if not token:
-            auth = request.headers.get("Authorization", "")
-            if auth.startswith("Bearer "):
-                token = auth.split(" ", 1)[1].strip()
-
+        token = get_request_token(request)
         if not token:
             return
 
         try:
             payload = decode_token(token)
-            if payload.get("type") != "access":
-                return
-
-            user_id = payload.get("sub")
-            tv = payload.get("tv")
-            user = User.objects.filter(id=user_id, is_active=True).first()
-            if not user:
-                return
-
-            if user.token_version != tv:
-                return
-
-            request.user = user
-            request.jwt_payload = payload
         except (ExpiredSignatureError, InvalidTokenError):
             return
+        if payload.get("type") != "access":
+            return
+
+        user_id = payload.get("sub")
+        tv = payload.get("tv")
+        fallback = getattr(request, "user", None) or AnonymousUser()
+        # Signature-checked claims; whether the token is still accepted is decided by request.user.
+        request.jwt_payload = payload
+        # Cached for a few seconds; None for inactive users or a stale token_version.
+        request.user = SimpleLazyObject(lambda: principal_cache.get_user(user_id, tv) or fallback)
@@ -50,3 +50,14 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     def __str__(self):
         return self.email
+
+
+class TokenRevocation(models.Model):
+    """Append-only log: tokens of ``user_id`` with a lower ``tv`` claim than ``min_token_version`` are revoked."""
+
+    user_id = models.UUIDField()
+    min_token_version = models.PositiveIntegerField()
+    revoked_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.user_id} < v{self.min_token_version}"
@@ -0,0 +1,98 @@
+"""Short-lived in-process cache of the users behind access tokens.
+
+``JWTAuthenticationMiddleware`` would otherwise load the user row on every
+authenticated request. Entries are keyed by user id and only answer tokens
+carrying the cached ``token_version``. Every save or delete of a user in this
+process drops its entry (logout bumps ``token_version``, deactivation flips
+``is_active``); changes made by other processes are picked up after the TTL.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+DEFAULT_TTL_SECONDS = 30.0
+DEFAULT_MAX_ENTRIES = 10_000
+
+
+class PrincipalCache:
+    def __init__(self, *, max_entries=DEFAULT_MAX_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        # user id -> (expires_at, token_version, field values)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_user(self, user_id, token_version):
+        """Active user ``user_id`` whose ``token_version`` matches, or None."""
+        User = get_user_model()
+        key = str(user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now and entry[1] == token_version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                values = entry[2]
+            else:
+                self.misses += 1
+                values = None
+        if values is not None:
+            # A fresh instance per request, so a view mutating request.user cannot touch the cache.
+            return User.from_db("default", self._field_names(), values)
+
+        user = User.objects.filter(id=user_id, is_active=True).first()
+        if user is None or user.token_version != token_version:
+            return None
+        values = tuple(getattr(user, field) for field in self._field_names())
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, user.token_version, values)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return user
+
+    def invalidate(self, user_id):
+        with self._lock:
+            if self._entries.pop(str(user_id), None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "ttlSeconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    @staticmethod
+    def _field_names():
+        return [field.attname for field in get_user_model()._meta.concrete_fields]
+
+
+principal_cache = PrincipalCache(
+    max_entries=getattr(settings, "JWT_PRINCIPAL_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES),
+    ttl_seconds=getattr(settings, "JWT_PRINCIPAL_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS),
+)
+
+
+def invalidate_user(sender, instance, **kwargs):
+    principal_cache.invalidate(instance.pk)
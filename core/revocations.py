@@ -0,0 +1,158 @@
+"""In-memory view of the token revocation log for DB-free access token checks.
+
+Logout and deactivation append a ``TokenRevocation`` row; every worker keeps the
+highest ``min_token_version`` per user and pulls the log at most once per
+``JWT_REVOCATION_REFRESH_SECONDS``. Each refresh re-reads rows revoked up to
+``overlap_seconds`` before the previous one: with concurrent transactions a row
+with a lower id can commit after a higher one was read, so an id watermark
+would skip it for good. Rows already applied are recognised by id. Rows older
+than the access token lifetime can no longer revoke a live token and are not kept.
+"""
+
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import TokenRevocation
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REFRESH_SECONDS = 2.0
+DEFAULT_OVERLAP_SECONDS = 30.0
+
+
+class RevocationTable:
+    def __init__(self, *, refresh_seconds=DEFAULT_REFRESH_SECONDS, overlap_seconds=DEFAULT_OVERLAP_SECONDS):
+        self.refresh_seconds = float(refresh_seconds)
+        self.overlap_seconds = max(float(overlap_seconds), self.refresh_seconds)
+        # user id -> (min token version, revoked_at)
+        self._min_versions = {}
+        # ids of rows inside the overlap window that were already applied -> revoked_at
+        self._seen_ids = {}
+        self._last_refresh_at = None
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def is_revoked(self, user_id, token_version):
+        self._maybe_refresh()
+        entry = self._min_versions.get(str(user_id))
+        return entry is not None and token_version < entry[0]
+
+    def note(self, user_id, min_token_version):
+        """Apply a revocation made by this process without waiting for the next refresh."""
+        with self._lock:
+            key = str(user_id)
+            previous = self._min_versions.get(key)
+            if previous is None or min_token_version >= previous[0]:
+                self._min_versions[key] = (min_token_version, timezone.now())
+
+    def refresh(self):
+        """Pull new log rows now (normally done lazily by ``is_revoked``)."""
+        with self._lock:
+            self._refresh()
+
+    def reset(self):
+        with self._lock:
+            self._min_versions = {}
+            self._seen_ids = {}
+            self._last_refresh_at = None
+            self._next_refresh = 0.0
+
+    def stats(self):
+        return {
+            "users": len(self._min_versions),
+            "windowRows": len(self._seen_ids),
+            "refreshSeconds": self.refresh_seconds,
+            "overlapSeconds": self.overlap_seconds,
+            "refreshes": self.refreshes,
+            "refreshErrors": self.refresh_errors,
+        }
+
+    def _maybe_refresh(self):
+        if time.monotonic() < self._next_refresh:
+            return
+        # One thread refreshes; the others keep answering from the current table.
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            if time.monotonic() >= self._next_refresh:
+                self._refresh()
+        finally:
+            self._lock.release()
+
+    def _refresh(self):
+        now = timezone.now()
+        cutoff = now - timedelta(seconds=settings.JWT_ACCESS_TTL_SECONDS)
+        since = cutoff
+        if self._last_refresh_at is not None:
+            since = max(cutoff, self._last_refresh_at - timedelta(seconds=self.overlap_seconds))
+        try:
+            rows = list(
+                TokenRevocation.objects.filter(revoked_at__gte=since)
+                .order_by("id")
+                .values_list("id", "user_id", "min_token_version", "revoked_at")
+            )
+        except DatabaseError:
+            self.refresh_errors += 1
+            logger.warning("token revocation refresh failed; serving the previous table", exc_info=True)
+            self._next_refresh = time.monotonic() + self.refresh_seconds
+            return
+
+        min_versions = {key: entry for key, entry in self._min_versions.items() if entry[1] >= cutoff}
+        seen_ids = {row_id: revoked_at for row_id, revoked_at in self._seen_ids.items() if revoked_at >= since}
+        for row_id, user_id, min_version, revoked_at in rows:
+            if row_id in seen_ids:
+                continue
+            seen_ids[row_id] = revoked_at
+            key = str(user_id)
+            previous = min_versions.get(key)
+            if previous is None or min_version >= previous[0]:
+                min_versions[key] = (min_version, revoked_at)
+        self._min_versions = min_versions
+        self._seen_ids = seen_ids
+        self._last_refresh_at = now
+        self.refreshes += 1
+        self._next_refresh = time.monotonic() + self.refresh_seconds
+
+
+revocation_table = RevocationTable(
+    refresh_seconds=getattr(settings, "JWT_REVOCATION_REFRESH_SECONDS", DEFAULT_REFRESH_SECONDS),
+    overlap_seconds=getattr(settings, "JWT_REVOCATION_OVERLAP_SECONDS", DEFAULT_OVERLAP_SECONDS),
+)
+
+
+def remember_revocation_fields(sender, instance, raw=False, update_fields=None, **kwargs):
+    """``pre_save`` receiver: keep the stored ``token_version``/``is_active`` for ``record_revocation``."""
+    instance.__dict__.pop("_stored_revocation_fields", None)
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not {"token_version", "is_active"} & set(update_fields):
+        return
+    instance._stored_revocation_fields = (
+        sender.objects.filter(pk=instance.pk).values_list("token_version", "is_active").first()
+    )
+
+
+def record_revocation(sender, instance, created=False, update_fields=None, **kwargs):
+    """``post_save`` receiver: log the versions a logout or deactivation made invalid."""
+    stored = instance.__dict__.pop("_stored_revocation_fields", None)
+    if created or stored is None:
+        return
+    stored_version, stored_active = stored
+    deactivated = stored_active and not instance.is_active
+    if not deactivated and instance.token_version == stored_version:
+        return
+    if deactivated:
+        # Deactivation revokes every issued token; after reactivation new tokens carry the bumped version.
+        sender.objects.filter(pk=instance.pk).update(token_version=F("token_version") + 1)
+        instance.token_version = sender.objects.filter(pk=instance.pk).values_list("token_version", flat=True).get()
+    TokenRevocation.objects.create(user_id=instance.pk, min_token_version=instance.token_version)
+    revocation_table.note(instance.pk, instance.token_version)
@@ -1,5 +1,14 @@
+import uuid
+from datetime import timedelta
+
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from core.jwt_utils import create_access_token
+from core.models import TokenRevocation
+from core.principal_cache import principal_cache
+from core.revocations import RevocationTable, revocation_table
 
 User = get_user_model()
 
@@ -22,3 +31,92 @@ class AuthFlowTests(TestCase):
         # logout
         res3 = self.client.post("/api/auth/logout/", data="{}", content_type="application/json")
         self.assertEqual(res3.status_code, 200)
+
+
+class PrincipalCacheTests(TestCase):
+    def setUp(self):
+        principal_cache.clear()
+        self.user = User.objects.create_user(email="cached@test.com", password="pass1234")
+        self.client.cookies["access_token"] = create_access_token(self.user)
+
+    def test_authenticated_requests_reuse_the_cached_user(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get("/api/auth/me/").status_code, 200)
+        with self.assertNumQueries(0):
+            res = self.client.get("/api/auth/me/")
+        self.assertEqual(res.json()["user"]["email"], "cached@test.com")
+        self.assertEqual(principal_cache.stats()["hits"], 1)
+
+    def test_logout_and_deactivation_invalidate_the_entry(self):
+        self.assertEqual(self.client.get("/api/auth/me/").status_code, 200)
+        self.assertEqual(self.client.post("/api/auth/logout/").status_code, 200)
+        self.client.cookies["access_token"] = create_access_token(self.user)
+        self.assertEqual(self.client.get("/api/auth/me/").status_code, 401)
+
+        self.user.refresh_from_db()
+        self.client.cookies["access_token"] = create_access_token(self.user)
+        self.assertEqual(self.client.get("/api/auth/me/").status_code, 200)
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+        self.assertEqual(self.client.get("/api/auth/me/").status_code, 401)
+        self.assertGreaterEqual(principal_cache.stats()["invalidations"], 2)
+
+
+class VerifyFastPathTests(TestCase):
+    def setUp(self):
+        principal_cache.clear()
+        revocation_table.reset()
+        self.user = User.objects.create_user(email="gateway@test.com", password="pass1234", first_name="Sara", age=30)
+        self.client.cookies["access_token"] = create_access_token(self.user)
+
+    def test_verify_answers_from_token_claims_without_queries(self):
+        revocation_table.refresh()
+        with self.assertNumQueries(0):
+            res = self.client.get("/api/auth/verify/")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["X-User-Id"], str(self.user.id))
+        self.assertEqual(res["X-User-First-Name"], "Sara")
+        self.assertEqual(res["X-User-Age"], "30")
+
+    def test_logout_and_deactivation_are_revoked(self):
+        self.assertEqual(self.client.post("/api/auth/logout/").status_code, 200)
+        self.client.cookies["access_token"] = create_access_token(User(id=self.user.id, email=self.user.email))
+        self.assertEqual(self.client.get("/api/auth/verify/").status_code, 401)
+
+        self.user.refresh_from_db()
+        self.client.cookies["access_token"] = create_access_token(self.user)
+        self.assertEqual(self.client.get("/api/auth/verify/").status_code, 200)
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+        self.assertEqual(self.client.get("/api/auth/verify/").status_code, 401)
+
+        # Another worker only learns about revocations from the log.
+        revocation_table.reset()
+        self.assertEqual(self.client.get("/api/auth/verify/").status_code, 401)
+
+    def test_only_changed_version_or_deactivation_is_logged(self):
+        self.user.first_name = "Sarah"
+        self.user.save()
+        self.assertFalse(TokenRevocation.objects.exists())
+
+        self.user.is_active = False
+        self.user.save()
+        self.user.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.token_version, 1)
+        self.assertEqual(list(TokenRevocation.objects.values_list("min_token_version", flat=True)), [1])
+
+    def test_refresh_picks_up_rows_committed_out_of_id_order(self):
+        table = RevocationTable(refresh_seconds=0)
+        TokenRevocation.objects.create(id=100, user_id=uuid.uuid4(), min_token_version=1)
+        table.refresh()
+        # A transaction that took id 50 (and its revoked_at) earlier commits only now.
+        TokenRevocation.objects.create(
+            id=50, user_id=self.user.id, min_token_version=5, revoked_at=timezone.now() - timedelta(seconds=5)
+        )
+
+        table.refresh()
+        self.assertTrue(table.is_revoked(self.user.id, 4))
+        self.assertFalse(table.is_revoked(self.user.id, 5))
+        table.refresh()
+        self.assertEqual(table.stats()["windowRows"], 2)
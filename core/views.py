@@ -1,4 +1,5 @@
 import json
+from django.conf import settings
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_exempt
@@ -7,8 +8,9 @@ from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
 from django.contrib.auth.password_validation import validate_password
 
-from core.jwt_utils import create_access_token, create_refresh_token, decode_token
+from core.jwt_utils import PROFILE_CLAIMS, create_access_token, create_refresh_token, decode_token
 from core.auth import api_login_required
+from core.revocations import revocation_table
 
 User = get_user_model()
 
@@ -189,13 +191,34 @@ def me(request):
     return JsonResponse({"ok": True, "user": {"email": u.email, "first_name": u.first_name, "last_name": u.last_name, "age": u.age}})
 
 
-@api_login_required
 def verify(request):
+    # Gateway auth check: tokens carrying profile claims are answered from the signed claims
+    # and the in-memory revocation table, without a database query.
+    payload = getattr(request, "jwt_payload", None)
+    if payload and getattr(settings, "JWT_VERIFY_TRUST_CLAIMS", True) and all(c in payload for c in PROFILE_CLAIMS):
+        if revocation_table.is_revoked(payload["sub"], payload.get("tv")):
+            return JsonResponse({"detail": "Authentication required"}, status=401)
+        return _verify_response(
+            user_id=payload["sub"],
+            email=payload["email"],
+            first_name=payload["first_name"],
+            last_name=payload["last_name"],
+            age=payload["age"],
+        )
+    return _verify_from_user(request)
+
+
+@api_login_required
+def _verify_from_user(request):
     u = request.user
+    return _verify_response(user_id=u.id, email=u.email, first_name=u.first_name, last_name=u.last_name, age=u.age)
+
+
+def _verify_response(*, user_id, email, first_name, last_name, age):
     resp = JsonResponse({"ok": True})
-    resp["X-User-Id"] = str(u.id)
-    resp["X-User-Email"] = u.email
-    resp["X-User-First-Name"] = u.first_name or ""
-    resp["X-User-Last-Name"] = u.last_name or ""
-    resp["X-User-Age"] = str(u.age or "")
+    resp["X-User-Id"] = str(user_id)
+    resp["X-User-Email"] = email
+    resp["X-User-First-Name"] = first_name or ""
+    resp["X-User-Last-Name"] = last_name or ""
+    resp["X-User-Age"] = str(age or "")
     return resp
@@ -1,6 +1,35 @@
+import os
+import sys
+from pathlib import Path
+
 from django.apps import AppConfig
+from django.conf import settings
+
+# Set by team5/gunicorn.conf.py when the gunicorn master preloads the app: the master
+# then warms up synchronously right before forking, so no warmup thread is started here.
+PRELOAD_WARMUP_ENV = "TEAM5_PRELOAD_WARMUP"
 
 
 class Team5Config(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'team5'
+
+    def ready(self):
+        if not getattr(settings, "TEAM5_WARMUP_ON_STARTUP", False) or not _is_serving_process():
+            return
+        if os.environ.get(PRELOAD_WARMUP_ENV) == "1":
+            return
+        from .services.warmup import start_warmup
+        from .views import recommendation_service
+
+        start_warmup(recommendation_service)
+
+
+def _is_serving_process() -> bool:
+    """Skip warmup for management commands and runserver's autoreload parent."""
+    argv = sys.argv
+    if Path(argv[0]).name not in {"manage.py", "django-admin"}:
+        return True
+    if len(argv) < 2 or argv[1] != "runserver":
+        return False
+    return os.environ.get("RUN_MAIN") == "true" or "--noreload" in argv
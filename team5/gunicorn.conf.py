@@ -0,0 +1,72 @@
+"""Gunicorn settings for serving the project in production.
+
+Run with ``python manage.py serve_team5`` or
+``gunicorn -c team5/gunicorn.conf.py``. With ``TEAM5_GUNICORN_PRELOAD`` (the
+default) the master imports the app, runs the team5 warmup once and only then
+forks the workers. The catalog snapshot, spatial indexes, city resolver, GeoIP
+table and fitted model factors are built once and shared copy-on-write by every
+worker, including the ones gunicorn forks later to replace recycled workers.
+"""
+
+import gc
+import multiprocessing
+import os
+import sys
+from pathlib import Path
+
+# gunicorn adds the working directory to sys.path only after reading this file.
+PROJECT_DIR = str(Path(__file__).resolve().parent.parent)
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app404.settings")
+
+from django.conf import settings  # noqa: E402  (reads .env like manage.py does)
+
+from team5.apps import PRELOAD_WARMUP_ENV  # noqa: E402
+
+MAX_DEFAULT_WORKERS = 8
+
+
+def default_workers() -> int:
+    return min(2 * multiprocessing.cpu_count() + 1, MAX_DEFAULT_WORKERS)
+
+
+wsgi_app = "app404.wsgi:application"
+bind = getattr(settings, "TEAM5_GUNICORN_BIND", "0.0.0.0:8000")
+workers = getattr(settings, "TEAM5_GUNICORN_WORKERS", 0) or default_workers()
+threads = max(1, getattr(settings, "TEAM5_GUNICORN_THREADS", 4))
+worker_class = "gthread"
+timeout = getattr(settings, "TEAM5_GUNICORN_TIMEOUT", 60)
+# Leave the feedback writer time to drain its queue when a worker stops.
+graceful_timeout = max(30, int(getattr(settings, "TEAM5_FEEDBACK_SHUTDOWN_SECONDS", 10.0)) + 5)
+max_requests = getattr(settings, "TEAM5_GUNICORN_MAX_REQUESTS", 0)
+max_requests_jitter = max_requests // 10
+preload_app = getattr(settings, "TEAM5_GUNICORN_PRELOAD", True)
+chdir = PROJECT_DIR
+accesslog = "-"
+errorlog = "-"
+
+if preload_app:
+    os.environ[PRELOAD_WARMUP_ENV] = "1"
+
+
+def when_ready(server):
+    """Warm the preloaded app in the master; gunicorn forks the workers after this returns."""
+    if not preload_app:
+        return
+    from django.db import connections
+
+    from team5.services.warmup import warm_up, warmup_state
+    from team5.views import recommendation_service
+
+    if warm_up(recommendation_service):
+        server.log.info("team5 warmup finished in the master: %s", warmup_state.as_dict()["steps"])
+    else:
+        # Workers inherit the failed state; their first /team5/api/ready probe retries the warmup.
+        server.log.error("team5 warmup failed in the master: %s", warmup_state.error)
+    # Each worker opens its own database connections.
+    connections.close_all()
+    # Keep the warm objects out of the workers' garbage collections, which would
+    # otherwise write to (and so copy) the pages holding them.
+    gc.freeze()
@@ -5,9 +5,19 @@ from dataclasses import dataclass
 from django.contrib.auth import get_user_model
 from django.core.management.base import BaseCommand
 
-from team5.models import Team5City, Team5Media, Team5MediaComment, Team5MediaRating, Team5Place
+from team5.models import (
+    Team5City,
+    Team5CityAlias,
+    Team5Media,
+    Team5MediaComment,
+    Team5MediaRating,
+    Team5Place,
+    Team5SeedState,
+)
+from team5.services.comment_signals import rebuild_all_comment_signals
 from team5.services.ml.text_sentiment import TextSentiment
 from team5.services.mock_provider import MockProvider
+from team5.services.occasions_catalog import OCCASION_SEED_NAME, ensure_occasion_media_seeded, forget_applied_seed
 
 
 User = get_user_model()
@@ -107,6 +117,9 @@ class Command(BaseCommand):
             Team5Media.objects.all().delete()
             Team5Place.objects.all().delete()
             Team5City.objects.all().delete()
+            # The occasion media went with the catalog; let them be seeded again.
+            Team5SeedState.objects.filter(name=OCCASION_SEED_NAME).delete()
+            forget_applied_seed()
             self.stdout.write(self.style.WARNING("Deleted existing Team5 catalog records."))
 
         if options["clear_ratings"]:
@@ -117,6 +130,7 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING(f"Deleted existing comments: {deleted_comments}"))
 
         self._seed_catalog(provider)
+        ensure_occasion_media_seeded()
         self._seed_synthetic_media(per_place=synthetic_media_per_place)
         media_ids = list(Team5Media.objects.values_list("media_id", flat=True))
         if not media_ids:
@@ -167,6 +181,7 @@ class Command(BaseCommand):
 
         self._assign_media_authors_and_content()
         comments_upserted = self._seed_media_comments()
+        rebuild_all_comment_signals()
 
         total_users = User.objects.count()
         total_media = Team5Media.objects.count()
@@ -223,6 +238,13 @@ class Command(BaseCommand):
                 },
             )
 
+        for alias in provider.get_city_aliases():
+            Team5CityAlias.objects.update_or_create(
+                city_id=alias["cityId"],
+                alias=alias["alias"],
+                defaults={"language": alias.get("language", "en")},
+            )
+
         for place in provider.get_all_places():
             Team5Place.objects.update_or_create(
                 place_id=place["placeId"],
@@ -0,0 +1,55 @@
+import importlib.util
+import os
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+GUNICORN_CONFIG = Path(__file__).resolve().parents[2] / "gunicorn.conf.py"
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve the project with gunicorn (team5/gunicorn.conf.py): the master warms up once, "
+        "then forks workers that share the catalog, indexes and models copy-on-write."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bind", help="Address to listen on (default TEAM5_GUNICORN_BIND).")
+        parser.add_argument("--workers", type=int, help="Worker processes (default TEAM5_GUNICORN_WORKERS).")
+        parser.add_argument("--threads", type=int, help="Threads per worker (default TEAM5_GUNICORN_THREADS).")
+        parser.add_argument(
+            "--no-preload",
+            action="store_true",
+            help="Load and warm the app in every worker instead of once in the master.",
+        )
+
+    def handle(self, *args, **options):
+        argv = gunicorn_argv(
+            bind=options["bind"],
+            workers=options["workers"],
+            threads=options["threads"],
+        )
+        if importlib.util.find_spec("gunicorn") is None:
+            raise CommandError("gunicorn is not installed; pip install -r team5/requirements.txt")
+        if options["no_preload"]:
+            os.environ["TEAM5_GUNICORN_PRELOAD"] = "False"
+        sys.stdout.flush()
+        sys.stderr.flush()
+        # Replace this process so gunicorn receives the container's signals directly.
+        os.execv(sys.executable, argv)
+
+
+def gunicorn_argv(*, bind=None, workers=None, threads=None) -> list[str]:
+    argv = [sys.executable, "-m", "gunicorn", "--config", str(GUNICORN_CONFIG)]
+    if bind:
+        argv += ["--bind", bind]
+    if workers is not None:
+        if workers < 1:
+            raise CommandError("--workers must be at least 1.")
+        argv += ["--workers", str(workers)]
+    if threads is not None:
+        if threads < 1:
+            raise CommandError("--threads must be at least 1.")
+        argv += ["--threads", str(threads)]
+    return argv
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from team5.services.feedback_archive import DEFAULT_CHUNK_SIZE, archive_feedback, configured_archive_dir
+
+
+class Command(BaseCommand):
+    help = "Move recommendation feedback older than the retention window into daily NDJSON.gz archive segments."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            default=None,
+            help="Archive feedback older than N days (default: TEAM5_FEEDBACK_RETENTION_DAYS).",
+        )
+        parser.add_argument(
+            "--archive-dir",
+            default="",
+            help="Segment directory (default: TEAM5_FEEDBACK_ARCHIVE_DIR).",
+        )
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows fetched per query.")
+
+    def handle(self, *args, **options):
+        archive_dir = options["archive_dir"] or configured_archive_dir()
+        if not archive_dir:
+            raise CommandError("Set TEAM5_FEEDBACK_ARCHIVE_DIR or pass --archive-dir.")
+        older_than_days = options["older_than_days"]
+        if older_than_days is None:
+            older_than_days = getattr(settings, "TEAM5_FEEDBACK_RETENTION_DAYS", 90)
+        if older_than_days < 1:
+            raise CommandError("--older-than-days must be at least 1.")
+
+        result = archive_feedback(
+            archive_dir=archive_dir,
+            older_than_days=older_than_days,
+            chunk_size=options["chunk_size"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archived {result['rows']} feedback rows from {result['days']} days before {result['cutoff']} "
+                f"into {archive_dir}."
+            )
+        )
@@ -0,0 +1,27 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from team5.services.feedback_archive import configured_archive_dir
+from team5.services.feedback_store import rebuild_daily_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the Team5FeedbackDaily rollup rows from raw recommendation feedback."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=0,
+            help="Only rebuild the last N calendar days (default: everything).",
+        )
+
+    def handle(self, *args, **options):
+        days = max(0, options["days"])
+        since = timezone.localdate() - timedelta(days=days - 1) if days else None
+        # Days already archived by team5_archive_feedback are read back from the segments.
+        rows = rebuild_daily_rollups(since=since, archive_dir=configured_archive_dir())
+        scope = f"the last {days} days" if days else "all feedback"
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} daily rollup rows for {scope}."))
@@ -0,0 +1,183 @@
+import importlib.util
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from team5.management.commands.serve_team5 import gunicorn_argv
+
+
+DEFAULT_PATHS = [
+    "/team5/api/recommendations/popular/?limit=10",
+    "/team5/api/recommendations/weather/?limit=10",
+    "/team5/api/recommendations/occasions/?limit=10",
+    "/team5/api/recommendations/nearest/?cityId=tehran&limit=10",
+    "/team5/api/recommendations/nearby/?lat=35.70&lon=51.34&radiusKm=25&limit=10",
+]
+SERVERS = ("runserver", "gunicorn")
+
+
+class Command(BaseCommand):
+    help = (
+        "Start runserver and the preloaded gunicorn server (serve_team5) against the configured database, "
+        "load both with the same requests and compare throughput, latency and process-tree RSS/PSS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--servers", default=",".join(SERVERS), help="Comma-separated subset of runserver,gunicorn.")
+        parser.add_argument("--requests", type=int, default=2000, help="Requests per server.")
+        parser.add_argument("--concurrency", type=int, default=16, help="Concurrent client threads.")
+        parser.add_argument("--workers", type=int, default=4, help="gunicorn worker processes.")
+        parser.add_argument("--threads", type=int, default=4, help="gunicorn threads per worker.")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--ready-timeout", type=float, default=300.0, help="Seconds to wait for warmup.")
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Endpoint to request (repeatable; defaults to the main recommendation endpoints).",
+        )
+
+    def handle(self, *args, **options):
+        paths = options["paths"] or DEFAULT_PATHS
+        servers = [name.strip() for name in options["servers"].split(",") if name.strip()]
+        self.stdout.write(
+            f"{options['requests']} requests per server, {options['concurrency']} concurrent clients, "
+            f"{len(paths)} endpoints; gunicorn: {options['workers']} workers x {options['threads']} threads"
+        )
+        for name in servers:
+            if name not in SERVERS:
+                self.stdout.write(self.style.ERROR(f"{name:>9}: unknown server"))
+                continue
+            if name == "gunicorn" and importlib.util.find_spec("gunicorn") is None:
+                self.stdout.write(self.style.ERROR(f"{name:>9}: skipped (gunicorn is not installed)"))
+                continue
+            result = self._benchmark(name, paths, options)
+            if "error" in result:
+                self.stdout.write(self.style.ERROR(f"{name:>9}: failed ({result['error']})"))
+                continue
+            idle, loaded = result["idle"], result["loaded"]
+            self.stdout.write(
+                f"{name:>9}: {result['rps']:.0f} req/s, p50 {result['p50_ms']:.1f} ms, "
+                f"p95 {result['p95_ms']:.1f} ms, {result['errors']} errors; "
+                f"{loaded['processes']} processes, RSS {idle['rss_mb']:.0f} -> {loaded['rss_mb']:.0f} MB, "
+                f"PSS {idle['pss_mb']:.0f} -> {loaded['pss_mb']:.0f} MB (warm idle -> after load)"
+            )
+
+    def _benchmark(self, name: str, paths: list[str], options) -> dict:
+        address = f"127.0.0.1:{options['port']}"
+        if name == "gunicorn":
+            argv = gunicorn_argv(bind=address, workers=options["workers"], threads=options["threads"])
+        else:
+            argv = [sys.executable, "manage.py", "runserver", "--noreload", address]
+        env = {**os.environ, "TEAM5_WARMUP_ON_STARTUP": "True"}
+        output = None if options["verbosity"] > 1 else subprocess.DEVNULL
+        process = subprocess.Popen(argv, cwd=settings.BASE_DIR, env=env, stdout=output, stderr=output)
+        base_url = f"http://{address}"
+        try:
+            if not _wait_until_ready(base_url, process, options["ready_timeout"]):
+                return {"error": f"not ready after {options['ready_timeout']:.0f}s (exit code {process.poll()})"}
+            idle = _tree_memory(process.pid)
+            load = _run_load(base_url, paths, options["requests"], options["concurrency"])
+            loaded = _tree_memory(process.pid)
+            return {**load, "idle": idle, "loaded": loaded}
+        finally:
+            _stop(process)
+
+
+def _wait_until_ready(base_url: str, process: subprocess.Popen, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and process.poll() is None:
+        try:
+            with urllib.request.urlopen(f"{base_url}/team5/api/ready", timeout=5) as response:
+                if response.status == 200:
+                    return True
+        except (urllib.error.URLError, OSError):
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def _run_load(base_url: str, paths: list[str], total: int, concurrency: int) -> dict:
+    def fetch(index: int) -> tuple[float, bool]:
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(f"{base_url}{paths[index % len(paths)]}", timeout=30) as response:
+                response.read()
+                ok = response.status == 200
+        except (urllib.error.URLError, OSError):
+            ok = False
+        return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        results = list(executor.map(fetch, range(max(1, total))))
+    elapsed = time.perf_counter() - started
+    latencies = sorted(seconds for seconds, _ in results)
+    return {
+        "rps": len(results) / elapsed if elapsed else 0.0,
+        "p50_ms": latencies[len(latencies) // 2] * 1000.0,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000.0,
+        "errors": sum(1 for _, ok in results if not ok),
+    }
+
+
+def _tree_memory(root_pid: int) -> dict:
+    """Summed RSS and PSS of ``root_pid`` and its descendants.
+
+    RSS counts a page shared by forked workers once per process; PSS splits it
+    between them, so only PSS shows what copy-on-write sharing saves.
+    """
+    pids = _process_tree(root_pid)
+    rss_kb = sum(_read_kb(f"/proc/{pid}/status", "VmRSS") for pid in pids)
+    pss_kb = sum(_read_kb(f"/proc/{pid}/smaps_rollup", "Pss") for pid in pids)
+    return {"processes": len(pids), "rss_mb": rss_kb / 1024.0, "pss_mb": pss_kb / 1024.0}
+
+
+def _process_tree(root_pid: int) -> list[int]:
+    children: dict[int, list[int]] = {}
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            # The command name in parentheses may contain spaces; the parent pid follows it.
+            stat = (entry / "stat").read_text(encoding="ascii", errors="replace")
+            parent = int(stat.rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(entry.name))
+    tree, pending = [], [root_pid]
+    while pending:
+        pid = pending.pop()
+        tree.append(pid)
+        pending.extend(children.get(pid, []))
+    return tree
+
+
+def _read_kb(path: str, field: str) -> int:
+    try:
+        with open(path, encoding="ascii") as handle:
+            for line in handle:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def _stop(process: subprocess.Popen) -> None:
+    if process.poll() is None:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
@@ -0,0 +1,136 @@
+import multiprocessing
+import time
+import uuid
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from team5.services.ml.training_data import build_trainset, load_rating_arrays
+
+
+RATING_CHOICES = np.array([1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0])
+
+
+class Command(BaseCommand):
+    help = "Compare load time and peak memory of the legacy and array-based SVD training pipelines."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ratings", type=int, default=10_000_000, help="Synthetic ratings to generate.")
+        parser.add_argument("--users", type=int, default=200_000, help="Distinct synthetic users.")
+        parser.add_argument("--items", type=int, default=20_000, help="Distinct synthetic media items.")
+        parser.add_argument("--seed", type=int, default=1404)
+        parser.add_argument(
+            "--skip-legacy",
+            action="store_true",
+            help="Only measure the array pipeline (the legacy one needs several GB at 10M ratings).",
+        )
+
+    def handle(self, *args, **options):
+        spec = (options["ratings"], options["users"], options["items"], options["seed"])
+        self.stdout.write(
+            f"Synthetic dataset: {spec[0]} ratings, {spec[1]} users, {spec[2]} items (values_list-shaped rows)"
+        )
+        pipelines = [("arrays", _run_array_pipeline)]
+        if not options["skip_legacy"]:
+            pipelines.insert(0, ("legacy", _run_legacy_pipeline))
+
+        for name, pipeline in pipelines:
+            result = _measure_in_child(pipeline, spec)
+            if "error" in result:
+                self.stdout.write(self.style.ERROR(f"{name:>7}: failed ({result['error']})"))
+                continue
+            self.stdout.write(
+                f"{name:>7}: load {result['seconds']:.2f}s, peak +{result['peak_mb']:.0f} MB, "
+                f"{result['n_users']} users x {result['n_items']} items"
+            )
+
+
+def _synthetic_rows(n_ratings: int, n_users: int, n_items: int, seed: int):
+    """Yield ``(UUID, media_id, rate)`` tuples the way ``values_list`` streams them."""
+    rng = np.random.default_rng(seed)
+    user_pool = [uuid.UUID(int=int(value)) for value in rng.integers(1, 2**63, size=n_users)]
+    chunk = 100_000
+    for start in range(0, n_ratings, chunk):
+        size = min(chunk, n_ratings - start)
+        users = rng.integers(0, n_users, size=size).tolist()
+        items = rng.integers(0, n_items, size=size).tolist()
+        rates = RATING_CHOICES[rng.integers(0, RATING_CHOICES.size, size=size)].tolist()
+        for user_idx, item_idx, rate in zip(users, items, rates):
+            yield user_pool[user_idx], f"media-{item_idx:06d}", rate
+
+
+def _run_legacy_pipeline(spec) -> tuple[int, int]:
+    import pandas as pd
+    from surprise import Dataset, Reader
+
+    records = [
+        {"userId": str(user_id), "mediaId": media_id, "rate": float(rate)}
+        for user_id, media_id, rate in _synthetic_rows(*spec)
+    ]
+    triples = [(row["userId"], row["mediaId"], row["rate"]) for row in records]
+    df = pd.DataFrame(triples, columns=["user_id", "item_id", "rating"])
+    df["user_id"] = df["user_id"].astype(str)
+    df["item_id"] = df["item_id"].astype(str)
+    df["rating"] = df["rating"].astype(float)
+    trainset = Dataset.load_from_df(df, Reader(rating_scale=(0, 5))).build_full_trainset()
+    return trainset.n_users, trainset.n_items
+
+
+def _run_array_pipeline(spec) -> tuple[int, int]:
+    arrays = load_rating_arrays(_synthetic_rows(*spec))
+    trainset = build_trainset(arrays, (0, 5))
+    return trainset.n_users, trainset.n_items
+
+
+def _measure_in_child(pipeline, spec) -> dict:
+    context = multiprocessing.get_context("fork")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_child_main, args=(pipeline, spec, sender))
+    process.start()
+    sender.close()
+    try:
+        result = receiver.recv()
+    except EOFError:
+        result = {"error": f"child exited with code {process.exitcode}"}
+    process.join()
+    return result
+
+
+def _child_main(pipeline, spec, sender) -> None:
+    _reset_peak_rss()
+    baseline_kb = _read_status_kb("VmRSS")
+    started = time.perf_counter()
+    n_users, n_items = pipeline(spec)
+    seconds = time.perf_counter() - started
+    peak_kb = _read_status_kb("VmHWM")
+    sender.send(
+        {
+            "seconds": seconds,
+            "peak_mb": max(0, peak_kb - baseline_kb) / 1024.0,
+            "n_users": n_users,
+            "n_items": n_items,
+        }
+    )
+    sender.close()
+
+
+def _reset_peak_rss() -> None:
+    # Writing "5" resets VmHWM so the peak only reflects this pipeline.
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as handle:
+            handle.write("5")
+    except OSError:
+        pass
+
+
+def _read_status_kb(field: str) -> int:
+    try:
+        with open("/proc/self/status", encoding="ascii") as handle:
+            for line in handle:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+
+    return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from team5.services.comment_sentiment import DEFAULT_BATCH_SIZE, classify_pending_comments
+from team5.services.sentiment_service import sentiment_service
+
+
+class Command(BaseCommand):
+    help = "Score comments still waiting for sentiment classification (e.g. left over after a restart)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Comments scored per batch.")
+
+    def handle(self, *args, **options):
+        if not sentiment_service.classifier_available():
+            self.stdout.write(self.style.WARNING("No sentiment classifier installed; comments stay pending."))
+            return
+        touched = classify_pending_comments(batch_size=max(1, options["batch_size"]))
+        self.stdout.write(self.style.SUCCESS(f"Scored pending comments of {len(touched)} users."))
@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from team5.services.geoip import GeoIPDatabase, compile_geoip_csv
+from team5.services.location_service import geo_cache
+
+
+class Command(BaseCommand):
+    help = "Compile an IP-range CSV (IPv4 and IPv6) into the memory-mapped GeoIP table used by nearest recommendations."
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path", help="IP-range CSV (header with ip_start/ip_end/city/... or DB-IP city lite).")
+        parser.add_argument(
+            "--output",
+            default="",
+            help="Compiled table path (default: TEAM5_GEOIP_DATABASE).",
+        )
+        parser.add_argument("--check-ip", action="append", default=[], help="Look up an IP after compiling (repeatable).")
+
+    def handle(self, *args, **options):
+        output = options["output"] or getattr(settings, "TEAM5_GEOIP_DATABASE", "")
+        if not output:
+            raise CommandError("Set TEAM5_GEOIP_DATABASE or pass --output.")
+        try:
+            stats = compile_geoip_csv(options["csv_path"], output)
+        except FileNotFoundError as exc:
+            raise CommandError(str(exc)) from exc
+
+        # Cached lookups (including the shared on-disk store) were answered by the old table.
+        geo_cache.clear()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Compiled {stats['ipv4Ranges']} IPv4 and {stats['ipv6Ranges']} IPv6 ranges "
+                f"({stats['locations']} locations, {stats['skippedRows']} rows skipped, {stats['bytes']} bytes) into {output}"
+            )
+        )
+        if options["check_ip"]:
+            database = GeoIPDatabase.open(output)
+            for client_ip in options["check_ip"]:
+                started = time.perf_counter()
+                result = database.lookup(client_ip)
+                elapsed_us = (time.perf_counter() - started) * 1e6
+                self.stdout.write(f"{client_ip}: {result} ({elapsed_us:.1f} us)")
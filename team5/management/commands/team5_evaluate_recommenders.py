@@ -0,0 +1,90 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from team5.services.evaluation import EvaluationConfig, load_evaluation_data, run_evaluation
+from team5.services.feedback_archive import configured_archive_dir
+
+
+class Command(BaseCommand):
+    help = "Evaluate SVD, popular, similar and hybrid recommendations on time-based folds and write a JSON report."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--folds", type=int, default=3, help="Number of expanding-window test folds.")
+        parser.add_argument("--k", type=int, default=10, help="Cutoff for precision/recall/NDCG.")
+        parser.add_argument(
+            "--min-train-fraction",
+            type=float,
+            default=0.6,
+            help="Share of the (time-ordered) ratings always kept for training.",
+        )
+        parser.add_argument("--max-users", type=int, default=500, help="Evaluated users per fold (0 = all).")
+        parser.add_argument("--workers", type=int, default=1, help="Processes used for folds and grid points.")
+        parser.add_argument("--n-factors", default="100", help="Comma-separated SVD n_factors grid.")
+        parser.add_argument("--n-epochs", default="20", help="Comma-separated SVD n_epochs grid.")
+        parser.add_argument("--lr-all", default="", help="Optional comma-separated SVD lr_all grid.")
+        parser.add_argument("--reg-all", default="", help="Optional comma-separated SVD reg_all grid.")
+        parser.add_argument("--output", default="team5_evaluation_report.json", help="Report path.")
+        parser.add_argument(
+            "--include-archive",
+            action="store_true",
+            help="Also stream feedback moved to TEAM5_FEEDBACK_ARCHIVE_DIR by team5_archive_feedback.",
+        )
+
+    def handle(self, *args, **options):
+        grid = {
+            "n_factors": _parse_grid(options["n_factors"], int),
+            "n_epochs": _parse_grid(options["n_epochs"], int),
+            "lr_all": _parse_grid(options["lr_all"], float),
+            "reg_all": _parse_grid(options["reg_all"], float),
+        }
+        config = EvaluationConfig(
+            folds=max(1, options["folds"]),
+            k=max(1, options["k"]),
+            min_train_fraction=options["min_train_fraction"],
+            max_users_per_fold=max(0, options["max_users"]),
+            workers=max(1, options["workers"]),
+            svd_grid={key: values for key, values in grid.items() if values},
+        )
+
+        archive_dir = None
+        if options["include_archive"]:
+            archive_dir = configured_archive_dir()
+            if archive_dir is None:
+                raise CommandError("--include-archive needs TEAM5_FEEDBACK_ARCHIVE_DIR to be set.")
+        data = load_evaluation_data(archive_dir=archive_dir)
+        if len(data.ratings) < 2:
+            raise CommandError("Not enough Team5 ratings to build time-based folds.")
+        self.stdout.write(
+            f"Loaded {len(data.ratings)} ratings, {len(data.feedback)} feedback events, {len(data.media)} media"
+        )
+
+        report = run_evaluation(data, config)
+        Path(options["output"]).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+        k = config.k
+        for name, metrics in report["strategies"].items():
+            rmse = metrics.get("rmse")
+            self.stdout.write(
+                f"{name:>8}: P@{k}={metrics[f'precision@{k}']:.4f} R@{k}={metrics[f'recall@{k}']:.4f} "
+                f"NDCG@{k}={metrics[f'ndcg@{k}']:.4f} coverage={metrics['catalogCoverage']:.4f} "
+                f"latency={metrics['latencyMsMean']:.2f}ms"
+                + (f" rmse={rmse:.4f}" if rmse is not None else "")
+            )
+        if report["bestSvdParams"] is not None:
+            self.stdout.write(f"Best SVD params by RMSE: {report['bestSvdParams']}")
+        self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']} in {report['elapsedSeconds']}s"))
+
+
+def _parse_grid(raw: str, cast) -> list:
+    values = []
+    for token in str(raw or "").split(","):
+        token = token.strip()
+        if not token:
+            continue
+        try:
+            values.append(cast(token))
+        except ValueError as exc:
+            raise CommandError(f"Invalid grid value {token!r}") from exc
+    return values
@@ -0,0 +1,104 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+DEFAULT_MODULES = ["team5.views"]
+HEAVY_MODULES = ("numpy", "scipy", "pandas", "surprise", "shekar")
+MARKER = "team5-import-times-start"
+
+# Runs in a fresh interpreter with -X importtime; only imports after the marker
+# are attributed to the measured module (Django setup is excluded).
+CHILD_SCRIPT = """
+import importlib, json, os, sys, time
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", {settings_module!r})
+import django
+django.setup()
+sys.stderr.write({marker!r} + "\\n")
+sys.stderr.flush()
+started = time.perf_counter()
+importlib.import_module({module!r})
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "heavyLoaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+class Command(BaseCommand):
+    help = "Measure the import cost of team5 modules in a fresh interpreter (python -X importtime)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--module",
+            action="append",
+            dest="modules",
+            help=f"Module to import (repeatable, default: {', '.join(DEFAULT_MODULES)}).",
+        )
+        parser.add_argument("--top", type=int, default=15, help="Slowest imports to list per module.")
+        parser.add_argument("--json", action="store_true", help="Print a JSON report instead of a table.")
+
+    def handle(self, *args, **options):
+        report = [measure_import(module, top=options["top"]) for module in options["modules"] or DEFAULT_MODULES]
+        if options["json"]:
+            self.stdout.write(json.dumps({"modules": report}, indent=2))
+            return
+
+        for entry in report:
+            heavy = ", ".join(entry["heavyLoaded"]) or "none"
+            self.stdout.write(
+                self.style.MIGRATE_HEADING(f"{entry['module']}: {entry['seconds'] * 1000:.1f} ms (heavy modules: {heavy})")
+            )
+            self.stdout.write(f"{'cumulative ms':>14} {'self ms':>9}  module")
+            for row in entry["slowest"]:
+                self.stdout.write(f"{row['cumulativeUs'] / 1000:>14.1f} {row['selfUs'] / 1000:>9.1f}  {row['module']}")
+
+
+def measure_import(module: str, *, top: int = 15) -> dict:
+    script = CHILD_SCRIPT.format(
+        settings_module=settings.SETTINGS_MODULE,
+        marker=MARKER,
+        module=module,
+        heavy=HEAVY_MODULES,
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True,
+        text=True,
+        cwd=str(settings.BASE_DIR),
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        check=False,
+    )
+    if result.returncode != 0:
+        raise CommandError(f"Importing {module} failed:\n{result.stderr.strip()[-2000:]}")
+
+    summary = json.loads(result.stdout.strip().splitlines()[-1])
+    rows = _parse_importtime(result.stderr.split(MARKER, 1)[-1])
+    rows.sort(key=lambda row: row["cumulativeUs"], reverse=True)
+    return {
+        "module": module,
+        "seconds": summary["seconds"],
+        "heavyLoaded": summary["heavyLoaded"],
+        "importedModules": len(rows),
+        "slowest": rows[: max(0, top)],
+    }
+
+
+def _parse_importtime(stderr: str) -> list[dict]:
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        rows.append(
+            {
+                "module": parts[2].strip(),
+                "selfUs": int(parts[0]),
+                "cumulativeUs": int(parts[1]),
+            }
+        )
+    return rows
@@ -0,0 +1,83 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from team5.services.db_provider import DatabaseProvider
+from team5.services.ml.blocked_scoring import DEFAULT_ITEM_BLOCK_SIZE, DEFAULT_USER_BLOCK_SIZE, score_top_k
+from team5.services.ml.recommender_model import RecommenderModel
+
+
+class Command(BaseCommand):
+    help = "Score top-k media for every user with blocked matrix products over the trained SVD factors."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--k", type=int, default=10, help="Items to keep per user.")
+        parser.add_argument("--workers", type=int, default=None, help="Process count (default: CPU count).")
+        parser.add_argument("--user-block", type=int, default=DEFAULT_USER_BLOCK_SIZE, help="Users per block.")
+        parser.add_argument("--item-block", type=int, default=DEFAULT_ITEM_BLOCK_SIZE, help="Items per block.")
+        parser.add_argument(
+            "--output",
+            default="",
+            help="Optional path of a JSON file receiving {userId: [[mediaId, score], ...]}.",
+        )
+        parser.add_argument(
+            "--benchmark",
+            action="store_true",
+            help="Also time the per-item algo.predict loop and report users/second for both.",
+        )
+        parser.add_argument(
+            "--benchmark-users",
+            type=int,
+            default=200,
+            help="How many users the per-item predict loop is timed on.",
+        )
+
+    def handle(self, *args, **options):
+        rows = [
+            (str(row["userId"]), str(row["mediaId"]), float(row["rate"]))
+            for row in DatabaseProvider().get_all_media_ratings()
+        ]
+        if not rows:
+            raise CommandError("No Team5 media ratings found; nothing to score.")
+
+        model = RecommenderModel((0, 5))
+        started = time.perf_counter()
+        model.train(rows)
+        self.stdout.write(f"Trained SVD on {len(rows)} ratings in {time.perf_counter() - started:.2f}s")
+
+        snapshot = model.factor_snapshot()
+        started = time.perf_counter()
+        results = score_top_k(
+            snapshot,
+            k=options["k"],
+            user_block_size=options["user_block"],
+            item_block_size=options["item_block"],
+            workers=options["workers"],
+        )
+        blocked_seconds = time.perf_counter() - started
+        blocked_rate = len(results) / blocked_seconds if blocked_seconds > 0 else float("inf")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Blocked scoring: {len(results)} users x {len(snapshot.item_ids)} items "
+                f"in {blocked_seconds:.3f}s ({blocked_rate:.1f} users/s)"
+            )
+        )
+
+        if options["benchmark"]:
+            sample = snapshot.user_ids[: max(1, options["benchmark_users"])]
+            started = time.perf_counter()
+            for user_id in sample:
+                model.recommend(user_id, top_n=options["k"])
+            loop_seconds = time.perf_counter() - started
+            loop_rate = len(sample) / loop_seconds if loop_seconds > 0 else float("inf")
+            self.stdout.write(
+                f"Per-item predict loop: {len(sample)} users in {loop_seconds:.3f}s ({loop_rate:.1f} users/s)"
+            )
+            if loop_rate > 0:
+                self.stdout.write(self.style.SUCCESS(f"Speedup: {blocked_rate / loop_rate:.1f}x"))
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as handle:
+                json.dump({user_id: [[m, round(s, 4)] for m, s in items] for user_id, items in results.items()}, handle)
+            self.stdout.write(f"Wrote {len(results)} user rankings to {options['output']}")
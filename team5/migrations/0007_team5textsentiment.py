@@ -0,0 +1,32 @@
+# Generated by Django 4.2.27 on 2026-10-19 08:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team5', '0006_team5mediacomment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Team5TextSentiment',
+            fields=[
+                ('text_hash', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('score', models.FloatField()),
+                ('label', models.CharField(choices=[('positive', 'positive'), ('negative', 'negative'), ('neutral', 'neutral')], default='neutral', max_length=16)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RenameIndex(
+            model_name='team5mediacomment',
+            new_name='team5_team5_media_i_9d8671_idx',
+            old_name='team5_team5_media_i_8bbf81_idx',
+        ),
+        migrations.RenameIndex(
+            model_name='team5mediacomment',
+            new_name='team5_team5_user_id_3a7920_idx',
+            old_name='team5_team5_user_id_efafe5_idx',
+        ),
+    ]
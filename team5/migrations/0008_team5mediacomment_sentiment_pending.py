@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-19 09:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team5', '0007_team5textsentiment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='team5mediacomment',
+            name='sentiment_pending',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+    ]
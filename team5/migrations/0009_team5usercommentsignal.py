@@ -0,0 +1,58 @@
+# Generated by Django 4.2.27 on 2026-10-19 09:13
+
+from django.db import migrations, models
+
+
+SNIPPET_LENGTH = 280
+
+
+def backfill_comment_signals(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    Comment = apps.get_model("team5", "Team5MediaComment")
+    Signal = apps.get_model("team5", "Team5UserCommentSignal")
+
+    signals = {}
+    rows = (
+        Comment.objects.using(alias)
+        .filter(sentiment_label__in=("positive", "negative"))
+        .order_by("user_id", "-updated_at", "-created_at", "-id")
+        .values_list("user_id", "media_id", "sentiment_label", "body")
+    )
+    for user_id, media_id, label, body in rows.iterator():
+        positive, negative, snippets = signals.setdefault(user_id, ([], [], {}))
+        if label == "negative":
+            negative.append(media_id)
+            continue
+        positive.append(media_id)
+        snippet = (body or "").strip()[:SNIPPET_LENGTH]
+        if snippet:
+            snippets.setdefault(media_id, snippet)
+
+    Signal.objects.using(alias).bulk_create(
+        [
+            Signal(user_id=user_id, positive_media_ids=positive, negative_media_ids=negative, positive_snippets=snippets)
+            for user_id, (positive, negative, snippets) in signals.items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team5', '0008_team5mediacomment_sentiment_pending'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Team5UserCommentSignal',
+            fields=[
+                ('user_id', models.UUIDField(primary_key=True, serialize=False)),
+                ('positive_media_ids', models.JSONField(blank=True, default=list)),
+                ('negative_media_ids', models.JSONField(blank=True, default=list)),
+                ('positive_snippets', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_comment_signals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.27 on 2026-10-19 09:14
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def backfill_ab_group(apps, schema_editor):
+    # Existing rows get the hash bucket the summary used to compute per row.
+    alias = schema_editor.connection.alias
+    Feedback = apps.get_model("team5", "Team5RecommendationFeedback")
+    group_b = [
+        user_id
+        for user_id in Feedback.objects.using(alias).values_list("user_id", flat=True).distinct()
+        if int(hashlib.md5(str(user_id).encode("utf-8")).hexdigest()[:2], 16) % 2
+    ]
+    for start in range(0, len(group_b), 500):
+        Feedback.objects.using(alias).filter(user_id__in=group_b[start:start + 500]).update(ab_group="B")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team5', '0009_team5usercommentsignal'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='team5recommendationfeedback',
+            name='ab_group',
+            field=models.CharField(choices=[('A', 'A'), ('B', 'B')], default='A', max_length=1),
+        ),
+        migrations.AddIndex(
+            model_name='team5recommendationfeedback',
+            index=models.Index(fields=['created_at', 'ab_group', 'action'], name='team5_team5_created_462f30_idx'),
+        ),
+        migrations.RunPython(backfill_ab_group, migrations.RunPython.noop),
+    ]
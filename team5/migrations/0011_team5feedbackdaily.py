@@ -0,0 +1,30 @@
+# Generated by Django 4.2.27 on 2026-10-19 09:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team5', '0010_team5recommendationfeedback_ab_group'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Team5FeedbackDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('ab_group', models.CharField(choices=[('A', 'A'), ('B', 'B')], max_length=1)),
+                ('action', models.CharField(max_length=32)),
+                ('impressions', models.PositiveIntegerField(default=0)),
+                ('likes', models.PositiveIntegerField(default=0)),
+                ('users_sketch', models.BinaryField(default=bytes)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='team5feedbackdaily',
+            constraint=models.UniqueConstraint(fields=('day', 'ab_group', 'action'), name='team5_unique_feedback_daily'),
+        ),
+    ]
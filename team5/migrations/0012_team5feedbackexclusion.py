@@ -0,0 +1,52 @@
+# Generated by Django 4.2.27 on 2026-10-19 09:17
+
+from django.db import migrations, models
+
+
+def backfill_exclusions(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    Feedback = apps.get_model("team5", "Team5RecommendationFeedback")
+    Exclusion = apps.get_model("team5", "Team5FeedbackExclusion")
+
+    exclusions = []
+    previous_key = None
+    rows = (
+        Feedback.objects.using(alias)
+        .order_by("user_id", "action", "-created_at", "-id")
+        .values_list("user_id", "action", "liked", "shown_media_ids", "created_at")
+    )
+    for user_id, action, liked, shown_media_ids, created_at in rows.iterator():
+        if (user_id, action) == previous_key:
+            continue
+        previous_key = (user_id, action)
+        excluded = [] if liked else [str(m).strip() for m in shown_media_ids or [] if str(m).strip()]
+        exclusions.append(
+            Exclusion(user_id=user_id, action=action, excluded_media_ids=excluded, feedback_created_at=created_at)
+        )
+    Exclusion.objects.using(alias).bulk_create(exclusions, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team5', '0011_team5feedbackdaily'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Team5FeedbackExclusion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.UUIDField()),
+                ('action', models.CharField(max_length=32)),
+                ('excluded_media_ids', models.JSONField(blank=True, default=list)),
+                ('feedback_created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='team5feedbackexclusion',
+            constraint=models.UniqueConstraint(fields=('user_id', 'action'), name='team5_unique_feedback_exclusion'),
+        ),
+        migrations.RunPython(backfill_exclusions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.27 on 2026-10-19 09:27
+
+import json
+from pathlib import Path
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+ALIASES_PATH = Path(__file__).resolve().parent.parent / "mock_data" / "city_aliases.json"
+
+
+def seed_aliases(apps, schema_editor):
+    alias_db = schema_editor.connection.alias
+    City = apps.get_model("team5", "Team5City")
+    CityAlias = apps.get_model("team5", "Team5CityAlias")
+
+    known = set(City.objects.using(alias_db).values_list("city_id", flat=True))
+    rows = json.loads(ALIASES_PATH.read_text(encoding="utf-8")) if ALIASES_PATH.exists() else []
+    CityAlias.objects.using(alias_db).bulk_create(
+        [
+            CityAlias(city_id=row["cityId"], alias=row["alias"], language=row.get("language", "en"))
+            for row in rows
+            if row["cityId"] in known
+        ],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team5', '0012_team5feedbackexclusion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Team5CityAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alias', models.CharField(max_length=200)),
+                ('language', models.CharField(choices=[('en', 'English'), ('fa', 'Persian')], default='en', max_length=8)),
+                ('city', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='team5.team5city')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='team5cityalias',
+            constraint=models.UniqueConstraint(fields=('city', 'alias'), name='team5_unique_city_alias'),
+        ),
+        migrations.RunPython(seed_aliases, migrations.RunPython.noop),
+    ]
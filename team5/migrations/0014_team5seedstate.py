@@ -0,0 +1,21 @@
+# Generated by Django 4.2.27 on 2026-10-19 09:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team5', '0013_team5cityalias'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Team5SeedState',
+            fields=[
+                ('name', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('checksum', models.CharField(max_length=64)),
+                ('applied_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -14,6 +14,22 @@ class Team5City(models.Model):
         return f"{self.city_name} ({self.city_id})"
 
 
+class Team5CityAlias(models.Model):
+    """Alternative spelling or Persian name of a city, matched after normalization."""
+
+    LANGUAGE_CHOICES = [("en", "English"), ("fa", "Persian")]
+
+    city = models.ForeignKey(Team5City, on_delete=models.CASCADE, related_name="aliases")
+    alias = models.CharField(max_length=200)
+    language = models.CharField(max_length=8, choices=LANGUAGE_CHOICES, default="en")
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["city", "alias"], name="team5_unique_city_alias")]
+
+    def __str__(self):
+        return f"{self.alias} -> {self.city_id}"
+
+
 class Team5Place(models.Model):
     place_id = models.CharField(max_length=128, primary_key=True)
     city = models.ForeignKey(Team5City, on_delete=models.CASCADE, related_name="places")
@@ -84,6 +100,8 @@ class Team5MediaComment(models.Model):
     body = models.TextField()
     sentiment_score = models.FloatField(default=0.0)
     sentiment_label = models.CharField(max_length=16, choices=SENTIMENT_CHOICES, default="neutral", db_index=True)
+    # Set when the body changed and the background classifier has not scored it yet.
+    sentiment_pending = models.BooleanField(default=False, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -100,17 +118,100 @@ class Team5MediaComment(models.Model):
         return f"{self.user_email or self.user_id} comment on {self.media_id} ({self.sentiment_label})"
 
 
+class Team5UserCommentSignal(models.Model):
+    """Per-user summary of scored comments, rebuilt whenever one of the user's comments changes."""
+
+    user_id = models.UUIDField(primary_key=True)
+    positive_media_ids = models.JSONField(default=list, blank=True)
+    negative_media_ids = models.JSONField(default=list, blank=True)
+    # {media_id: leading part of the positive comment} shown as ``triggerComment``.
+    positive_snippets = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id} (+{len(self.positive_media_ids)} / -{len(self.negative_media_ids)})"
+
+
 class Team5RecommendationFeedback(models.Model):
+    AB_GROUP_CHOICES = [
+        ("A", "A"),
+        ("B", "B"),
+    ]
+
     user_id = models.UUIDField(db_index=True)
     action = models.CharField(max_length=32, db_index=True)
     liked = models.BooleanField(default=True)
     shown_media_ids = models.JSONField(default=list, blank=True)
+    # A/B group the user was served when the feedback was written.
+    ab_group = models.CharField(max_length=1, choices=AB_GROUP_CHOICES, default="A")
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         indexes = [
             models.Index(fields=["user_id", "action", "-created_at"]),
+            models.Index(fields=["created_at", "ab_group", "action"]),
         ]
 
     def __str__(self):
         return f"{self.user_id} [{self.action}] liked={self.liked}"
+
+
+class Team5FeedbackExclusion(models.Model):
+    """Media hidden from the next (user, action) request, taken from that pair's latest feedback."""
+
+    user_id = models.UUIDField()
+    action = models.CharField(max_length=32)
+    # Empty when the latest feedback was a like.
+    excluded_media_ids = models.JSONField(default=list, blank=True)
+    feedback_created_at = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user_id", "action"], name="team5_unique_feedback_exclusion")
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} [{self.action}] excludes {len(self.excluded_media_ids)}"
+
+
+class Team5FeedbackDaily(models.Model):
+    """Per-day feedback counters per A/B group and action, updated on every feedback insert."""
+
+    day = models.DateField()
+    ab_group = models.CharField(max_length=1, choices=Team5RecommendationFeedback.AB_GROUP_CHOICES)
+    action = models.CharField(max_length=32)
+    impressions = models.PositiveIntegerField(default=0)
+    likes = models.PositiveIntegerField(default=0)
+    # HyperLogLog registers of the user ids (see services/hll.py); merged across days for uniqueUsers.
+    users_sketch = models.BinaryField(default=bytes)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["day", "ab_group", "action"], name="team5_unique_feedback_daily")
+        ]
+
+    def __str__(self):
+        return f"{self.day} [{self.ab_group}/{self.action}] {self.likes}/{self.impressions}"
+
+
+class Team5TextSentiment(models.Model):
+    text_hash = models.CharField(max_length=64, primary_key=True)
+    score = models.FloatField()
+    label = models.CharField(max_length=16, choices=Team5MediaComment.SENTIMENT_CHOICES, default="neutral")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.text_hash[:12]} ({self.label} {self.score:.3f})"
+
+
+class Team5SeedState(models.Model):
+    """Checksum of the last applied built-in seed list, so seeding runs once per list version."""
+
+    name = models.CharField(max_length=64, primary_key=True)
+    checksum = models.CharField(max_length=64)
+    applied_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.checksum[:12]}"
@@ -44,6 +44,24 @@ class Team5Serializer:
             "items": enriched_items,
         }
 
+    @staticmethod
+    def serialize_nearby(items, latitude, longitude, radius_km, limit, user_id):
+        enriched_items = [
+            {**Team5Serializer._enrich_media_item(item), "distanceKm": item.get("distanceKm")} for item in items
+        ]
+
+        return {
+            "kind": "nearby",
+            "title": "near you",
+            "userId": user_id,
+            "latitude": latitude,
+            "longitude": longitude,
+            "radiusKm": radius_km,
+            "limit": limit,
+            "count": len(enriched_items),
+            "items": enriched_items,
+        }
+
     @staticmethod
     def serialize_personalized(items, user_id, source, limit):
         enriched_items = [Team5Serializer._enrich_media_item(item) for item in items]
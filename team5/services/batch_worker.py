@@ -0,0 +1,142 @@
+"""Background thread pool that hands queued items to a handler in batches."""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class BatchWorkerPool:
+    """Collects submitted items and calls ``handler(batch)`` from daemon threads.
+
+    A worker takes the first queued item, then waits up to ``max_wait_seconds``
+    for more until it has ``batch_size`` items. Threads start on the first
+    ``submit`` and close their database connections after every batch. With
+    ``shutdown_timeout`` set, interpreter exit waits that long for queued items.
+    A handler may return how many items of the batch it had to drop; those count
+    as ``dropped`` instead of ``processed``.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[list], None],
+        *,
+        workers: int = 2,
+        batch_size: int = 32,
+        max_wait_seconds: float = 0.25,
+        name: str = "team5-batch",
+        shutdown_timeout: float | None = None,
+    ):
+        self.handler = handler
+        self.workers = max(1, int(workers))
+        self.batch_size = max(1, int(batch_size))
+        self.max_wait_seconds = max(0.0, float(max_wait_seconds))
+        self.name = name
+        self.shutdown_timeout = shutdown_timeout
+        self._queue: queue.Queue = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.max_queued = 0
+        self.flush_seconds_total = 0.0
+        self.flush_seconds_max = 0.0
+        self.last_flush_seconds = 0.0
+        self.last_queue_wait_seconds = 0.0
+
+    def submit(self, item) -> None:
+        self._ensure_started()
+        self._queue.put((time.monotonic(), item))
+        queued = self._queue.qsize()
+        if queued > self.max_queued:
+            self.max_queued = queued
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Wait until every submitted item was handled; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._threads),
+            "queued": self._queue.qsize(),
+            "maxQueued": self.max_queued,
+            "batches": self.batches,
+            "processed": self.processed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "lastFlushSeconds": round(self.last_flush_seconds, 6),
+            "avgFlushSeconds": round(self.flush_seconds_total / self.batches, 6) if self.batches else 0.0,
+            "maxFlushSeconds": round(self.flush_seconds_max, 6),
+            "lastQueueWaitSeconds": round(self.last_queue_wait_seconds, 6),
+        }
+
+    def _ensure_started(self) -> None:
+        if self._threads:
+            return
+        with self._start_lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"{self.name}-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            if self.shutdown_timeout is not None:
+                atexit.register(self._drain_at_exit)
+
+    def _drain_at_exit(self) -> None:
+        if not self.join(timeout=self.shutdown_timeout):
+            logger.error("%s exited with %d items still queued", self.name, self._queue.unfinished_tasks)
+
+    def _run(self) -> None:
+        while True:
+            entries = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait_seconds
+            while len(entries) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    entries.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            batch = [item for _, item in entries]
+            failed = False
+            dropped = 0
+            started = time.monotonic()
+            try:
+                result = self.handler(batch)
+                if isinstance(result, int):
+                    dropped = min(max(0, result), len(batch))
+            except Exception:
+                failed = True
+                logger.exception("%s handler failed for %d items", self.name, len(batch))
+            finally:
+                connections.close_all()
+                finished = time.monotonic()
+                with self._stats_lock:
+                    self.batches += 1
+                    if failed:
+                        self.failed += len(batch)
+                    else:
+                        self.processed += len(batch) - dropped
+                        self.dropped += dropped
+                    self.last_flush_seconds = finished - started
+                    self.flush_seconds_total += self.last_flush_seconds
+                    self.flush_seconds_max = max(self.flush_seconds_max, self.last_flush_seconds)
+                    self.last_queue_wait_seconds = started - entries[0][0]
+                for _ in entries:
+                    self._queue.task_done()
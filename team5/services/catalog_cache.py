@@ -0,0 +1,127 @@
+"""In-process snapshot of the media/place catalog plus the indexes built on it."""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from .contracts import CityAliasRecord, CityRecord, MediaRecord, PlaceRecord
+from .city_resolver import CityResolver
+from .data_provider import DataProvider
+from .spatial_index import SpatialIndex
+
+
+DEFAULT_MAX_AGE_SECONDS = 300.0
+DEFAULT_VERSION_CHECK_SECONDS = 2.0
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Read-only view of the catalog; callers copy records before mutating them."""
+
+    version: Any
+    media: list[MediaRecord]
+    places: list[PlaceRecord]
+    media_by_id: dict[str, MediaRecord]
+    place_by_id: dict[str, PlaceRecord]
+    keywords_by_media: dict[str, frozenset[str]]
+    cities: list[CityRecord] = field(default_factory=list)
+    city_aliases: list[CityAliasRecord] = field(default_factory=list)
+    built_at: float = field(default_factory=time.monotonic)
+    _derived: dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+
+    def city_index(self) -> SpatialIndex:
+        return self._derive("city_index", lambda: SpatialIndex.from_records(self.cities))
+
+    def place_index(self) -> SpatialIndex:
+        return self._derive("place_index", lambda: SpatialIndex.from_records(self.places))
+
+    def city_resolver(self) -> CityResolver:
+        return self._derive("city_resolver", lambda: CityResolver(self.cities, self.city_aliases, index=self.city_index()))
+
+    def _derive(self, name: str, build: Callable[[], Any]) -> Any:
+        # Built on first use and dropped with the snapshot when the catalog version changes.
+        value = self._derived.get(name)
+        if value is None:
+            value = self._derived.setdefault(name, build())
+        return value
+
+
+class CatalogCache:
+    """Rebuilds the snapshot only when ``provider.get_catalog_version()`` changes.
+
+    Providers without a cheap version (``None``) are rebuilt on every call. The
+    version itself is checked at most once per ``version_check_seconds``, so a
+    request calling ``get()`` several times pays for those queries at most once.
+    Even with a stable version the snapshot is refreshed after ``max_age_seconds``
+    so in-place edits that the version cannot see still show up eventually.
+    """
+
+    def __init__(
+        self,
+        provider: DataProvider,
+        keyword_extractor: Callable[[str], set[str]],
+        *,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+        version_check_seconds: float = DEFAULT_VERSION_CHECK_SECONDS,
+    ):
+        self.provider = provider
+        self.keyword_extractor = keyword_extractor
+        self.max_age_seconds = max_age_seconds
+        self.version_check_seconds = version_check_seconds
+        self._snapshot: CatalogSnapshot | None = None
+        self._next_version_check = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if (
+            snapshot is not None
+            and snapshot.version is not None
+            and now < self._next_version_check
+            and now - snapshot.built_at < self.max_age_seconds
+        ):
+            return snapshot
+        version = self.provider.get_catalog_version()
+        self._next_version_check = time.monotonic() + self.version_check_seconds
+        if snapshot is not None and self._is_fresh(snapshot, version):
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or not self._is_fresh(snapshot, version):
+                snapshot = self._build(version)
+                self._snapshot = snapshot
+        return snapshot
+
+    def invalidate(self) -> None:
+        self._snapshot = None
+        self._next_version_check = 0.0
+
+    def _is_fresh(self, snapshot: CatalogSnapshot, version: Any) -> bool:
+        if version is None or snapshot.version != version:
+            return False
+        return time.monotonic() - snapshot.built_at < self.max_age_seconds
+
+    def _build(self, version: Any) -> CatalogSnapshot:
+        cities = list(self.provider.get_cities())
+        city_aliases = list(self.provider.get_city_aliases())
+        places = list(self.provider.get_all_places())
+        media = list(self.provider.get_media())
+        place_by_id = {place["placeId"]: place for place in places}
+        keywords_by_media = {
+            item["mediaId"]: frozenset(self.keyword_extractor(f"{item.get('title', '')} {item.get('caption', '')}"))
+            for item in media
+        }
+        return CatalogSnapshot(
+            version=version,
+            media=media,
+            places=places,
+            media_by_id={item["mediaId"]: item for item in media},
+            place_by_id=place_by_id,
+            keywords_by_media=keywords_by_media,
+            cities=cities,
+            city_aliases=city_aliases,
+        )
@@ -0,0 +1,82 @@
+"""Constant-time city lookup by id, English name, Persian name or alias.
+
+Every key is normalized once when the resolver is built: NFKC, case-folded,
+Latin diacritics removed, Arabic letter forms mapped to their Persian
+equivalents and separators dropped. ``"Eşfahān"``, ``"esfahan"``, ``"اصفهان"``
+and ``"isfahan"`` all land on the same city. Coordinates that match no name
+fall back to the catalog's spatial index.
+"""
+
+from __future__ import annotations
+
+import unicodedata
+from collections.abc import Iterable
+
+from .spatial_index import SpatialIndex
+
+# Arabic code points that Persian text and geolocation feeds use interchangeably.
+_PERSIAN_FORMS = str.maketrans(
+    {
+        "ي": "ی",  # ARABIC YEH -> FARSI YEH
+        "ى": "ی",  # ALEF MAKSURA -> FARSI YEH
+        "ك": "ک",  # ARABIC KAF -> KEHEH
+        "ة": "ه",  # TEH MARBUTA -> HEH
+        "أ": "ا",  # ALEF WITH HAMZA ABOVE -> ALEF
+        "إ": "ا",  # ALEF WITH HAMZA BELOW -> ALEF
+        "آ": "ا",  # ALEF WITH MADDA ABOVE -> ALEF
+    }
+)
+
+
+def normalize_city_name(value: str) -> str:
+    text = unicodedata.normalize("NFKC", str(value or "")).translate(_PERSIAN_FORMS).casefold()
+    # Decomposing strips Latin accents and Arabic short vowels (both are combining marks).
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if char.isalnum())
+
+
+class CityResolver:
+    def __init__(
+        self,
+        cities: Iterable[dict],
+        aliases: Iterable[dict] = (),
+        *,
+        index: SpatialIndex | None = None,
+    ):
+        self.cities = list(cities)
+        by_id = {str(city.get("cityId", "")).strip().lower(): city for city in self.cities}
+        self._by_id = by_id
+        self._by_name: dict[str, dict] = {}
+        # Aliases first so a city's own id and name win over another city's alias.
+        for alias in aliases:
+            city = by_id.get(str(alias.get("cityId", "")).strip().lower())
+            if city is not None:
+                self._add_name(alias.get("alias", ""), city)
+        for city in self.cities:
+            self._add_name(city.get("cityName", ""), city)
+            self._add_name(city.get("cityId", ""), city)
+        self._index = index
+
+    @property
+    def index(self) -> SpatialIndex:
+        if self._index is None:
+            self._index = SpatialIndex.from_records(self.cities)
+        return self._index
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def by_id(self, city_id: str) -> dict | None:
+        return self._by_id.get(str(city_id or "").strip().lower())
+
+    def by_name(self, name: str) -> dict | None:
+        return self._by_name.get(normalize_city_name(name))
+
+    def nearest(self, latitude: float, longitude: float, *, max_distance_km: float | None = None) -> dict | None:
+        matches = self.index.nearest(latitude, longitude, k=1, max_distance_km=max_distance_km)
+        return matches[0][0] if matches else None
+
+    def _add_name(self, name: str, city: dict) -> None:
+        key = normalize_city_name(name)
+        if key:
+            self._by_name[key] = city
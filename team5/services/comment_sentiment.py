@@ -0,0 +1,79 @@
+"""Background sentiment scoring for user comments.
+
+Comment writes store ``neutral`` with ``sentiment_pending=True`` and enqueue the
+comment id; ``classify_pending_comments`` later scores the bodies in batches
+through the cached ``SentimentService``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+
+from team5.models import Team5MediaComment
+
+from .comment_signals import rebuild_comment_signals
+from .ml.text_sentiment import label_for_score
+from .sentiment_service import SentimentService, sentiment_service as default_sentiment_service
+
+DEFAULT_BATCH_SIZE = 32
+
+
+def classify_pending_comments(
+    comment_ids: Iterable[int] | None = None,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    sentiment: SentimentService | None = None,
+) -> set[str]:
+    """Score pending comments (all of them, or only ``comment_ids``); returns the affected user ids.
+
+    The stored comment signal of every affected user is rebuilt before returning.
+
+    Nothing is written while no classifier is installed, so the rows stay
+    pending until one is. A row edited again after it was read keeps its new
+    pending state because updates are conditioned on ``updated_at``.
+    """
+    sentiment = sentiment or default_sentiment_service
+    if not sentiment.classifier_available():
+        return set()
+
+    pending = Team5MediaComment.objects.filter(sentiment_pending=True).only("id", "user_id", "body", "updated_at")
+    if comment_ids is not None:
+        pending = pending.filter(id__in=list(comment_ids))
+
+    touched: set[str] = set()
+    batch: list[Team5MediaComment] = []
+    for comment in pending.order_by("id").iterator(chunk_size=max(1, batch_size)):
+        batch.append(comment)
+        if len(batch) >= batch_size:
+            touched |= _score_batch(batch, sentiment)
+            batch = []
+    if batch:
+        touched |= _score_batch(batch, sentiment)
+    rebuild_comment_signals(touched)
+    return touched
+
+
+def _score_batch(comments: list[Team5MediaComment], sentiment: SentimentService) -> set[str]:
+    scores = sentiment.score_many(comment.body for comment in comments)
+    touched: set[str] = set()
+    for comment in comments:
+        score = float(scores.get(comment.body, 0.0))
+        updated = Team5MediaComment.objects.filter(
+            pk=comment.pk,
+            sentiment_pending=True,
+            updated_at=comment.updated_at,
+        ).update(sentiment_score=score, sentiment_label=label_for_score(score), sentiment_pending=False)
+        if updated:
+            touched.add(str(comment.user_id))
+    return touched
+
+
+def comment_batch_handler(on_classified: Callable[[set[str]], None]) -> Callable[[list[int]], None]:
+    """Build a ``BatchWorkerPool`` handler that scores the queued ids and reports touched users."""
+
+    def handle(comment_ids: list[int]) -> None:
+        touched = classify_pending_comments(comment_ids)
+        if touched:
+            on_classified(touched)
+
+    return handle
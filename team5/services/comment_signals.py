@@ -0,0 +1,107 @@
+"""Precomputed per-user comment sentiment signal.
+
+Personalized recommendations only need the media ids a user commented on
+positively/negatively plus a short snippet of each positive comment. Those are
+kept in ``Team5UserCommentSignal`` and rebuilt on the write path, so the read
+path never touches comment bodies.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from uuid import UUID
+
+from django.db import connections, router
+
+from team5.models import Team5MediaComment, Team5UserCommentSignal
+
+SNIPPET_LENGTH = 280
+REBUILD_CHUNK_SIZE = 500
+
+
+def empty_signal() -> dict:
+    return {
+        "positive_media_ids": set(),
+        "negative_media_ids": set(),
+        "positive_comment_by_media": {},
+    }
+
+
+def load_comment_signal(user_id: str) -> dict:
+    user_uuid = _parse_uuid(user_id)
+    if user_uuid is None:
+        return empty_signal()
+    row = (
+        Team5UserCommentSignal.objects.filter(user_id=user_uuid)
+        .values_list("positive_media_ids", "negative_media_ids", "positive_snippets")
+        .first()
+    )
+    if row is None:
+        return empty_signal()
+    positive, negative, snippets = row
+    return {
+        "positive_media_ids": set(positive),
+        "negative_media_ids": set(negative),
+        "positive_comment_by_media": dict(snippets),
+    }
+
+
+def rebuild_comment_signals(user_ids: Iterable) -> None:
+    """Recompute the stored signal of ``user_ids`` from their scored comments."""
+    user_uuids = sorted({uuid for uuid in (_parse_uuid(user_id) for user_id in user_ids) if uuid is not None})
+    for start in range(0, len(user_uuids), REBUILD_CHUNK_SIZE):
+        _rebuild_chunk(user_uuids[start : start + REBUILD_CHUNK_SIZE])
+
+
+def rebuild_all_comment_signals() -> int:
+    """Drop every stored signal and rebuild it for users that have comments; returns the user count."""
+    Team5UserCommentSignal.objects.all().delete()
+    user_ids = list(Team5MediaComment.objects.values_list("user_id", flat=True).distinct())
+    rebuild_comment_signals(user_ids)
+    return len(user_ids)
+
+
+def _rebuild_chunk(user_uuids: list[UUID]) -> None:
+    signals = {user_uuid: ([], [], {}) for user_uuid in user_uuids}
+    rows = (
+        Team5MediaComment.objects.filter(user_id__in=user_uuids, sentiment_label__in=("positive", "negative"))
+        .order_by("user_id", "-updated_at", "-created_at", "-id")
+        .values_list("user_id", "media_id", "sentiment_label", "body")
+    )
+    for user_uuid, media_id, label, body in rows:
+        positive, negative, snippets = signals[user_uuid]
+        media_id = str(media_id)
+        if label == "negative":
+            negative.append(media_id)
+            continue
+        positive.append(media_id)
+        snippet = str(body or "").strip()[:SNIPPET_LENGTH]
+        if snippet:
+            snippets.setdefault(media_id, snippet)
+
+    # MySQL upserts on any unique key (ON DUPLICATE KEY UPDATE) and rejects an explicit conflict target.
+    features = connections[router.db_for_write(Team5UserCommentSignal)].features
+    unique_fields = ["user_id"] if features.supports_update_conflicts_with_target else None
+    Team5UserCommentSignal.objects.bulk_create(
+        [
+            Team5UserCommentSignal(
+                user_id=user_uuid,
+                positive_media_ids=positive,
+                negative_media_ids=negative,
+                positive_snippets=snippets,
+            )
+            for user_uuid, (positive, negative, snippets) in signals.items()
+        ],
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=["positive_media_ids", "negative_media_ids", "positive_snippets", "updated_at"],
+    )
+
+
+def _parse_uuid(value) -> UUID | None:
+    if isinstance(value, UUID):
+        return value
+    try:
+        return UUID(str(value).strip()) if value else None
+    except (ValueError, TypeError):
+        return None
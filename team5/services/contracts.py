@@ -15,6 +15,12 @@ class CityRecord(TypedDict):
     coordinates: list[float]
 
 
+class CityAliasRecord(TypedDict):
+    cityId: str
+    alias: str
+    language: str
+
+
 class PlaceRecord(TypedDict):
     placeId: str
     cityId: str
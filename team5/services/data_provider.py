@@ -1,8 +1,9 @@
 """Provider abstraction for Team5 data sources."""
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
 
-from .contracts import CityRecord, MediaRecord, PlaceRecord, UserMediaRatingRecord, UserPlaceRatingRecord
+from .contracts import CityAliasRecord, CityRecord, MediaRecord, PlaceRecord, UserMediaRatingRecord, UserPlaceRatingRecord
 
 
 class DataProvider(ABC):
@@ -31,3 +32,20 @@ class DataProvider(ABC):
     @abstractmethod
     def get_all_place_ratings(self) -> list[UserPlaceRatingRecord]:
         raise NotImplementedError
+
+    def get_city_aliases(self) -> list[CityAliasRecord]:
+        """Alternative city names (Persian names, spelling variants); none by default."""
+        return []
+
+    def get_catalog_version(self):
+        """Cheap fingerprint of the catalog; ``None`` means callers cannot cache it."""
+        return None
+
+    def iter_media_rating_rows(self, chunk_size: int = 50_000) -> Iterator[tuple[str, str, float]]:
+        """Yield ``(userId, mediaId, rate)`` rows; database providers stream them in chunks."""
+        for row in self.get_all_media_ratings():
+            yield row["userId"], row["mediaId"], row["rate"]
+
+    def iter_feedback_rows(self, chunk_size: int = 50_000) -> Iterator[tuple[str, bool, list[str]]]:
+        """Yield ``(userId, liked, shownMediaIds)`` recommendation feedback rows; none by default."""
+        return iter(())
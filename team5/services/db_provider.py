@@ -1,15 +1,20 @@
 """Database-backed provider for Team5 recommendation data."""
 
-from django.db.models import Avg, Count
+from collections.abc import Iterator
 
-from team5.models import Team5City, Team5Media, Team5MediaRating, Team5Place
+from django.db.models import Avg, Count, Max, Sum
 
-from .contracts import CityRecord, MediaRecord, PlaceRecord, UserMediaRatingRecord, UserPlaceRatingRecord
+from team5.models import Team5City, Team5CityAlias, Team5Media, Team5MediaRating, Team5Place, Team5RecommendationFeedback
+
+from .contracts import CityAliasRecord, CityRecord, MediaRecord, PlaceRecord, UserMediaRatingRecord, UserPlaceRatingRecord
 from .data_provider import DataProvider
-from .ml.text_sentiment import TextSentiment
+from .sentiment_service import SentimentService, sentiment_service as default_sentiment_service
 
 
 class DatabaseProvider(DataProvider):
+    def __init__(self, sentiment_service: SentimentService | None = None):
+        self.sentiment_service = sentiment_service or default_sentiment_service
+
     def get_cities(self) -> list[CityRecord]:
         rows = Team5City.objects.all().order_by("city_name")
         return [
@@ -21,6 +26,10 @@ class DatabaseProvider(DataProvider):
             for row in rows
         ]
 
+    def get_city_aliases(self) -> list[CityAliasRecord]:
+        rows = Team5CityAlias.objects.order_by("city_id", "alias").values_list("city_id", "alias", "language")
+        return [{"cityId": city_id, "alias": alias, "language": language} for city_id, alias, language in rows]
+
     def get_city_places(self, city_id: str) -> list[PlaceRecord]:
         rows = Team5Place.objects.filter(city_id=city_id).order_by("place_name")
         return [self._place_to_record(row) for row in rows]
@@ -63,6 +72,20 @@ class DatabaseProvider(DataProvider):
             )
         return output
 
+    def get_catalog_version(self) -> tuple:
+        media = Team5Media.objects.aggregate(count=Count("media_id"), latest=Max("created_at"))
+        ratings = Team5MediaRating.objects.aggregate(count=Count("id"), latest=Max("updated_at"), total=Sum("rate"))
+        return (
+            media["count"],
+            media["latest"],
+            ratings["count"],
+            ratings["latest"],
+            ratings["total"],
+            Team5Place.objects.count(),
+            Team5City.objects.count(),
+            Team5CityAlias.objects.count(),
+        )
+
     def get_all_media_ratings(self) -> list[UserMediaRatingRecord]:
         rows = Team5MediaRating.objects.all()
         output: list[UserMediaRatingRecord] = []
@@ -76,30 +99,45 @@ class DatabaseProvider(DataProvider):
             )
         return output
 
+    def iter_media_rating_rows(self, chunk_size: int = 50_000) -> Iterator[tuple[str, str, float]]:
+        return (
+            Team5MediaRating.objects.values_list("user_id", "media_id", "rate")
+            .order_by()
+            .iterator(chunk_size=chunk_size)
+        )
+
+    def iter_feedback_rows(self, chunk_size: int = 50_000) -> Iterator[tuple[str, bool, list[str]]]:
+        return (
+            Team5RecommendationFeedback.objects.values_list("user_id", "liked", "shown_media_ids")
+            .order_by()
+            .iterator(chunk_size=chunk_size)
+        )
+
     def get_all_place_ratings(self) -> list[UserPlaceRatingRecord]:
         media_map = {
             m.media_id: {
                 "place_id": m.place_id,
                 "title": m.title,
             }
-            for m in Team5Media.objects.select_related("place").all()
+            for m in Team5Media.objects.only("media_id", "place_id", "title")
         }
-        ratings = Team5MediaRating.objects.all()
-        text_sentiment = TextSentiment()
+        # One classification per distinct title, served from the persistent cache afterwards.
+        title_sentiment = self.sentiment_service.score_many({media["title"] for media in media_map.values()})
+        ratings = Team5MediaRating.objects.values_list("user_id", "media_id", "rate").iterator()
         output: list[UserPlaceRatingRecord] = []
 
-        for rating in ratings:
-            media = media_map.get(rating.media_id)
+        for user_id, media_id, rate in ratings:
+            media = media_map.get(media_id)
             if media is None:
                 continue
 
-            media_place_rate = text_sentiment.sentiment(media["title"])
-            user_media_rate = rating.rate - 2.5
+            media_place_rate = title_sentiment.get(media["title"], 0.0)
+            user_media_rate = rate - 2.5
             user_place_rate = 2.5 + user_media_rate * media_place_rate
 
             output.append(
                 {
-                    "userId": str(rating.user_id),
+                    "userId": str(user_id),
                     "placeId": media["place_id"],
                     "rate": float(user_place_rate),
                 }
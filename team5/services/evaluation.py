@@ -0,0 +1,466 @@
+"""Offline evaluation of recommendation strategies on time-based folds.
+
+Ratings, feedback and comments are loaded once in the parent process and cut
+into expanding-window folds by timestamp: every fold trains on everything
+before its cutoff and is scored on the following window. Fold payloads are
+plain Python data, so folds and SVD hyperparameter grids can be evaluated in a
+process pool without workers touching the database.
+"""
+
+from __future__ import annotations
+
+import math
+import multiprocessing
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import product
+from pathlib import Path
+
+from django.db import connections
+from django.utils import timezone
+
+from team5.models import Team5MediaComment, Team5MediaRating, Team5RecommendationFeedback
+
+from .contracts import PERSONALIZED_MIN_USER_RATE, CityRecord, MediaRecord, PlaceRecord
+from .data_provider import DataProvider
+from .db_provider import DatabaseProvider
+from .feedback_archive import iter_archived_feedback
+from .recommendation_service import RecommendationService
+
+
+STRATEGIES = ("svd", "popular", "similar", "hybrid")
+# Feedback action whose latest dislike excludes items for each evaluated strategy.
+EXCLUSION_ACTION_BY_STRATEGY = {
+    "svd": "personalized",
+    "popular": "popular",
+    "similar": "personalized",
+    "hybrid": "personalized",
+}
+
+
+@dataclass(frozen=True)
+class EvaluationConfig:
+    folds: int = 3
+    k: int = 10
+    min_train_fraction: float = 0.6
+    max_users_per_fold: int = 500
+    workers: int = 1
+    svd_grid: dict[str, list] = field(default_factory=lambda: {"n_factors": [100], "n_epochs": [20]})
+
+
+@dataclass
+class EvaluationData:
+    cities: list[CityRecord]
+    places: list[PlaceRecord]
+    media: list[MediaRecord]
+    ratings: list[tuple[str, str, float, datetime]]
+    feedback: list[tuple[str, str, bool, list[str], datetime]]
+    comments: list[tuple[str, str, str, str, datetime]]
+
+
+def load_evaluation_data(
+    provider: DataProvider | None = None,
+    *,
+    archive_dir: str | Path | None = None,
+) -> EvaluationData:
+    """Snapshot the catalog and event tables; ``archive_dir`` adds feedback moved to the archive."""
+    provider = provider or DatabaseProvider()
+    ratings = [
+        (str(user_id), str(media_id), float(rate), created_at)
+        for user_id, media_id, rate, created_at in Team5MediaRating.objects.values_list(
+            "user_id", "media_id", "rate", "created_at"
+        ).iterator()
+    ]
+    feedback = [
+        (str(user_id), str(action or "").strip().lower(), bool(liked), list(shown or []), created_at)
+        for user_id, action, liked, shown, created_at in Team5RecommendationFeedback.objects.values_list(
+            "user_id", "action", "liked", "shown_media_ids", "created_at"
+        ).iterator()
+    ]
+    if archive_dir is not None:
+        feedback.extend(
+            (
+                event["userId"],
+                str(event["action"] or "").strip().lower(),
+                bool(event["liked"]),
+                list(event["shownMediaIds"] or []),
+                event["createdAt"],
+            )
+            for event in iter_archived_feedback(archive_dir)
+        )
+    comments = [
+        (str(user_id), str(media_id), str(label or ""), str(body or ""), updated_at)
+        for user_id, media_id, label, body, updated_at in Team5MediaComment.objects.values_list(
+            "user_id", "media_id", "sentiment_label", "body", "updated_at"
+        ).iterator()
+    ]
+    return EvaluationData(
+        cities=provider.get_cities(),
+        places=provider.get_all_places(),
+        media=[_strip_media_stats(item) for item in provider.get_media()],
+        ratings=ratings,
+        feedback=feedback,
+        comments=comments,
+    )
+
+
+def build_time_folds(data: EvaluationData, config: EvaluationConfig) -> list[dict]:
+    """Expanding-window folds: fold ``f`` tests on the ``f``-th slice after ``min_train_fraction``."""
+    ordered = sorted(data.ratings, key=lambda row: row[3])
+    if len(ordered) < 2:
+        return []
+    n_folds = max(1, int(config.folds))
+    start_fraction = min(max(float(config.min_train_fraction), 0.05), 0.95)
+    positions = [
+        int(len(ordered) * (start_fraction + (1.0 - start_fraction) * step / n_folds))
+        for step in range(n_folds + 1)
+    ]
+    positions[-1] = len(ordered)
+
+    folds: list[dict] = []
+    for fold_idx in range(n_folds):
+        split, stop = positions[fold_idx], positions[fold_idx + 1]
+        if split <= 0 or stop <= split:
+            continue
+        cutoff = ordered[split][3]
+        until = ordered[stop - 1][3]
+        train = [row[:3] for row in ordered[:split]]
+        test = [row[:3] for row in ordered[split:stop]]
+        folds.append(
+            {
+                "fold": fold_idx,
+                "cutoff": cutoff.isoformat(),
+                "until": until.isoformat(),
+                "k": int(config.k),
+                "cities": data.cities,
+                "places": data.places,
+                "media": data.media,
+                "train": train,
+                "test": test,
+                "train_comments": [row[:4] for row in data.comments if row[4] < cutoff],
+                "exclusions": _latest_exclusions([row for row in data.feedback if row[4] < cutoff]),
+                "relevant": _test_relevance(
+                    test, [row for row in data.feedback if cutoff <= row[4] <= until], config.max_users_per_fold
+                ),
+            }
+        )
+    return folds
+
+
+def run_evaluation(data: EvaluationData, config: EvaluationConfig) -> dict:
+    folds = build_time_folds(data, config)
+    grid = _expand_grid(config.svd_grid)
+    tasks: list[tuple[str, dict, dict]] = []
+    for fold in folds:
+        tasks.append(("strategies", fold, grid[0]))
+        tasks.extend(("svd_grid", fold, params) for params in grid[1:])
+
+    started = time.perf_counter()
+    if config.workers > 1 and len(tasks) > 1:
+        # Workers are forked after the data is loaded and never query the database.
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(max_workers=min(config.workers, len(tasks)), mp_context=context) as pool:
+            results = list(pool.map(_run_task, tasks))
+    else:
+        results = [_run_task(task) for task in tasks]
+    elapsed = time.perf_counter() - started
+
+    return _build_report(config, folds, grid, results, elapsed)
+
+
+def _run_task(task: tuple[str, dict, dict]) -> dict:
+    kind, fold, params = task
+    if kind == "strategies":
+        return {"kind": kind, "fold": fold["fold"], "params": params, "metrics": _evaluate_fold(fold, params)}
+    model = _train_svd(fold["train"], params)
+    return {
+        "kind": kind,
+        "fold": fold["fold"],
+        "params": params,
+        "metrics": {"svd": _evaluate_svd(fold, model)},
+    }
+
+
+def _evaluate_fold(fold: dict, params: dict) -> dict:
+    model = _train_svd(fold["train"], params)
+    service = _FoldRecommendationService(fold, model)
+    metrics = {"svd": _evaluate_svd(fold, model)}
+    k = fold["k"]
+
+    def popular(user_id: str, excluded: set[str]) -> list[str]:
+        return _ids(service.get_popular(limit=k, excluded_media_ids=excluded))
+
+    def similar(user_id: str, excluded: set[str]) -> list[str]:
+        media_by_id = service.media_by_id
+        seeds = [
+            media_by_id[media_id]
+            for media_id, rate in service.ratings_by_user.get(user_id, {}).items()
+            if rate >= PERSONALIZED_MIN_USER_RATE and media_id in media_by_id
+        ]
+        return _ids(service.get_similar_items(user_id=user_id, based_on_items=seeds, excluded_media_ids=excluded, limit=k))
+
+    def hybrid(user_id: str, excluded: set[str]) -> list[str]:
+        return _ids(service.get_personalized(user_id=user_id, limit=k, excluded_media_ids=excluded))
+
+    for name, recommend in (("popular", popular), ("similar", similar), ("hybrid", hybrid)):
+        metrics[name] = _evaluate_ranking(fold, name, recommend)
+    return metrics
+
+
+def _evaluate_svd(fold: dict, model) -> dict:
+    k = fold["k"]
+
+    def recommend(user_id: str, excluded: set[str]) -> list[str]:
+        if model is None:
+            return []
+        ranked = model.recommend(user_id, top_n=k + len(excluded))
+        return [media_id for media_id, _ in ranked if media_id not in excluded][:k]
+
+    metrics = _evaluate_ranking(fold, "svd", recommend)
+    if model is not None and fold["test"]:
+        squared = [(model.predict_rating(u, m).est - rate) ** 2 for u, m, rate in fold["test"]]
+        metrics["rmse"] = round(math.sqrt(sum(squared) / len(squared)), 4)
+    else:
+        metrics["rmse"] = None
+    return metrics
+
+
+def _evaluate_ranking(fold: dict, strategy: str, recommend) -> dict:
+    k = fold["k"]
+    action = EXCLUSION_ACTION_BY_STRATEGY[strategy]
+    precisions: list[float] = []
+    recalls: list[float] = []
+    ndcgs: list[float] = []
+    latencies: list[float] = []
+    recommended_ids: set[str] = set()
+
+    for user_id, relevant in fold["relevant"].items():
+        excluded = set(fold["exclusions"].get((user_id, action), []))
+        started = time.perf_counter()
+        ranked = recommend(user_id, excluded)[:k]
+        latencies.append((time.perf_counter() - started) * 1000.0)
+        recommended_ids.update(ranked)
+        hits = [1.0 if media_id in relevant else 0.0 for media_id in ranked]
+        precisions.append(sum(hits) / k)
+        recalls.append(sum(hits) / len(relevant))
+        ideal = sum(1.0 / math.log2(rank + 2) for rank in range(min(k, len(relevant))))
+        dcg = sum(hit / math.log2(rank + 2) for rank, hit in enumerate(hits))
+        ndcgs.append(dcg / ideal if ideal else 0.0)
+
+    latencies.sort()
+    return {
+        "users": len(precisions),
+        f"precision@{k}": _mean(precisions),
+        f"recall@{k}": _mean(recalls),
+        f"ndcg@{k}": _mean(ndcgs),
+        "catalogCoverage": round(len(recommended_ids) / len(fold["media"]), 4) if fold["media"] else 0.0,
+        "latencyMsMean": _mean(latencies),
+        "latencyMsP95": round(latencies[int(0.95 * (len(latencies) - 1))], 3) if latencies else 0.0,
+    }
+
+
+def _train_svd(train: list[tuple[str, str, float]], params: dict):
+    try:
+        from .ml.recommender_model import RecommenderModel
+    except Exception:  # pragma: no cover - optional ML dependencies
+        return None
+    if not train:
+        return None
+    model = RecommenderModel((0, 5), **params)
+    model.train(train)
+    return model
+
+
+def _build_report(config: EvaluationConfig, folds: list[dict], grid: list[dict], results: list[dict], elapsed: float) -> dict:
+    by_strategy: dict[str, list[dict]] = defaultdict(list)
+    by_params: dict[tuple, list[dict]] = defaultdict(list)
+    for result in results:
+        key = tuple(sorted(result["params"].items()))
+        by_params[key].append(result["metrics"]["svd"])
+        if result["kind"] == "strategies":
+            for name, metrics in result["metrics"].items():
+                by_strategy[name].append(metrics)
+
+    grid_report = [
+        {"params": dict(key), **_average_metrics(metrics)}
+        for key, metrics in by_params.items()
+    ]
+    scored = [entry for entry in grid_report if entry.get("rmse") is not None]
+    best = min(scored, key=lambda entry: entry["rmse"]) if scored else None
+
+    return {
+        "generatedAt": timezone.now().isoformat(),
+        "elapsedSeconds": round(elapsed, 3),
+        "config": {
+            "folds": config.folds,
+            "k": config.k,
+            "minTrainFraction": config.min_train_fraction,
+            "maxUsersPerFold": config.max_users_per_fold,
+            "workers": config.workers,
+            "svdGrid": config.svd_grid,
+        },
+        "folds": [
+            {
+                "fold": fold["fold"],
+                "cutoff": fold["cutoff"],
+                "until": fold["until"],
+                "trainRatings": len(fold["train"]),
+                "testRatings": len(fold["test"]),
+                "evaluatedUsers": len(fold["relevant"]),
+            }
+            for fold in folds
+        ],
+        "strategies": {name: _average_metrics(by_strategy[name]) for name in STRATEGIES if by_strategy.get(name)},
+        "svdGrid": grid_report,
+        "bestSvdParams": best["params"] if best else None,
+    }
+
+
+class _FoldRecommendationService(RecommendationService):
+    """RecommendationService reading one fold's training window instead of the database."""
+
+    def __init__(self, fold: dict, model):
+        ratings_by_user: dict[str, dict[str, float]] = defaultdict(dict)
+        for user_id, media_id, rate in fold["train"]:
+            ratings_by_user[user_id][media_id] = rate
+        self.ratings_by_user = ratings_by_user
+        provider = _SnapshotProvider(fold["cities"], fold["places"], fold["media"], fold["train"])
+        super().__init__(provider)
+        self.media_by_id = {item["mediaId"]: item for item in provider.get_media()}
+        self.personalized_media_recommender_model = model
+        self._ml_enabled = model is not None
+        self._models_ready = model is not None
+
+        comments: dict[str, list[tuple[str, str, str]]] = defaultdict(list)
+        for user_id, media_id, label, body in fold["train_comments"]:
+            comments[user_id].append((media_id, label, body))
+        self._comments_by_user = comments
+
+    def train(self, *, budget_seconds: float | None = None):
+        return self._models_ready
+
+    def _get_db_ratings_by_media(self, user_id: str) -> dict[str, float]:
+        return dict(self.ratings_by_user.get(str(user_id), {}))
+
+    def _get_comment_sentiment_signal(self, *, user_id: str) -> dict:
+        positive: set[str] = set()
+        negative: set[str] = set()
+        positive_comment_by_media: dict[str, str] = {}
+        for media_id, label, body in self._comments_by_user.get(str(user_id), []):
+            label = label.strip().lower()
+            if label == "positive":
+                positive.add(media_id)
+                positive_comment_by_media.setdefault(media_id, body.strip())
+            elif label == "negative":
+                negative.add(media_id)
+        return {
+            "positive_media_ids": positive,
+            "negative_media_ids": negative,
+            "positive_comment_by_media": positive_comment_by_media,
+        }
+
+
+class _SnapshotProvider(DataProvider):
+    def __init__(self, cities, places, media, train):
+        totals: dict[str, list[float]] = defaultdict(lambda: [0.0, 0])
+        for _, media_id, rate in train:
+            totals[media_id][0] += rate
+            totals[media_id][1] += 1
+        self._cities = cities
+        self._places = places
+        self._media = []
+        for item in media:
+            total, count = totals.get(item["mediaId"], (0.0, 0))
+            record = dict(item)
+            record["overallRate"] = round(total / count, 2) if count else 0.0
+            record["ratingsCount"] = int(count)
+            self._media.append(record)
+        self._train = train
+
+    def get_cities(self):
+        return list(self._cities)
+
+    def get_city_places(self, city_id):
+        return [place for place in self._places if place["cityId"] == city_id]
+
+    def get_all_places(self):
+        return list(self._places)
+
+    def get_media(self):
+        return [dict(item) for item in self._media]
+
+    def get_all_media_ratings(self):
+        return [{"userId": u, "mediaId": m, "rate": r} for u, m, r in self._train]
+
+    def get_all_place_ratings(self):
+        return []
+
+    def get_catalog_version(self):
+        # Fold snapshots never change, so the service may cache them for the whole run.
+        return "snapshot"
+
+
+def _strip_media_stats(item: MediaRecord) -> MediaRecord:
+    record = dict(item)
+    record["overallRate"] = 0.0
+    record["ratingsCount"] = 0
+    record["userRatings"] = []
+    return record
+
+
+def _latest_exclusions(feedback: list[tuple]) -> dict[tuple[str, str], list[str]]:
+    """Mirror views._load_excluded_media_ids: only the latest event per (user, action) counts."""
+    latest: dict[tuple[str, str], tuple] = {}
+    for row in sorted(feedback, key=lambda row: row[4]):
+        latest[(row[0], row[1])] = row
+    return {
+        key: [str(media_id).strip() for media_id in row[3] if str(media_id).strip()]
+        for key, row in latest.items()
+        if not row[2]
+    }
+
+
+def _test_relevance(test: list[tuple], feedback: list[tuple], max_users: int) -> dict[str, set[str]]:
+    relevant: dict[str, set[str]] = defaultdict(set)
+    for user_id, media_id, rate in test:
+        if rate >= PERSONALIZED_MIN_USER_RATE:
+            relevant[user_id].add(media_id)
+    for user_id, _, liked, shown, _ in feedback:
+        if liked:
+            relevant[user_id].update(str(media_id).strip() for media_id in shown if str(media_id).strip())
+    users = sorted(user_id for user_id, items in relevant.items() if items)
+    if max_users and len(users) > max_users:
+        users = users[:max_users]
+    return {user_id: relevant[user_id] for user_id in users}
+
+
+def _expand_grid(grid: dict[str, list]) -> list[dict]:
+    if not grid:
+        return [{}]
+    keys = sorted(grid)
+    return [dict(zip(keys, values)) for values in product(*(grid[key] for key in keys))]
+
+
+def _average_metrics(rows: list[dict]) -> dict:
+    if not rows:
+        return {}
+    output: dict = {}
+    for key in rows[0]:
+        values = [row[key] for row in rows if row.get(key) is not None]
+        if key == "users":
+            output[key] = int(sum(values))
+        else:
+            output[key] = _mean(values) if values else None
+    return output
+
+
+def _mean(values: list[float]) -> float:
+    return round(sum(values) / len(values), 4) if values else 0.0
+
+
+def _ids(items: list[dict]) -> list[str]:
+    return [str(item["mediaId"]) for item in items]
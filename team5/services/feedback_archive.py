@@ -0,0 +1,167 @@
+"""Append-only NDJSON.gz archive of old recommendation feedback.
+
+``archive_feedback`` moves rows older than the retention window out of
+``Team5RecommendationFeedback`` into one ``feedback-YYYY-MM-DD.ndjson.gz``
+segment per day. Each run appends a new gzip member, so segments are never
+rewritten. ``manifest.json`` records the rows and the last archived id per day;
+rows are only deleted after their segment was fsynced and the manifest
+replaced, and a re-run skips ids the manifest already covers.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import tempfile
+from collections.abc import Iterator
+from datetime import date, datetime, time, timedelta
+from itertools import chain
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from team5.models import Team5RecommendationFeedback
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_FORMAT = 1
+SEGMENT_TEMPLATE = "feedback-{day}.ndjson.gz"
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def configured_archive_dir() -> Path | None:
+    archive_dir = str(getattr(settings, "TEAM5_FEEDBACK_ARCHIVE_DIR", "") or "").strip()
+    return Path(archive_dir) if archive_dir else None
+
+
+def read_manifest(archive_dir: str | Path) -> dict:
+    path = Path(archive_dir) / MANIFEST_NAME
+    if not path.exists():
+        return {"format": MANIFEST_FORMAT, "segments": {}}
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    if manifest.get("format") != MANIFEST_FORMAT:
+        raise ValueError(f"Unsupported feedback archive manifest format: {manifest.get('format')!r}")
+    return manifest
+
+
+def archive_feedback(
+    *,
+    archive_dir: str | Path,
+    older_than_days: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> dict:
+    """Move feedback created before ``today - older_than_days`` into day segments."""
+    archive_dir = Path(archive_dir)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    manifest = read_manifest(archive_dir)
+    cutoff = timezone.localdate() - timedelta(days=max(0, int(older_than_days)))
+
+    feedback_qs = Team5RecommendationFeedback.objects.using("team5").filter(created_at__lt=_start_of(cutoff))
+    days = list(
+        feedback_qs.annotate(day=TruncDate("created_at")).order_by("day").values_list("day", flat=True).distinct()
+    )
+
+    archived_rows = 0
+    for day in days:
+        day_qs = feedback_qs.filter(
+            created_at__gte=_start_of(day),
+            created_at__lt=_start_of(day + timedelta(days=1)),
+        )
+        segment = manifest["segments"].setdefault(
+            day.isoformat(),
+            {"file": SEGMENT_TEMPLATE.format(day=day.isoformat()), "rows": 0, "lastId": 0},
+        )
+        written, last_id = _append_segment(archive_dir / segment["file"], day_qs, segment["lastId"], chunk_size)
+        if written:
+            segment["rows"] += written
+            segment["lastId"] = last_id
+            _write_manifest(archive_dir, manifest)
+            archived_rows += written
+        # Also clears rows a previous run archived but crashed before deleting.
+        day_qs.filter(id__lte=segment["lastId"]).delete()
+
+    return {"cutoff": cutoff.isoformat(), "days": len(days), "rows": archived_rows}
+
+
+def iter_archived_feedback(
+    archive_dir: str | Path,
+    *,
+    since: date | None = None,
+    until: date | None = None,
+) -> Iterator[dict]:
+    """Stream archived events (oldest day first) for days in ``[since, until]``."""
+    archive_dir = Path(archive_dir)
+    if not (archive_dir / MANIFEST_NAME).exists():
+        return
+    for day_key, segment in sorted(read_manifest(archive_dir)["segments"].items()):
+        day = date.fromisoformat(day_key)
+        if (since is not None and day < since) or (until is not None and day > until):
+            continue
+        path = archive_dir / segment["file"]
+        if not path.exists():
+            continue
+        last_id = 0
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                # Ids only grow within a segment; a repeat means a run crashed before updating the manifest.
+                if event["id"] <= last_id:
+                    continue
+                last_id = event["id"]
+                event["createdAt"] = parse_datetime(event["createdAt"])
+                yield event
+
+
+def _append_segment(path: Path, day_qs, after_id: int, chunk_size: int) -> tuple[int, int]:
+    rows = (
+        day_qs.filter(id__gt=after_id)
+        .order_by("id")
+        .values_list("id", "user_id", "action", "liked", "shown_media_ids", "ab_group", "created_at")
+        .iterator(chunk_size=max(1, chunk_size))
+    )
+    first = next(rows, None)
+    if first is None:
+        return 0, after_id
+
+    written, last_id = 0, after_id
+    with open(path, "ab") as raw:
+        # Every run adds a new gzip member; gzip readers treat the file as one stream.
+        with gzip.GzipFile(fileobj=raw, mode="ab") as segment:
+            for row_id, user_id, action, liked, shown_media_ids, ab_group, created_at in chain([first], rows):
+                event = {
+                    "id": row_id,
+                    "userId": str(user_id),
+                    "action": action,
+                    "liked": liked,
+                    "shownMediaIds": shown_media_ids or [],
+                    "abGroup": ab_group,
+                    "createdAt": created_at.isoformat(),
+                }
+                segment.write((json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8"))
+                written += 1
+                last_id = row_id
+        raw.flush()
+        os.fsync(raw.fileno())
+    return written, last_id
+
+
+def _write_manifest(archive_dir: Path, manifest: dict) -> None:
+    fd, tmp_path = tempfile.mkstemp(prefix=".manifest-", dir=archive_dir)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(manifest, handle, indent=2, sort_keys=True)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, archive_dir / MANIFEST_NAME)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def _start_of(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min))
@@ -0,0 +1,267 @@
+"""Writes and aggregate queries for recommendation feedback.
+
+Every insert also bumps the ``Team5FeedbackDaily`` row of its (day, group,
+action), so the A/B summary reads at most one rollup row per day instead of
+rescanning raw feedback, and refreshes the ``Team5FeedbackExclusion`` row of
+its (user, action) that the strategy endpoints read.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+from uuid import UUID
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from team5.models import Team5FeedbackDaily, Team5FeedbackExclusion, Team5RecommendationFeedback
+
+from .feedback_archive import iter_archived_feedback
+from .hll import HyperLogLog
+
+logger = logging.getLogger(__name__)
+
+AB_GROUPS = ("A", "B")
+DEFAULT_WRITE_BATCH_SIZE = 500
+# Concurrent writers may both insert the first exclusion row of a (user, action).
+EXCLUSION_WRITE_ATTEMPTS = 3
+
+
+def record_feedback(
+    *,
+    user_id: UUID,
+    action: str,
+    liked: bool,
+    shown_media_ids: list[str],
+    ab_group: str,
+) -> Team5RecommendationFeedback:
+    with transaction.atomic(using="team5"):
+        feedback = Team5RecommendationFeedback.objects.using("team5").create(
+            user_id=user_id,
+            action=action,
+            liked=liked,
+            shown_media_ids=shown_media_ids,
+            ab_group=ab_group,
+        )
+        _add_to_daily_rollups([feedback])
+        _update_exclusions([feedback])
+    return feedback
+
+
+def write_feedback_batch(
+    feedback_rows: list[Team5RecommendationFeedback],
+    *,
+    batch_size: int = DEFAULT_WRITE_BATCH_SIZE,
+) -> int:
+    """Insert unsaved feedback rows with ``bulk_create`` and fold them into the rollups in one transaction.
+
+    The rows come from many requests, so a batch that fails is split in halves and
+    retried; only rows that cannot be written on their own are dropped. Returns
+    how many were dropped.
+    """
+    if not feedback_rows:
+        return 0
+    try:
+        with transaction.atomic(using="team5"):
+            created = Team5RecommendationFeedback.objects.using("team5").bulk_create(
+                feedback_rows, batch_size=batch_size
+            )
+            _add_to_daily_rollups(created)
+            _update_exclusions(created)
+        return 0
+    except Exception:
+        if len(feedback_rows) == 1:
+            logger.warning("dropping feedback row that cannot be written", exc_info=True)
+            return 1
+    for feedback in feedback_rows:
+        # The rolled-back insert may have assigned primary keys.
+        feedback.pk = None
+        feedback._state.adding = True
+    middle = len(feedback_rows) // 2
+    return write_feedback_batch(feedback_rows[:middle], batch_size=batch_size) + write_feedback_batch(
+        feedback_rows[middle:], batch_size=batch_size
+    )
+
+
+def _add_to_daily_rollups(feedback_rows: list[Team5RecommendationFeedback]) -> None:
+    grouped: dict[tuple, list[Team5RecommendationFeedback]] = defaultdict(list)
+    for feedback in feedback_rows:
+        grouped[(timezone.localdate(feedback.created_at), feedback.ab_group, feedback.action)].append(feedback)
+
+    for (day, group, action), rows in grouped.items():
+        rollup, _ = (
+            Team5FeedbackDaily.objects.using("team5")
+            .select_for_update()
+            .get_or_create(day=day, ab_group=group, action=action)
+        )
+        sketch = HyperLogLog.from_bytes(rollup.users_sketch)
+        rollup.impressions += len(rows)
+        rollup.likes += sum(1 for row in rows if row.liked)
+        update_fields = ["impressions", "likes", "updated_at"]
+        # Most inserts leave the registers untouched, so the sketch is only rewritten when it changed.
+        sketch_changed = False
+        for row in rows:
+            sketch_changed |= sketch.add(row.user_id)
+        if sketch_changed:
+            rollup.users_sketch = sketch.to_bytes()
+            update_fields.append("users_sketch")
+        rollup.save(update_fields=update_fields)
+
+
+def load_excluded_media_ids(*, user_id: UUID, action: str) -> set[str]:
+    """Media shown in the latest disliked feed of (user, action); one unique-index lookup."""
+    excluded = (
+        Team5FeedbackExclusion.objects.using("team5")
+        .filter(user_id=user_id, action=action)
+        .values_list("excluded_media_ids", flat=True)
+        .first()
+    )
+    return set(excluded or ())
+
+
+def _update_exclusions(feedback_rows: list[Team5RecommendationFeedback]) -> None:
+    latest: dict[tuple, Team5RecommendationFeedback] = {}
+    for feedback in feedback_rows:
+        key = (feedback.user_id, feedback.action)
+        current = latest.get(key)
+        if current is None or feedback.created_at >= current.created_at:
+            latest[key] = feedback
+
+    for attempt in range(EXCLUSION_WRITE_ATTEMPTS):
+        try:
+            # A savepoint, so losing an insert race only rolls back this write and not the feedback rows.
+            with transaction.atomic(using="team5"):
+                _write_exclusions(latest)
+            return
+        except IntegrityError:
+            # Another writer created one of the rows since it was read; the retry sees and locks it.
+            if attempt == EXCLUSION_WRITE_ATTEMPTS - 1:
+                raise
+
+
+def _write_exclusions(latest: dict[tuple, Team5RecommendationFeedback]) -> None:
+    existing = {
+        (exclusion.user_id, exclusion.action): exclusion
+        for exclusion in Team5FeedbackExclusion.objects.using("team5")
+        .select_for_update()
+        .filter(user_id__in={key[0] for key in latest}, action__in={key[1] for key in latest})
+    }
+    to_create, to_update = [], []
+    for key, feedback in latest.items():
+        excluded = [] if feedback.liked else [str(m).strip() for m in feedback.shown_media_ids or [] if str(m).strip()]
+        exclusion = existing.get(key)
+        if exclusion is None:
+            to_create.append(
+                Team5FeedbackExclusion(
+                    user_id=feedback.user_id,
+                    action=feedback.action,
+                    excluded_media_ids=excluded,
+                    feedback_created_at=feedback.created_at,
+                )
+            )
+        elif feedback.created_at >= exclusion.feedback_created_at:
+            exclusion.excluded_media_ids = excluded
+            exclusion.feedback_created_at = feedback.created_at
+            to_update.append(exclusion)
+    Team5FeedbackExclusion.objects.using("team5").bulk_create(to_create, batch_size=DEFAULT_WRITE_BATCH_SIZE)
+    Team5FeedbackExclusion.objects.using("team5").bulk_update(
+        to_update,
+        ["excluded_media_ids", "feedback_created_at", "updated_at"],
+        batch_size=DEFAULT_WRITE_BATCH_SIZE,
+    )
+
+
+def rebuild_daily_rollups(*, since: date | None = None, archive_dir: str | Path | None = None) -> int:
+    """Recompute rollup rows from raw feedback (from ``since`` on, or all); returns the row count.
+
+    Days already moved to the feedback archive are streamed from ``archive_dir``
+    so a rebuild does not lose them.
+    """
+    feedback_qs = Team5RecommendationFeedback.objects.using("team5").annotate(day=TruncDate("created_at")).order_by()
+    rollup_qs = Team5FeedbackDaily.objects.using("team5")
+    if since is not None:
+        feedback_qs = feedback_qs.filter(day__gte=since)
+        rollup_qs = rollup_qs.filter(day__gte=since)
+
+    rollups: dict[tuple, Team5FeedbackDaily] = {}
+    counts = feedback_qs.values_list("day", "ab_group", "action").annotate(
+        impressions=Count("id"),
+        likes=Count("id", filter=Q(liked=True)),
+    )
+    for day, group, action, impressions, likes in counts:
+        rollups[(day, group, action)] = Team5FeedbackDaily(
+            day=day, ab_group=group, action=action, impressions=impressions, likes=likes
+        )
+
+    sketches: dict[tuple, HyperLogLog] = {}
+    distinct_users = feedback_qs.values_list("day", "ab_group", "action", "user_id").distinct()
+    for day, group, action, user_id in distinct_users.iterator():
+        sketches.setdefault((day, group, action), HyperLogLog()).add(user_id)
+
+    if archive_dir is not None:
+        for event in iter_archived_feedback(archive_dir, since=since):
+            key = (timezone.localdate(event["createdAt"]), event["abGroup"], event["action"])
+            rollup = rollups.get(key)
+            if rollup is None:
+                rollup = rollups[key] = Team5FeedbackDaily(day=key[0], ab_group=key[1], action=key[2])
+            rollup.impressions += 1
+            rollup.likes += 1 if event["liked"] else 0
+            sketches.setdefault(key, HyperLogLog()).add(UUID(event["userId"]))
+    for key, rollup in rollups.items():
+        rollup.users_sketch = sketches[key].to_bytes()
+
+    with transaction.atomic(using="team5"):
+        rollup_qs.delete()
+        Team5FeedbackDaily.objects.using("team5").bulk_create(rollups.values(), batch_size=500)
+    return len(rollups)
+
+
+def summarize_ab_feedback(*, days: int, action: str | None = None) -> dict:
+    """Per-group and per-action like counts over the last ``days`` calendar days (today included).
+
+    Reads one rollup row per (day, group, action); unique users come from the
+    merged HyperLogLog sketches, so they are estimates (exact for small counts).
+    """
+    since = timezone.localdate() - timedelta(days=max(1, days) - 1)
+    rollup_qs = Team5FeedbackDaily.objects.using("team5").filter(day__gte=since)
+    if action:
+        rollup_qs = rollup_qs.filter(action=action)
+
+    groups = {group: {"impressions": 0, "likes": 0, "dislikes": 0, "uniqueUsers": 0} for group in AB_GROUPS}
+    by_action: dict[str, dict] = {}
+    sketches: dict[str, list[HyperLogLog]] = {group: [] for group in AB_GROUPS}
+    rows = rollup_qs.values_list("ab_group", "action", "impressions", "likes", "users_sketch")
+    for group, row_action, impressions, likes, users_sketch in rows:
+        if group not in groups:
+            continue
+        bucket = groups[group]
+        bucket["impressions"] += impressions
+        bucket["likes"] += likes
+        bucket["dislikes"] += impressions - likes
+        sketches[group].append(HyperLogLog.from_bytes(users_sketch))
+
+        row_action = str(row_action or "").strip().lower() or "unknown"
+        action_bucket = by_action.setdefault(
+            row_action,
+            {name: {"impressions": 0, "likes": 0, "likeRate": 0.0} for name in AB_GROUPS},
+        )[group]
+        action_bucket["impressions"] += impressions
+        action_bucket["likes"] += likes
+
+    for group, bucket in groups.items():
+        if sketches[group]:
+            bucket["uniqueUsers"] = HyperLogLog.union(sketches[group]).count()
+        bucket["likeRatePercent"] = _rate(bucket["likes"], bucket["impressions"])
+    for action_data in by_action.values():
+        for bucket in action_data.values():
+            bucket["likeRate"] = _rate(bucket["likes"], bucket["impressions"])
+    return {"groups": groups, "byAction": by_action}
+
+
+def _rate(likes: int, impressions: int) -> float:
+    return round((likes / impressions) * 100, 2) if impressions else 0.0
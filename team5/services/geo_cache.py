@@ -0,0 +1,152 @@
+"""Cache of IP geolocation results keyed by network prefix.
+
+Results are shared by every address of the same IPv4 /24 or IPv6 /48. Found
+locations live for ``ttl_seconds``, failed lookups for the shorter
+``negative_ttl_seconds`` so a table update is picked up soon. Entries are kept
+in an in-process ``TTLCache`` and, when ``store_path`` is set, in a small SQLite
+file that survives worker restarts and is shared between workers.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from ipaddress import ip_address, ip_network
+from pathlib import Path
+
+from .ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 24 * 3600.0
+DEFAULT_NEGATIVE_TTL_SECONDS = 600.0
+IPV4_PREFIX = 24
+IPV6_PREFIX = 48
+# Stored in place of ``None`` so a cached failure is distinguishable from a miss.
+_NOT_FOUND: dict = {}
+
+
+class GeoLookupCache:
+    def __init__(
+        self,
+        *,
+        max_entries: int = 50_000,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        negative_ttl_seconds: float = DEFAULT_NEGATIVE_TTL_SECONDS,
+        store_path: str | Path | None = None,
+    ):
+        self.ttl_seconds = float(ttl_seconds)
+        self.negative_ttl_seconds = float(negative_ttl_seconds)
+        self.store_path = Path(store_path) if store_path else None
+        self._memory = TTLCache(max_entries=max_entries, ttl_seconds=self.ttl_seconds)
+        self._stats_lock = threading.Lock()
+        self._store_ready = False
+        self.store_hits = 0
+        self.negative_hits = 0
+        self.lookups = 0
+        self.store_errors = 0
+
+    def get_or_lookup(self, client_ip: str, lookup: Callable[[str], dict | None]) -> dict | None:
+        key = cache_key(client_ip)
+        if key is None:
+            return lookup(client_ip)
+
+        cached = self._memory.get(key)
+        if cached is None:
+            cached = self._read_store(key)
+            if cached is not None:
+                self._count("store_hits")
+                self._memory.set(key, cached[0], ttl_seconds=cached[1])
+                cached = cached[0]
+        if cached is not None:
+            if not cached:
+                self._count("negative_hits")
+                return None
+            return dict(cached)
+
+        self._count("lookups")
+        result = lookup(client_ip)
+        ttl = self.ttl_seconds if result else self.negative_ttl_seconds
+        value = dict(result) if result else _NOT_FOUND
+        self._memory.set(key, value, ttl_seconds=ttl)
+        self._write_store(key, value, ttl)
+        return dict(result) if result else None
+
+    def clear(self) -> None:
+        """Drop every cached result, including the on-disk store."""
+        self._memory.clear()
+        self._execute("DELETE FROM geo_cache")
+
+    def stats(self) -> dict:
+        memory = self._memory.stats()
+        return {
+            **memory,
+            "negativeTtlSeconds": self.negative_ttl_seconds,
+            "storeHits": self.store_hits,
+            "negativeHits": self.negative_hits,
+            "lookups": self.lookups,
+            "storePath": str(self.store_path) if self.store_path else None,
+            "storeErrors": self.store_errors,
+        }
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _read_store(self, key: str) -> tuple[dict, float] | None:
+        rows = self._execute("SELECT payload, expires_at FROM geo_cache WHERE key = ?", (key,))
+        if not rows:
+            return None
+        payload, expires_at = rows[0]
+        remaining = float(expires_at) - time.time()
+        if remaining <= 0:
+            return None
+        return json.loads(payload), remaining
+
+    def _write_store(self, key: str, value: dict, ttl_seconds: float) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO geo_cache (key, payload, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), time.time() + ttl_seconds),
+        )
+
+    def _execute(self, sql: str, params: tuple = ()) -> list:
+        if self.store_path is None:
+            return []
+        try:
+            if not self._store_ready:
+                self.store_path.parent.mkdir(parents=True, exist_ok=True)
+            # A short-lived connection per call keeps this safe across threads and forked workers.
+            with sqlite3.connect(self.store_path, timeout=1.0) as connection:
+                if not self._store_ready:
+                    connection.execute(
+                        "CREATE TABLE IF NOT EXISTS geo_cache (key TEXT PRIMARY KEY, payload TEXT, expires_at REAL)"
+                    )
+                    connection.execute("DELETE FROM geo_cache WHERE expires_at < ?", (time.time(),))
+                    self._store_ready = True
+                rows = connection.execute(sql, params).fetchall()
+            connection.close()
+            return rows
+        except (sqlite3.Error, OSError):
+            self._count("store_errors")
+            logger.warning("team5 geo cache store %s unavailable", self.store_path, exc_info=True)
+            return []
+
+
+def cache_key(client_ip: str) -> str | None:
+    """``"1.2.3.0/24"``-style network of ``client_ip``, or None when it is not an IP address.
+
+    IPv4-mapped IPv6 addresses (``::ffff:1.2.3.4``, seen behind dual-stack binds)
+    share the key of their IPv4 address.
+    """
+    try:
+        address = ip_address(str(client_ip).strip())
+    except ValueError:
+        return None
+    if address.version == 6 and address.ipv4_mapped is not None:
+        address = address.ipv4_mapped
+    prefix = IPV4_PREFIX if address.version == 4 else IPV6_PREFIX
+    return str(ip_network(f"{address}/{prefix}", strict=False))
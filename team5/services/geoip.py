@@ -0,0 +1,290 @@
+"""Offline IP-range geolocation backed by a memory-mapped binary table.
+
+``compile_geoip_csv`` turns an IP-range CSV into sorted integer arrays (IPv4 as
+``uint32``, IPv6 as ``uint64`` high/low halves) plus a small location table, and
+writes them into one file. ``GeoIPDatabase.open`` memory-maps that file and
+answers ``lookup`` with a binary search, so no request waits on the network.
+
+Accepted CSV layouts: a header naming ``ip_start``/``ip_end`` (or
+``start_ip``/``end_ip``), ``city``, ``country``, ``latitude`` and ``longitude``
+columns, or the header-less DB-IP "city lite" order
+``ip_start, ip_end, continent, country, stateprov, city, latitude, longitude``.
+"""
+
+from __future__ import annotations
+
+import csv
+import os
+import struct
+import tempfile
+import threading
+from functools import lru_cache
+from ipaddress import IPv4Address, IPv6Address, ip_address
+from itertools import chain
+from pathlib import Path
+
+from django.conf import settings
+
+MAGIC = b"T5GEOIP\x00"
+FORMAT_VERSION = 1
+# magic, version, IPv4 ranges, IPv6 ranges, locations, string blob bytes
+HEADER = struct.Struct("<8sIIIIQ")
+ALIGNMENT = 8
+
+_START_COLUMNS = ("ip_start", "start_ip", "range_start", "network_start")
+_END_COLUMNS = ("ip_end", "end_ip", "range_end", "network_end")
+_DBIP_LITE_COLUMNS = ("ip_start", "ip_end", "continent", "country", "stateprov", "city", "latitude", "longitude")
+
+_open_lock = threading.Lock()
+
+
+def _sections(n4: int, n6: int, n_locations: int, blob_size: int) -> list[tuple[str, str, int]]:
+    """(name, dtype, length) in file order; shared by the writer and the reader."""
+    return [
+        ("v4_start", "<u4", n4),
+        ("v4_end", "<u4", n4),
+        ("v4_location", "<u4", n4),
+        ("v6_start_hi", "<u8", n6),
+        ("v6_start_lo", "<u8", n6),
+        ("v6_end_hi", "<u8", n6),
+        ("v6_end_lo", "<u8", n6),
+        ("v6_location", "<u4", n6),
+        ("latitude", "<f4", n_locations),
+        ("longitude", "<f4", n_locations),
+        ("city_offsets", "<u4", n_locations + 1),
+        ("country_offsets", "<u4", n_locations + 1),
+        ("strings", "u1", blob_size),
+    ]
+
+
+class GeoIPDatabase:
+    """Read-only view over a compiled table; arrays are slices of one ``np.memmap``."""
+
+    def __init__(self, path: Path, arrays: dict):
+        self.path = path
+        self._arrays = arrays
+        self._strings = arrays["strings"]
+        # Python ints above 2**63 must not be promoted to float64 inside searchsorted.
+        self._as_u64 = arrays["v6_start_hi"].dtype.type
+
+    @classmethod
+    def open(cls, path: str | Path) -> "GeoIPDatabase":
+        import numpy as np
+
+        path = Path(path)
+        raw = np.memmap(path, dtype="u1", mode="r")
+        if raw.size < HEADER.size:
+            raise ValueError(f"{path} is not a compiled GeoIP table")
+        magic, version, n4, n6, n_locations, blob_size = HEADER.unpack(raw[: HEADER.size].tobytes())
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a compiled GeoIP table (format {version})")
+
+        arrays = {}
+        offset = _align(HEADER.size)
+        for name, dtype, length in _sections(n4, n6, n_locations, blob_size):
+            dtype = np.dtype(dtype)
+            arrays[name] = np.ndarray((length,), dtype=dtype, buffer=raw, offset=offset)
+            offset = _align(offset + dtype.itemsize * length)
+        return cls(path, arrays)
+
+    def __len__(self) -> int:
+        return len(self._arrays["v4_start"]) + len(self._arrays["v6_start_hi"])
+
+    def lookup(self, client_ip: str) -> dict | None:
+        """Return ``{"city", "country", "latitude", "longitude"}`` for the range containing ``client_ip``."""
+        try:
+            parsed = ip_address(str(client_ip).strip())
+        except ValueError:
+            return None
+        if isinstance(parsed, IPv6Address) and parsed.ipv4_mapped is not None:
+            parsed = parsed.ipv4_mapped
+
+        arrays = self._arrays
+        value = int(parsed)
+        if isinstance(parsed, IPv4Address):
+            index = int(arrays["v4_start"].searchsorted(value, side="right")) - 1
+            if index < 0 or value > int(arrays["v4_end"][index]):
+                return None
+            return self._location(int(arrays["v4_location"][index]))
+
+        index = self._find_v6(value >> 64, value & 0xFFFFFFFFFFFFFFFF)
+        if index < 0:
+            return None
+        end = (int(arrays["v6_end_hi"][index]) << 64) | int(arrays["v6_end_lo"][index])
+        if value > end:
+            return None
+        return self._location(int(arrays["v6_location"][index]))
+
+    def _find_v6(self, high: int, low: int) -> int:
+        """Index of the last range whose start is <= (high, low), or -1."""
+        start_hi = self._arrays["v6_start_hi"]
+        high, low = self._as_u64(high), self._as_u64(low)
+        left = int(start_hi.searchsorted(high, side="left"))
+        right = int(start_hi.searchsorted(high, side="right"))
+        if left == right:
+            return left - 1
+        within = int(self._arrays["v6_start_lo"][left:right].searchsorted(low, side="right"))
+        return left + within - 1
+
+    def _location(self, index: int) -> dict:
+        arrays = self._arrays
+        return {
+            "city": self._string("city_offsets", index),
+            "country": self._string("country_offsets", index),
+            "latitude": round(float(arrays["latitude"][index]), 5),
+            "longitude": round(float(arrays["longitude"][index]), 5),
+        }
+
+    def _string(self, offsets_name: str, index: int) -> str:
+        offsets = self._arrays[offsets_name]
+        return self._strings[int(offsets[index]) : int(offsets[index + 1])].tobytes().decode("utf-8")
+
+
+def compile_geoip_csv(csv_path: str | Path, output_path: str | Path) -> dict:
+    """Compile ``csv_path`` into the binary table at ``output_path`` (written atomically)."""
+    import numpy as np
+
+    locations: dict[tuple, int] = {}
+    v4_rows: list[tuple[int, int, int]] = []
+    v6_rows: list[tuple[int, int, int]] = []
+    skipped = 0
+    for start, end, city, country, latitude, longitude in _read_ranges(csv_path):
+        if start is None or end is None or latitude is None or longitude is None or start.version != end.version:
+            skipped += 1
+            continue
+        key = (city, country, round(latitude, 5), round(longitude, 5))
+        location = locations.setdefault(key, len(locations))
+        low, high = sorted((int(start), int(end)))
+        (v4_rows if start.version == 4 else v6_rows).append((low, high, location))
+
+    v4_rows.sort()
+    v6_rows.sort()
+    cities, countries = _string_table([key[0] for key in locations]), _string_table([key[1] for key in locations])
+    blob = cities[1] + countries[1]
+    country_offsets = [offset + len(cities[1]) for offset in countries[0]]
+
+    mask = (1 << 64) - 1
+    data = {
+        "v4_start": [row[0] for row in v4_rows],
+        "v4_end": [row[1] for row in v4_rows],
+        "v4_location": [row[2] for row in v4_rows],
+        "v6_start_hi": [row[0] >> 64 for row in v6_rows],
+        "v6_start_lo": [row[0] & mask for row in v6_rows],
+        "v6_end_hi": [row[1] >> 64 for row in v6_rows],
+        "v6_end_lo": [row[1] & mask for row in v6_rows],
+        "v6_location": [row[2] for row in v6_rows],
+        "latitude": [key[2] for key in locations],
+        "longitude": [key[3] for key in locations],
+        "city_offsets": cities[0],
+        "country_offsets": country_offsets,
+        "strings": np.frombuffer(blob, dtype="u1"),
+    }
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    handle, tmp_path = tempfile.mkstemp(dir=output_path.parent, prefix=".team5-geoip-", suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as stream:
+            stream.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(v4_rows), len(v6_rows), len(locations), len(blob)))
+            position = HEADER.size
+            for name, dtype, length in _sections(len(v4_rows), len(v6_rows), len(locations), len(blob)):
+                position = _pad(stream, position)
+                array = np.asarray(data[name], dtype=dtype)
+                stream.write(array.tobytes())
+                position += array.nbytes
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+    return {
+        "ipv4Ranges": len(v4_rows),
+        "ipv6Ranges": len(v6_rows),
+        "locations": len(locations),
+        "skippedRows": skipped,
+        "bytes": output_path.stat().st_size,
+    }
+
+
+def get_geoip_database() -> GeoIPDatabase | None:
+    """The table configured by ``TEAM5_GEOIP_DATABASE``; reopened when the file is replaced."""
+    path = str(getattr(settings, "TEAM5_GEOIP_DATABASE", "") or "").strip()
+    if not path:
+        return None
+    try:
+        modified = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    with _open_lock:
+        return _open_cached(path, modified)
+
+
+@lru_cache(maxsize=2)
+def _open_cached(path: str, modified: int) -> GeoIPDatabase:
+    return GeoIPDatabase.open(path)
+
+
+def _read_ranges(csv_path: str | Path):
+    with open(csv_path, newline="", encoding="utf-8") as handle:
+        reader = csv.reader(handle)
+        first = next(reader, None)
+        if first is None:
+            return
+        header = [column.strip().lower() for column in first]
+        if any(column in header for column in _START_COLUMNS):
+            columns = header
+            rows = reader
+        else:
+            columns = list(_DBIP_LITE_COLUMNS)
+            rows = chain([first], reader)
+
+        start_col = next(column for column in _START_COLUMNS if column in columns)
+        end_col = next((column for column in _END_COLUMNS if column in columns), start_col)
+        index = {column: position for position, column in enumerate(columns)}
+        for row in rows:
+            if not row or row[0].lstrip().startswith("#"):
+                continue
+            values = {column: (row[position].strip() if position < len(row) else "") for column, position in index.items()}
+            yield (
+                _parse_ip(values.get(start_col)),
+                _parse_ip(values.get(end_col)),
+                values.get("city", ""),
+                values.get("country", "") or values.get("country_name", ""),
+                _parse_float(values.get("latitude")),
+                _parse_float(values.get("longitude")),
+            )
+
+
+def _parse_ip(value: str | None):
+    if not value:
+        return None
+    try:
+        return ip_address(int(value)) if value.isdigit() else ip_address(value)
+    except ValueError:
+        return None
+
+
+def _parse_float(value: str | None) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _string_table(values: list[str]) -> tuple[list[int], bytes]:
+    offsets = [0]
+    encoded = bytearray()
+    for value in values:
+        encoded.extend(str(value or "").encode("utf-8"))
+        offsets.append(len(encoded))
+    return offsets, bytes(encoded)
+
+
+def _align(position: int) -> int:
+    return (position + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _pad(stream, position: int) -> int:
+    aligned = _align(position)
+    stream.write(b"\x00" * (aligned - position))
+    return aligned
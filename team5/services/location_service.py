@@ -2,11 +2,24 @@
 
 from __future__ import annotations
 
-import json
-import math
 from ipaddress import ip_address
-from urllib.error import URLError
-from urllib.request import urlopen
+
+from django.conf import settings
+
+from .geo_cache import DEFAULT_NEGATIVE_TTL_SECONDS, DEFAULT_TTL_SECONDS, GeoLookupCache
+from .city_resolver import CityResolver
+from .geoip import get_geoip_database
+
+# IP coordinates farther than this from every known city are not attributed to any of them.
+MAX_CITY_DISTANCE_KM = 300.0
+
+# Shared by all requests of this process; results are keyed by /24 (IPv4) or /48 (IPv6).
+geo_cache = GeoLookupCache(
+    max_entries=getattr(settings, "TEAM5_GEO_CACHE_MAX_ENTRIES", 50_000),
+    ttl_seconds=getattr(settings, "TEAM5_GEO_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS),
+    negative_ttl_seconds=getattr(settings, "TEAM5_GEO_CACHE_NEGATIVE_TTL_SECONDS", DEFAULT_NEGATIVE_TTL_SECONDS),
+    store_path=getattr(settings, "TEAM5_GEO_CACHE_PATH", "") or None,
+)
 
 
 def get_client_ip(request, *, ip_override: str | None = None) -> str | None:
@@ -30,27 +43,30 @@ def resolve_client_city(
     cities: list[dict],
     client_ip: str | None,
     preferred_city_id: str | None = None,
+    city_resolver: CityResolver | None = None,
 ) -> dict | None:
     """
     Resolve nearest city.
     PRIORITY:
     1. Manual Override (preferred_city_id)
     2. IP Geolocation
+    ``city_resolver`` is the catalog's prebuilt resolver over ``cities``; built on the fly when omitted.
     """
+    resolver = city_resolver or CityResolver(cities)
 
     # --- priority is on manual selecting ---
     if preferred_city_id:
-        city = _match_city_id(cities, preferred_city_id)
+        city = resolver.by_id(preferred_city_id)
         if city:
             return {"city": city, "source": "manual_city_override", "geo": None}
 
     # --if user does not select any city then check IP ---
     if client_ip:
-        geo = _geolocate_ip(client_ip)
+        geo = geo_cache.get_or_lookup(client_ip, _geolocate_ip)
         if geo:
             # 1. Try matching by City Name returned from IP API
             if geo.get("city"):
-                city = _match_city_name(cities, str(geo["city"]))
+                city = resolver.by_name(str(geo["city"]))
                 if city:
                     return {"city": city, "source": "ip_city_name", "geo": geo}
 
@@ -58,7 +74,7 @@ def resolve_client_city(
             latitude = _to_float(geo.get("latitude"))
             longitude = _to_float(geo.get("longitude"))
             if latitude is not None and longitude is not None:
-                city = _nearest_city_by_coordinates(cities, latitude=latitude, longitude=longitude)
+                city = resolver.nearest(latitude, longitude, max_distance_km=MAX_CITY_DISTANCE_KM)
                 if city:
                     return {"city": city, "source": "ip_coordinates", "geo": geo}
 
@@ -102,7 +118,7 @@ def resolve_client_city(
 
 def _geolocate_ip(client_ip: str) -> dict | None:
     """
-    Resolve IP to city/coordinates using a public endpoint.
+    Resolve IP to city/coordinates using the local GeoIP table (no network call).
     """
 
     if client_ip in ("127.0.0.1", "::1", "localhost"):
@@ -121,85 +137,10 @@ def _geolocate_ip(client_ip: str) -> dict | None:
     except ValueError:
         return None
 
-    url = f"https://ipapi.co/{client_ip}/json/"
-    try:
-        with urlopen(url, timeout=1.5) as response:
-            payload = json.loads(response.read().decode("utf-8"))
-    except (URLError, TimeoutError, ValueError, json.JSONDecodeError):
-        return None
-
-    if not isinstance(payload, dict) or payload.get("error"):
+    database = get_geoip_database()
+    if database is None:
         return None
-
-    return {
-        "city": payload.get("city"),
-        "country": payload.get("country_name"),
-        "latitude": payload.get("latitude"),
-        "longitude": payload.get("longitude"),
-    }
-
-def _match_city_id(cities: list[dict], city_id: str) -> dict | None:
-    normalized = str(city_id).strip().lower()
-    for city in cities:
-        if str(city.get("cityId", "")).strip().lower() == normalized:
-            return city
-    return None
-
-
-def _match_city_name(cities: list[dict], city_name: str) -> dict | None:
-    target = city_name.strip().lower()
-    for city in cities:
-        if str(city.get("cityName", "")).strip().lower() == target:
-            return city
-    return None
-
-
-def _nearest_city_by_coordinates(cities: list[dict], *, latitude: float, longitude: float) -> dict | None:
-    best_city: dict | None = None
-    best_distance_km: float | None = None
-
-    for city in cities:
-        # list[a,b] = distance
-        coords = city.get("coordinates") or []
-
-        # handle diffrence version of data
-        if not coords and "latitude" in city and "longitude" in city:
-             coords = [city["latitude"], city["longitude"]]
-
-        if len(coords) != 2:
-            continue
-
-        city_lat = _to_float(coords[0])
-        city_lon = _to_float(coords[1])
-
-        if city_lat is None or city_lon is None:
-            continue
-
-        distance = _haversine_km(latitude, longitude, city_lat, city_lon)
-
-        # if distance less than 50km
-        if best_distance_km is None or distance < best_distance_km:
-            if distance < 300: # example 300m far away
-                best_distance_km = distance
-                best_city = city
-
-    return best_city
-
-
-def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    radius_km = 6371.0
-    phi1 = math.radians(lat1)
-    phi2 = math.radians(lat2)
-    delta_phi = math.radians(lat2 - lat1)
-    delta_lambda = math.radians(lon2 - lon1)
-
-    a = (
-        math.sin(delta_phi / 2.0) ** 2
-        + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2.0) ** 2
-    )
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    return radius_km * c
-
+    return database.lookup(client_ip)
 
 def _to_float(value) -> float | None:
     try:
@@ -0,0 +1,198 @@
+"""Blocked top-k scoring over trained SVD factors.
+
+Users and items are split into blocks and every (user block, item block) pair
+is scored with a single ``P_block @ Q_block.T`` product. User blocks are fanned
+out to a ``ProcessPoolExecutor``; workers attach to the factor arrays through
+shared memory instead of receiving pickled copies, and return per-block top-k
+candidates that are merged with a heap per user.
+"""
+
+from __future__ import annotations
+
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Iterable
+
+import numpy as np
+
+from .recommender_model import FactorSnapshot
+
+
+DEFAULT_USER_BLOCK_SIZE = 512
+DEFAULT_ITEM_BLOCK_SIZE = 4096
+
+_SHARED_ARRAY_NAMES = (
+    "user_factors",
+    "item_factors",
+    "user_biases",
+    "item_biases",
+    "seen_indptr",
+    "seen_indices",
+)
+
+# Per-process views over the shared factor arrays, set by ``_attach_worker``.
+_worker_arrays: dict[str, np.ndarray] = {}
+_worker_segments: list[shared_memory.SharedMemory] = []
+_worker_params: dict = {}
+
+
+def score_top_k(
+    snapshot: FactorSnapshot,
+    *,
+    k: int = 10,
+    user_ids: Iterable[str] | None = None,
+    user_block_size: int = DEFAULT_USER_BLOCK_SIZE,
+    item_block_size: int = DEFAULT_ITEM_BLOCK_SIZE,
+    workers: int | None = None,
+    exclude_seen: bool = True,
+) -> dict[str, list[tuple[str, float]]]:
+    """Return the ``k`` best items per user as ``{user_id: [(item_id, score), ...]}``.
+
+    Scores match ``SVD.predict(...).est`` (biases included, clipped to the rating
+    scale). Unknown user ids are skipped. ``workers`` <= 1 scores in-process.
+    """
+    k = max(1, int(k))
+    user_block_size = max(1, int(user_block_size))
+    item_block_size = max(1, int(item_block_size))
+    inner_users = _resolve_inner_users(snapshot, user_ids)
+    if inner_users.size == 0 or not snapshot.item_ids:
+        return {}
+
+    params = {
+        "k": k,
+        "item_block_size": item_block_size,
+        "global_mean": float(snapshot.global_mean),
+        "rating_scale": snapshot.rating_scale,
+        "exclude_seen": bool(exclude_seen),
+    }
+    user_blocks = [inner_users[start:start + user_block_size] for start in range(0, inner_users.size, user_block_size)]
+    worker_count = _resolve_worker_count(workers, len(user_blocks))
+
+    if worker_count <= 1:
+        arrays = {name: getattr(snapshot, name) for name in _SHARED_ARRAY_NAMES}
+        block_results = [_score_user_block(block, arrays, params) for block in user_blocks]
+    else:
+        block_results = _score_in_pool(snapshot, user_blocks, params, worker_count)
+
+    output: dict[str, list[tuple[str, float]]] = {}
+    for block_users, top_items, top_scores in block_results:
+        for row, inner_uid in enumerate(block_users):
+            output[snapshot.user_ids[int(inner_uid)]] = [
+                (snapshot.item_ids[int(inner_iid)], float(score))
+                for inner_iid, score in zip(top_items[row], top_scores[row])
+                if inner_iid >= 0
+            ]
+    return output
+
+
+def _resolve_inner_users(snapshot: FactorSnapshot, user_ids: Iterable[str] | None) -> np.ndarray:
+    if user_ids is None:
+        return np.arange(len(snapshot.user_ids), dtype=np.int64)
+    inner_by_raw = {raw: inner for inner, raw in enumerate(snapshot.user_ids)}
+    picked = [inner_by_raw[key] for key in (str(u).strip() for u in user_ids) if key in inner_by_raw]
+    return np.asarray(picked, dtype=np.int64)
+
+
+def _resolve_worker_count(workers: int | None, block_count: int) -> int:
+    if workers is None:
+        workers = os.cpu_count() or 1
+    return max(1, min(int(workers), block_count))
+
+
+def _score_in_pool(
+    snapshot: FactorSnapshot,
+    user_blocks: list[np.ndarray],
+    params: dict,
+    worker_count: int,
+) -> list[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    segments: list[shared_memory.SharedMemory] = []
+    layout: dict[str, tuple[str, tuple[int, ...], str]] = {}
+    try:
+        for name in _SHARED_ARRAY_NAMES:
+            source = np.ascontiguousarray(getattr(snapshot, name))
+            segment = shared_memory.SharedMemory(create=True, size=max(1, source.nbytes))
+            segments.append(segment)
+            np.ndarray(source.shape, dtype=source.dtype, buffer=segment.buf)[...] = source
+            layout[name] = (segment.name, source.shape, source.dtype.str)
+
+        with ProcessPoolExecutor(
+            max_workers=worker_count,
+            initializer=_attach_worker,
+            initargs=(layout, params),
+        ) as pool:
+            return list(pool.map(_score_user_block_in_worker, user_blocks))
+    finally:
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+
+
+def _attach_worker(layout: dict[str, tuple[str, tuple[int, ...], str]], params: dict) -> None:
+    _worker_params.clear()
+    _worker_params.update(params)
+    for name, (segment_name, shape, dtype) in layout.items():
+        segment = shared_memory.SharedMemory(name=segment_name)
+        _worker_segments.append(segment)
+        _worker_arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+
+
+def _score_user_block_in_worker(block_users: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    return _score_user_block(block_users, _worker_arrays, _worker_params)
+
+
+def _score_user_block(
+    block_users: np.ndarray,
+    arrays: dict[str, np.ndarray],
+    params: dict,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    k = int(params["k"])
+    item_block_size = int(params["item_block_size"])
+    low, high = params["rating_scale"]
+    item_factors = arrays["item_factors"]
+    item_biases = arrays["item_biases"]
+    n_items = item_factors.shape[0]
+
+    p_block = arrays["user_factors"][block_users]
+    base = params["global_mean"] + arrays["user_biases"][block_users][:, None]
+    seen_by_row = _seen_items_for_block(block_users, arrays) if params["exclude_seen"] else None
+
+    heaps: list[list[tuple[float, int]]] = [[] for _ in range(block_users.size)]
+    for item_start in range(0, n_items, item_block_size):
+        item_stop = min(n_items, item_start + item_block_size)
+        scores = p_block @ item_factors[item_start:item_stop].T
+        scores += base
+        scores += item_biases[item_start:item_stop][None, :]
+        np.clip(scores, low, high, out=scores)
+        if seen_by_row is not None:
+            for row, seen in enumerate(seen_by_row):
+                local = seen[(seen >= item_start) & (seen < item_stop)] - item_start
+                scores[row, local] = -np.inf
+
+        block_k = min(k, item_stop - item_start)
+        candidates = np.argpartition(-scores, block_k - 1, axis=1)[:, :block_k]
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        for row, heap in enumerate(heaps):
+            for local_iid, score in zip(candidates[row], candidate_scores[row]):
+                if score == -np.inf:
+                    continue
+                entry = (float(score), -(item_start + int(local_iid)))
+                if len(heap) < k:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+
+    top_items = np.full((block_users.size, k), -1, dtype=np.int64)
+    top_scores = np.full((block_users.size, k), -np.inf, dtype=np.float64)
+    for row, heap in enumerate(heaps):
+        for rank, (score, negative_iid) in enumerate(sorted(heap, reverse=True)):
+            top_items[row, rank] = -negative_iid
+            top_scores[row, rank] = score
+    return block_users, top_items, top_scores
+
+
+def _seen_items_for_block(block_users: np.ndarray, arrays: dict[str, np.ndarray]) -> list[np.ndarray]:
+    indptr = arrays["seen_indptr"]
+    indices = arrays["seen_indices"]
+    return [indices[indptr[inner_uid]:indptr[inner_uid + 1]] for inner_uid in block_users]
@@ -0,0 +1,166 @@
+"""Weighted ALS for implicit feedback, solved with conjugate-gradient steps.
+
+Every observed (user, item) pair carries a signed weight: likes and high
+ratings push it up, dislikes and low ratings push it down. The sign gives the
+preference ``p_ui`` (1 or 0) and the magnitude the confidence
+``c_ui = 1 + alpha * |w_ui|``; unobserved pairs are ``p = 0, c = 1``. Each
+half-step warm-starts from the current factors and runs a few CG iterations on
+``(YᵀY + λI + Yᵀ(C_u - I)Y) x_u = Yᵀ C_u p_u`` instead of a dense solve.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+from scipy import sparse
+
+from .exceptions import NotTrainedYetException
+from .training_data import RatingArrays, load_rating_arrays
+
+
+NEUTRAL_RATE = 3.0
+FEEDBACK_WEIGHT = 1.0
+
+
+def implicit_feedback_rows(
+    rating_rows: Iterable[tuple],
+    feedback_rows: Iterable[tuple],
+    *,
+    neutral_rate: float = NEUTRAL_RATE,
+    feedback_weight: float = FEEDBACK_WEIGHT,
+) -> Iterator[tuple[str, str, float]]:
+    """Turn ``(user, media, rate)`` ratings and ``(user, liked, shown_ids)`` feedback into signed weights.
+
+    A rating counts ``rate - neutral_rate``; every media shown in a liked (disliked)
+    feed adds (subtracts) ``feedback_weight``.
+    """
+    for user_id, media_id, rate in rating_rows:
+        yield user_id, media_id, float(rate) - neutral_rate
+    for user_id, liked, shown_media_ids in feedback_rows:
+        weight = feedback_weight if liked else -feedback_weight
+        for media_id in shown_media_ids or []:
+            yield user_id, media_id, weight
+
+
+class ImplicitALSModel:
+    def __init__(
+        self,
+        *,
+        factors: int = 32,
+        regularization: float = 0.1,
+        alpha: float = 10.0,
+        iterations: int = 10,
+        cg_steps: int = 3,
+        random_state: int = 42,
+    ):
+        self.factors = int(factors)
+        self.regularization = float(regularization)
+        self.alpha = float(alpha)
+        self.iterations = int(iterations)
+        self.cg_steps = int(cg_steps)
+        self.random_state = random_state
+        self.is_trained = False
+        self.items: set[str] = set()
+        self.user_count = 0
+        self.user_factors = np.zeros((0, self.factors))
+        self.item_factors = np.zeros((0, self.factors))
+        self._user_index: dict[str, int] = {}
+        self._item_ids: list[str] = []
+        self._user_items = sparse.csr_matrix((0, 0))
+
+    def train(self, rows: list[tuple[str, str, float]]) -> None:
+        """Fit on ``(user_id, item_id, signed_weight)`` rows; duplicate pairs are summed."""
+        if not rows:
+            raise ValueError("rows must not be empty")
+        self.train_arrays(load_rating_arrays(rows))
+
+    def train_arrays(self, arrays: RatingArrays) -> None:
+        if not len(arrays):
+            raise ValueError("arrays must not be empty")
+
+        shape = (len(arrays.user_ids), len(arrays.item_ids))
+        weights = sparse.csr_matrix((arrays.ratings, (arrays.user_codes, arrays.item_codes)), shape=shape)
+        weights.sum_duplicates()
+        weights.eliminate_zeros()
+
+        preference = weights.copy()
+        preference.data = (preference.data > 0).astype(np.float64)
+        confidence = weights.copy()
+        confidence.data = self.alpha * np.abs(confidence.data)
+
+        rng = np.random.RandomState(self.random_state)
+        user_factors = rng.normal(0.0, 0.01, size=(shape[0], self.factors))
+        item_factors = rng.normal(0.0, 0.01, size=(shape[1], self.factors))
+
+        confidence_t = confidence.T.tocsr()
+        preference_t = preference.T.tocsr()
+        for _ in range(max(1, self.iterations)):
+            self._conjugate_gradient_step(user_factors, item_factors, confidence, preference)
+            self._conjugate_gradient_step(item_factors, user_factors, confidence_t, preference_t)
+
+        self.user_factors = user_factors
+        self.item_factors = item_factors
+        self._user_index = {raw: inner for inner, raw in enumerate(arrays.user_ids)}
+        self._item_ids = list(arrays.item_ids)
+        self._user_items = preference
+        self.items = set(arrays.item_ids)
+        self.user_count = shape[0]
+        self.is_trained = True
+
+    def recommend(
+        self,
+        user_id: str,
+        *,
+        top_n: int = 10,
+        show_already_seen_items: bool = False,
+    ) -> list[tuple[str, float]]:
+        if not self.is_trained:
+            raise NotTrainedYetException("Model has not been trained yet")
+
+        inner_uid = self._user_index.get(str(user_id).strip())
+        if inner_uid is None:
+            return []
+        scores = self.item_factors @ self.user_factors[inner_uid]
+        if not show_already_seen_items:
+            row = self._user_items
+            scores[row.indices[row.indptr[inner_uid]:row.indptr[inner_uid + 1]]] = -np.inf
+
+        top_n = max(1, min(int(top_n), scores.size))
+        top = np.argpartition(-scores, top_n - 1)[:top_n]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self._item_ids[idx], float(scores[idx])) for idx in top if np.isfinite(scores[idx])]
+
+    def _conjugate_gradient_step(
+        self,
+        solve_for: np.ndarray,
+        fixed: np.ndarray,
+        confidence: sparse.csr_matrix,
+        preference: sparse.csr_matrix,
+    ) -> None:
+        gram = fixed.T @ fixed + self.regularization * np.eye(self.factors)
+        indptr = confidence.indptr
+        indices = confidence.indices
+        extra_confidence = confidence.data
+        targets = preference.data
+
+        for row in range(solve_for.shape[0]):
+            start, stop = indptr[row], indptr[row + 1]
+            x = solve_for[row]
+            local = fixed[indices[start:stop]]
+            conf = extra_confidence[start:stop]
+            # Residual of the normal equations at the warm-start point.
+            r = local.T @ ((conf + 1.0) * targets[start:stop]) - gram @ x - local.T @ (conf * (local @ x))
+            p = r.copy()
+            rs_old = float(r @ r)
+            for _ in range(self.cg_steps):
+                if rs_old < 1e-20:
+                    break
+                ap = gram @ p + local.T @ (conf * (local @ p))
+                step = rs_old / float(p @ ap)
+                x += step * p
+                r -= step * ap
+                rs_new = float(r @ r)
+                p = r + (rs_new / rs_old) * p
+                rs_old = rs_new
+            solve_for[row] = x
@@ -0,0 +1,54 @@
+"""Lazy entry points into the optional ML stack (NumPy, SciPy, scikit-surprise).
+
+Nothing heavy is imported until a model is actually built or trained, so
+importing ``team5.views`` (every ``manage.py`` command, test run and worker
+boot) does not pay for it. Availability checks only look for the packages.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from importlib.util import find_spec
+
+SVD_REQUIREMENTS = ("numpy", "surprise")
+ALS_REQUIREMENTS = ("numpy", "scipy")
+
+
+@lru_cache(maxsize=None)
+def is_installed(*modules: str) -> bool:
+    try:
+        return all(find_spec(module) is not None for module in modules)
+    except (ImportError, ValueError):
+        return False
+
+
+def svd_available() -> bool:
+    return is_installed(*SVD_REQUIREMENTS)
+
+
+def als_available() -> bool:
+    return is_installed(*ALS_REQUIREMENTS)
+
+
+def new_svd_model(rating_scale: tuple[float, float] = (0, 5), **kwargs):
+    from .recommender_model import RecommenderModel
+
+    return RecommenderModel(rating_scale, **kwargs)
+
+
+def new_implicit_model(**kwargs):
+    from .implicit_als import ImplicitALSModel
+
+    return ImplicitALSModel(**kwargs)
+
+
+def load_rating_arrays(rows, **kwargs):
+    from .training_data import load_rating_arrays as _load_rating_arrays
+
+    return _load_rating_arrays(rows, **kwargs)
+
+
+def implicit_feedback_rows(rating_rows, feedback_rows, **kwargs):
+    from .implicit_als import implicit_feedback_rows as _implicit_feedback_rows
+
+    return _implicit_feedback_rows(rating_rows, feedback_rows, **kwargs)
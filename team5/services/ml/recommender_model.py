@@ -2,12 +2,15 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
-import pandas as pd
-from surprise import Dataset, Reader, SVD
+import numpy as np
+from surprise import SVD
 
+from .exceptions import NotTrainedYetException
+from .sgd_training import TrainingReport, WarmStart, fit_svd
+from .training_data import RatingArrays, build_trainset, load_rating_arrays
 
-class NotTrainedYetException(Exception):
-    pass
+
+DEFAULT_TRAINING_BUDGET_SECONDS = 60.0
 
 
 @dataclass
@@ -15,42 +18,83 @@ class _PredictionView:
     est: float
 
 
+@dataclass(frozen=True)
+class FactorSnapshot:
+    """Trained SVD parameters indexed by surprise inner ids.
+
+    ``seen_indptr``/``seen_indices`` hold the rated items of every user in CSR
+    layout so bulk scorers can mask them without touching the trainset.
+    """
+
+    user_ids: list[str]
+    item_ids: list[str]
+    user_factors: np.ndarray
+    item_factors: np.ndarray
+    user_biases: np.ndarray
+    item_biases: np.ndarray
+    global_mean: float
+    rating_scale: tuple[float, float]
+    seen_indptr: np.ndarray
+    seen_indices: np.ndarray
+
+
 class RecommenderModel:
-    def __init__(self, rating_scale: tuple[float, float] = (0, 5)):
+    def __init__(
+        self,
+        rating_scale: tuple[float, float] = (0, 5),
+        *,
+        training_budget_seconds: float | None = DEFAULT_TRAINING_BUDGET_SECONDS,
+        **svd_params,
+    ):
         self.rating_scale = rating_scale
-        self.algo = SVD(random_state=42)
+        self.training_budget_seconds = training_budget_seconds
+        self.svd_params = dict(svd_params)
+        self.algo = SVD(random_state=42, **self.svd_params)
         self.is_trained = False
         self.items: set[str] = set()
-        self.user_item_rating_matrix = pd.DataFrame()
-        self._seen_items_by_user: dict[str, set[str]] = {}
+        self.user_count = 0
+        self.last_training: TrainingReport | None = None
+        self._user_ids: list[str] = []
+        self._item_ids: list[str] = []
 
-    def train(self, rows: list[tuple[str, str, float]]) -> None:
+    def train(self, rows: list[tuple[str, str, float]], *, budget_seconds: float | None = None) -> None:
         if not rows:
             raise ValueError("rows must not be empty")
-
-        df = pd.DataFrame(rows, columns=["user_id", "item_id", "rating"])
-        df["user_id"] = df["user_id"].astype(str)
-        df["item_id"] = df["item_id"].astype(str)
-        df["rating"] = df["rating"].astype(float)
-
-        reader = Reader(rating_scale=self.rating_scale)
-        dataset = Dataset.load_from_df(df[["user_id", "item_id", "rating"]], reader)
-        trainset = dataset.build_full_trainset()
-        self.algo.fit(trainset)
-
-        self.items = set(df["item_id"].unique().tolist())
-        self.user_item_rating_matrix = df.pivot_table(
-            index="user_id",
-            columns="item_id",
-            values="rating",
-            aggfunc="mean",
+        self.train_arrays(load_rating_arrays(rows), budget_seconds=budget_seconds)
+
+    def train_arrays(self, arrays: RatingArrays, *, budget_seconds: float | None = None) -> None:
+        """Fit on ``arrays``; ``budget_seconds`` overrides ``training_budget_seconds`` for this run."""
+        if not len(arrays):
+            raise ValueError("arrays must not be empty")
+
+        trainset = build_trainset(arrays, self.rating_scale)
+        # Known users and items resume from the previous factors instead of a fresh random init.
+        self.last_training = fit_svd(
+            self.algo,
+            arrays,
+            trainset,
+            warm_start=self._warm_start(),
+            budget_seconds=budget_seconds if budget_seconds is not None else self.training_budget_seconds,
         )
-        self._seen_items_by_user = {
-            user_id: set(group["item_id"].tolist())
-            for user_id, group in df.groupby("user_id")
-        }
+
+        self._user_ids = list(arrays.user_ids)
+        self._item_ids = list(arrays.item_ids)
+        self.items = set(arrays.item_ids)
+        self.user_count = len(arrays.user_ids)
         self.is_trained = True
 
+    def _warm_start(self) -> WarmStart | None:
+        if not self.is_trained:
+            return None
+        return WarmStart(
+            user_ids=self._user_ids,
+            item_ids=self._item_ids,
+            user_factors=self.algo.pu,
+            item_factors=self.algo.qi,
+            user_biases=self.algo.bu,
+            item_biases=self.algo.bi,
+        )
+
     def recommend(
         self,
         user_id: str,
@@ -62,7 +106,7 @@ class RecommenderModel:
             raise NotTrainedYetException("Model has not been trained yet")
 
         user_key = str(user_id).strip()
-        seen = self._seen_items_by_user.get(user_key, set())
+        seen = self.seen_items(user_key)
         candidates = self.items if show_already_seen_items else [item for item in self.items if item not in seen]
         if not candidates:
             return []
@@ -74,6 +118,46 @@ class RecommenderModel:
         scored.sort(key=lambda entry: entry[1], reverse=True)
         return scored[: max(1, int(top_n))]
 
+    def seen_items(self, user_id: str) -> set[str]:
+        if not self.is_trained:
+            return set()
+        trainset = self.algo.trainset
+        try:
+            inner_uid = trainset.to_inner_uid(str(user_id).strip())
+        except ValueError:
+            return set()
+        return {str(trainset.to_raw_iid(inner_iid)) for inner_iid, _ in trainset.ur[inner_uid]}
+
+    def factor_snapshot(self) -> "FactorSnapshot":
+        """Export the trained SVD factors as plain NumPy arrays for bulk scoring."""
+        if not self.is_trained:
+            raise NotTrainedYetException("Model has not been trained yet")
+
+        trainset = self.algo.trainset
+        user_ids = [str(trainset.to_raw_uid(inner)) for inner in range(trainset.n_users)]
+        item_ids = [str(trainset.to_raw_iid(inner)) for inner in range(trainset.n_items)]
+
+        seen_indptr = np.zeros(trainset.n_users + 1, dtype=np.int64)
+        for inner_uid in range(trainset.n_users):
+            seen_indptr[inner_uid + 1] = seen_indptr[inner_uid] + len(trainset.ur[inner_uid])
+        seen_indices = np.empty(int(seen_indptr[-1]), dtype=np.int32)
+        for inner_uid in range(trainset.n_users):
+            start = seen_indptr[inner_uid]
+            seen_indices[start:seen_indptr[inner_uid + 1]] = [inner_iid for inner_iid, _ in trainset.ur[inner_uid]]
+
+        return FactorSnapshot(
+            user_ids=user_ids,
+            item_ids=item_ids,
+            user_factors=np.ascontiguousarray(self.algo.pu, dtype=np.float64),
+            item_factors=np.ascontiguousarray(self.algo.qi, dtype=np.float64),
+            user_biases=np.ascontiguousarray(self.algo.bu, dtype=np.float64),
+            item_biases=np.ascontiguousarray(self.algo.bi, dtype=np.float64),
+            global_mean=float(trainset.global_mean) if self.algo.biased else 0.0,
+            rating_scale=(float(self.rating_scale[0]), float(self.rating_scale[1])),
+            seen_indptr=seen_indptr,
+            seen_indices=seen_indices,
+        )
+
     def predict_rating(self, user_id: str, item_id: str) -> _PredictionView:
         if not self.is_trained:
             raise NotTrainedYetException("Model has not been trained yet")
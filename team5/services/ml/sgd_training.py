@@ -0,0 +1,227 @@
+"""Resumable SGD for surprise's SVD with held-out early stopping.
+
+Surprise's ``SVD.fit`` always re-initialises every factor and runs a fixed
+number of epochs. This trainer runs the same biased-MF update rule in NumPy
+mini-batches so it can start from the previous run's factors, score a held-out
+slice after each epoch, and stop once RMSE stops improving or the time budget
+is spent. The best epoch's factors then get one more pass over every rating,
+held-out ones included, so the served model still learns from them; the pass
+is dropped if it makes the holdout fit worse. The learned
+arrays are installed back into the ``SVD`` instance, so ``predict`` and factor
+snapshots keep working unchanged.
+"""
+
+from __future__ import annotations
+
+import time
+import zlib
+from dataclasses import dataclass
+
+import numpy as np
+
+from .training_data import RatingArrays
+
+
+DEFAULT_BATCH_SIZE = 1024
+DEFAULT_HOLDOUT_FRACTION = 0.1
+DEFAULT_PATIENCE = 2
+DEFAULT_MIN_DELTA = 1e-4
+MIN_HOLDOUT_RATINGS = 20
+
+
+@dataclass(frozen=True)
+class WarmStart:
+    """Parameters of a previous fit, keyed by raw ids."""
+
+    user_ids: list[str]
+    item_ids: list[str]
+    user_factors: np.ndarray
+    item_factors: np.ndarray
+    user_biases: np.ndarray
+    item_biases: np.ndarray
+
+
+@dataclass(frozen=True)
+class TrainingReport:
+    """``holdout_rmse`` scores the best epoch on ratings it never trained on.
+
+    With ``holdout_pass`` the served factors took one more pass that included
+    those ratings, so there is no unseen-data score for the served model itself.
+    """
+
+    epochs: int
+    best_epoch: int
+    max_epochs: int
+    seconds: float
+    budget_seconds: float | None
+    holdout_rmse: float | None
+    stopped_by: str
+    warm_users: int
+    warm_items: int
+    holdout_pass: bool = False
+
+    def as_dict(self) -> dict:
+        return {
+            "epochs": self.epochs,
+            "bestEpoch": self.best_epoch,
+            "maxEpochs": self.max_epochs,
+            "seconds": round(self.seconds, 3),
+            "budgetSeconds": self.budget_seconds,
+            "bestEpochHoldoutRmse": None if self.holdout_rmse is None else round(self.holdout_rmse, 4),
+            "stoppedBy": self.stopped_by,
+            "warmStartedUsers": self.warm_users,
+            "warmStartedItems": self.warm_items,
+            "holdoutPass": self.holdout_pass,
+        }
+
+
+def fit_svd(
+    algo,
+    arrays: RatingArrays,
+    trainset,
+    *,
+    warm_start: WarmStart | None = None,
+    budget_seconds: float | None = None,
+    holdout_fraction: float = DEFAULT_HOLDOUT_FRACTION,
+    patience: int = DEFAULT_PATIENCE,
+    min_delta: float = DEFAULT_MIN_DELTA,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> TrainingReport:
+    """Fit ``algo`` (a surprise ``SVD``) on ``arrays`` and attach ``trainset``.
+
+    ``trainset`` must use the array codes as inner ids (see ``build_trainset``).
+    """
+    started = time.perf_counter()
+    rng = np.random.RandomState(algo.random_state)
+    n_users, n_items = len(arrays.user_ids), len(arrays.item_ids)
+    n_factors = int(algo.n_factors)
+
+    pu = rng.normal(algo.init_mean, algo.init_std_dev, size=(n_users, n_factors))
+    qi = rng.normal(algo.init_mean, algo.init_std_dev, size=(n_items, n_factors))
+    bu = np.zeros(n_users, dtype=np.float64)
+    bi = np.zeros(n_items, dtype=np.float64)
+    warm_users = warm_items = 0
+    if warm_start is not None and warm_start.user_factors.shape[1] == n_factors:
+        warm_users = _copy_known_rows(
+            arrays.user_ids, warm_start.user_ids, (pu, bu), (warm_start.user_factors, warm_start.user_biases)
+        )
+        warm_items = _copy_known_rows(
+            arrays.item_ids, warm_start.item_ids, (qi, bi), (warm_start.item_factors, warm_start.item_biases)
+        )
+
+    is_holdout = _holdout_mask(arrays, holdout_fraction)
+    holdout_size = int(is_holdout.sum())
+    if holdout_size < MIN_HOLDOUT_RATINGS:
+        is_holdout[:] = False
+        holdout_size = 0
+    holdout, fit_rows = np.flatnonzero(is_holdout), np.flatnonzero(~is_holdout)
+    global_mean = float(trainset.global_mean) if algo.biased else 0.0
+    params = (pu, qi, bu, bi)
+
+    def holdout_rmse() -> float | None:
+        if not holdout_size:
+            return None
+        users, items = arrays.user_codes[holdout], arrays.item_codes[holdout]
+        est = global_mean + bu[users] + bi[items] + np.einsum("ij,ij->i", pu[users], qi[items])
+        est = np.clip(est, *trainset.rating_scale)
+        return float(np.sqrt(np.mean((arrays.ratings[holdout] - est) ** 2)))
+
+    best_rmse = holdout_rmse()
+    best_params = [array.copy() for array in params] if best_rmse is not None else None
+    best_epoch = epochs = stale = 0
+    max_epochs = int(algo.n_epochs)
+    stopped_by = "max_epochs"
+    while epochs < max_epochs:
+        _sgd_epoch(algo, arrays, rng.permutation(fit_rows), params, global_mean, batch_size)
+        epochs += 1
+        rmse = holdout_rmse()
+        if rmse is not None:
+            if rmse < best_rmse - min_delta:
+                best_rmse, best_epoch, stale = rmse, epochs, 0
+                best_params = [array.copy() for array in params]
+            else:
+                stale += 1
+                if stale >= patience:
+                    stopped_by = "converged"
+                    break
+        if budget_seconds is not None and time.perf_counter() - started >= budget_seconds:
+            stopped_by = "budget"
+            break
+
+    if best_params is not None:
+        pu, qi, bu, bi = best_params
+    else:
+        best_epoch = epochs
+    holdout_pass = False
+    if holdout_size:
+        # The holdout only chose the epoch; one pass over all ratings lets the served model learn
+        # from it too. The pass is dropped if the holdout fits worse afterwards (it diverged).
+        chosen = (pu, qi, bu, bi)
+        pu, qi, bu, bi = (array.copy() for array in chosen)
+        _sgd_epoch(algo, arrays, rng.permutation(arrays.ratings.size), (pu, qi, bu, bi), global_mean, batch_size)
+        holdout_pass = holdout_rmse() <= best_rmse
+        if not holdout_pass:
+            pu, qi, bu, bi = chosen
+    algo.trainset = trainset
+    algo.pu, algo.qi, algo.bu, algo.bi = pu, qi, bu, bi
+    return TrainingReport(
+        epochs=epochs,
+        best_epoch=best_epoch,
+        max_epochs=max_epochs,
+        seconds=time.perf_counter() - started,
+        budget_seconds=budget_seconds,
+        holdout_rmse=best_rmse,
+        stopped_by=stopped_by,
+        warm_users=warm_users,
+        warm_items=warm_items,
+        holdout_pass=holdout_pass,
+    )
+
+
+def _holdout_mask(arrays: RatingArrays, fraction: float) -> np.ndarray:
+    """Pick held-out ratings by hashing raw ids so a pair stays held out across retrains.
+
+    Otherwise a warm start would be scored on ratings its previous run trained on.
+    """
+    user_hash = np.fromiter((zlib.crc32(raw.encode("utf-8")) for raw in arrays.user_ids), dtype=np.uint64)
+    item_hash = np.fromiter((zlib.crc32(raw.encode("utf-8")) for raw in arrays.item_ids), dtype=np.uint64)
+    mixed = (user_hash[arrays.user_codes] * np.uint64(0x9E3779B1) + item_hash[arrays.item_codes]) % np.uint64(1 << 32)
+    mixed = (mixed * np.uint64(0x85EBCA6B)) % np.uint64(1 << 32)
+    return mixed < np.uint64(int(fraction * (1 << 32)))
+
+
+def _copy_known_rows(ids: list[str], previous_ids: list[str], targets: tuple, sources: tuple) -> int:
+    previous_index = {raw: inner for inner, raw in enumerate(previous_ids)}
+    pairs = [(inner, previous_index[raw]) for inner, raw in enumerate(ids) if raw in previous_index]
+    if not pairs:
+        return 0
+    new_rows, old_rows = (np.fromiter(column, dtype=np.int64) for column in zip(*pairs))
+    for target, source in zip(targets, sources):
+        target[new_rows] = source[old_rows]
+    return len(pairs)
+
+
+def _sgd_epoch(algo, arrays: RatingArrays, order: np.ndarray, params: tuple, global_mean: float, batch_size: int) -> None:
+    pu, qi, bu, bi = params
+    for start in range(0, order.size, batch_size):
+        batch = order[start:start + batch_size]
+        users, items = arrays.user_codes[batch], arrays.item_codes[batch]
+        user_factors, item_factors = pu[users], qi[items]
+        err = arrays.ratings[batch] - (
+            global_mean + bu[users] + bi[items] + np.einsum("ij,ij->i", user_factors, item_factors)
+        )
+        # An id seen n times in a batch would take n full steps from the same stale error if its
+        # gradients were summed, which diverges for popular items. Gradients are averaged per id
+        # instead; a bias then moves as far as n per-sample steps would, err * (1 - (1 - lr) ** n).
+        user_counts, item_counts = np.bincount(users)[users], np.bincount(items)[items]
+        if algo.biased:
+            np.add.at(bu, users, _bias_step(algo.lr_bu, user_counts) * (err - algo.reg_bu * bu[users]))
+            np.add.at(bi, items, _bias_step(algo.lr_bi, item_counts) * (err - algo.reg_bi * bi[items]))
+        user_share, item_share = (1.0 / user_counts)[:, None], (1.0 / item_counts)[:, None]
+        np.add.at(pu, users, user_share * algo.lr_pu * (err[:, None] * item_factors - algo.reg_pu * user_factors))
+        np.add.at(qi, items, item_share * algo.lr_qi * (err[:, None] * user_factors - algo.reg_qi * item_factors))
+
+
+def _bias_step(lr: float, counts: np.ndarray) -> np.ndarray:
+    """Per-row step for a bias seen ``counts`` times in the batch (``lr`` when it is seen once)."""
+    return (1.0 - (1.0 - lr) ** counts) / counts
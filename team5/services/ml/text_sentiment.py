@@ -1,22 +1,64 @@
-try:
-    from shekar import SentimentClassifier
-except ImportError: 
-    SentimentClassifier = None
+import threading
+
+_classifier = None
+_classifier_loaded = False
+_classifier_lock = threading.Lock()
+
+
+def get_classifier():
+    """Return the process-wide shekar classifier, loading it on first use (None when shekar is missing)."""
+    global _classifier, _classifier_loaded
+    if not _classifier_loaded:
+        with _classifier_lock:
+            if not _classifier_loaded:
+                try:
+                    from shekar import SentimentClassifier
+                except ImportError:
+                    SentimentClassifier = None
+                _classifier = SentimentClassifier() if SentimentClassifier is not None else None
+                _classifier_loaded = True
+    return _classifier
+
+
+def normalize_text(text) -> str:
+    return str(text or "").strip().lower()
+
+
+def label_for_score(score: float, threshold: float = 0.05) -> str:
+    if score > threshold:
+        return "positive"
+    if score < -threshold:
+        return "negative"
+    return "neutral"
+
+
+def classify_batch(texts: list[str]) -> list[float]:
+    """Signed sentiment for already-normalized texts, one classifier call per batch when supported."""
+    classifier = get_classifier()
+    if classifier is None or not texts:
+        return [0.0 for _ in texts]
+    if hasattr(classifier, "transform_batch"):
+        results = classifier.transform_batch(list(texts))
+    else:
+        results = [classifier(text) for text in texts]
+    return [_signed_score(result) for result in results]
+
+
+def _signed_score(result) -> float:
+    sentiment = float(result[1])
+    if result[0] == "negative":
+        sentiment = -sentiment
+    return sentiment
 
 
 class TextSentiment:
     def __init__(self):
-        self.classifier = SentimentClassifier() if SentimentClassifier is not None else None
+        self.classifier = get_classifier()
 
     def sentiment(self, text):
-        normalized = str(text or "").strip().lower()
+        normalized = normalize_text(text)
         if not normalized:
             return 0.0
         if self.classifier is None:
             return 0.0
-        result = self.classifier(normalized)
-        sentiment = result[1]
-        if result[0] == "negative":
-            sentiment = -sentiment
-
-        return sentiment
\ No newline at end of file
+        return _signed_score(self.classifier(normalized))
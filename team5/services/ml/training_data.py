@@ -0,0 +1,153 @@
+"""Streaming loader that turns rating rows into integer-encoded NumPy arrays.
+
+Rows are consumed chunk by chunk (e.g. a ``values_list(...).iterator()``) and
+written straight into preallocated arrays that grow geometrically, so the full
+ratings table never exists as Python dicts, tuples or a DataFrame.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from itertools import islice
+from typing import Iterable
+
+import numpy as np
+
+
+DEFAULT_CHUNK_SIZE = 50_000
+_INITIAL_CAPACITY = 1024
+
+
+@dataclass
+class RatingArrays:
+    """Ratings as parallel arrays; ``user_codes``/``item_codes`` index ``user_ids``/``item_ids``."""
+
+    user_codes: np.ndarray
+    item_codes: np.ndarray
+    ratings: np.ndarray
+    user_ids: list[str]
+    item_ids: list[str]
+
+    def __len__(self) -> int:
+        return int(self.ratings.size)
+
+
+class RatingArraysBuilder:
+    def __init__(self, capacity: int = _INITIAL_CAPACITY):
+        capacity = max(1, int(capacity))
+        self._user_codes = np.empty(capacity, dtype=np.int32)
+        self._item_codes = np.empty(capacity, dtype=np.int32)
+        self._ratings = np.empty(capacity, dtype=np.float64)
+        self._size = 0
+        self._user_index: dict[str, int] = {}
+        self._item_index: dict[str, int] = {}
+        self.user_ids: list[str] = []
+        self.item_ids: list[str] = []
+
+    def add_chunk(self, rows: list[tuple]) -> None:
+        """Append ``(user_id, item_id, rating)`` rows, skipping blank ids and bad ratings."""
+        self._reserve(self._size + len(rows))
+        user_codes = self._user_codes
+        item_codes = self._item_codes
+        ratings = self._ratings
+        position = self._size
+        for user_id, item_id, rating in rows:
+            user_key = str(user_id).strip() if user_id is not None else ""
+            item_key = str(item_id).strip() if item_id is not None else ""
+            if not user_key or not item_key:
+                continue
+            try:
+                value = float(rating)
+            except (TypeError, ValueError):
+                continue
+            user_codes[position] = self._encode(user_key, self._user_index, self.user_ids)
+            item_codes[position] = self._encode(item_key, self._item_index, self.item_ids)
+            ratings[position] = value
+            position += 1
+        self._size = position
+
+    def build(self) -> RatingArrays:
+        size = self._size
+        return RatingArrays(
+            user_codes=self._user_codes[:size],
+            item_codes=self._item_codes[:size],
+            ratings=self._ratings[:size],
+            user_ids=self.user_ids,
+            item_ids=self.item_ids,
+        )
+
+    def _reserve(self, needed: int) -> None:
+        capacity = self._ratings.size
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self._user_codes = _grow(self._user_codes, capacity, self._size)
+        self._item_codes = _grow(self._item_codes, capacity, self._size)
+        self._ratings = _grow(self._ratings, capacity, self._size)
+
+    @staticmethod
+    def _encode(key: str, index: dict[str, int], ids: list[str]) -> int:
+        code = index.get(key)
+        if code is None:
+            code = len(ids)
+            index[key] = code
+            ids.append(key)
+        return code
+
+
+def load_rating_arrays(
+    rows: Iterable[tuple],
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    size_hint: int | None = None,
+) -> RatingArrays:
+    """Consume ``(user_id, item_id, rating)`` rows in chunks into a ``RatingArrays``."""
+    chunk_size = max(1, int(chunk_size))
+    builder = RatingArraysBuilder(capacity=size_hint or _INITIAL_CAPACITY)
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+        builder.add_chunk(chunk)
+    return builder.build()
+
+
+def build_trainset(arrays: RatingArrays, rating_scale: tuple[float, float]):
+    """Build a surprise ``Trainset`` directly from encoded arrays.
+
+    Inner ids equal the encoded codes, which follow first-appearance order just
+    like ``Dataset.build_full_trainset`` does.
+    """
+    from surprise import Trainset
+
+    ur: defaultdict[int, list[tuple[int, float]]] = defaultdict(list)
+    ir: defaultdict[int, list[tuple[int, float]]] = defaultdict(list)
+    for start in range(0, len(arrays), DEFAULT_CHUNK_SIZE):
+        stop = start + DEFAULT_CHUNK_SIZE
+        for user_code, item_code, rating in zip(
+            arrays.user_codes[start:stop].tolist(),
+            arrays.item_codes[start:stop].tolist(),
+            arrays.ratings[start:stop].tolist(),
+        ):
+            ur[user_code].append((item_code, rating))
+            ir[item_code].append((user_code, rating))
+
+    return Trainset(
+        ur,
+        ir,
+        len(arrays.user_ids),
+        len(arrays.item_ids),
+        len(arrays),
+        rating_scale,
+        {raw: inner for inner, raw in enumerate(arrays.user_ids)},
+        {raw: inner for inner, raw in enumerate(arrays.item_ids)},
+    )
+
+
+def _grow(array: np.ndarray, capacity: int, used: int) -> np.ndarray:
+    grown = np.empty(capacity, dtype=array.dtype)
+    grown[:used] = array[:used]
+    return grown
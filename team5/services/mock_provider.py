@@ -4,7 +4,7 @@ import json
 from functools import lru_cache
 from pathlib import Path
 
-from .contracts import CityRecord, MediaRecord, PlaceRecord, UserMediaRatingRecord, UserPlaceRatingRecord
+from .contracts import CityAliasRecord, CityRecord, MediaRecord, PlaceRecord, UserMediaRatingRecord, UserPlaceRatingRecord
 from .data_provider import DataProvider
 
 
@@ -18,6 +18,10 @@ class MockProvider(DataProvider):
     def get_cities(self) -> list[CityRecord]:
         return list(_read_json(self.base_path / "cities.json"))
 
+    def get_city_aliases(self) -> list[CityAliasRecord]:
+        path = self.base_path / "city_aliases.json"
+        return list(_read_json(path)) if path.exists() else []
+
     def get_city_places(self, city_id: str) -> list[PlaceRecord]:
         places = self.get_all_places()
         return [place for place in places if place["cityId"] == city_id]
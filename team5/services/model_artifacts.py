@@ -0,0 +1,57 @@
+"""Persist trained recommendation models so new workers can skip a cold fit."""
+
+from __future__ import annotations
+
+import os
+import pickle
+import tempfile
+import time
+from pathlib import Path
+
+ARTIFACT_FILENAME = "team5-models.pkl"
+ARTIFACT_FORMAT = 1
+
+
+def save_models(service, directory: str | Path) -> Path | None:
+    """Write the service's trained models atomically; returns the path, or None when nothing is trained."""
+    models = service.export_models()
+    if not models:
+        return None
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "format": ARTIFACT_FORMAT,
+        "catalogVersion": service.get_catalog().version,
+        "savedAt": time.time(),
+        "models": models,
+    }
+    handle, tmp_path = tempfile.mkstemp(dir=directory, prefix=".team5-models-", suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as stream:
+            pickle.dump(payload, stream, protocol=pickle.HIGHEST_PROTOCOL)
+        target = directory / ARTIFACT_FILENAME
+        os.replace(tmp_path, target)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+    return target
+
+
+def load_models(service, directory: str | Path) -> bool | None:
+    """Install persisted models into ``service``.
+
+    Returns ``None`` when no usable artifact exists, otherwise whether it was
+    saved against the current catalog version (``False`` means the models are
+    only a warm start and should be refitted).
+    """
+    path = Path(directory) / ARTIFACT_FILENAME
+    try:
+        with path.open("rb") as stream:
+            payload = pickle.load(stream)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if not isinstance(payload, dict) or payload.get("format") != ARTIFACT_FORMAT:
+        return None
+    service.install_models(payload.get("models") or {})
+    version = service.get_catalog().version
+    return version is not None and payload.get("catalogVersion") == version
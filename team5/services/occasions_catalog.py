@@ -1,8 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+import json
+import threading
+from dataclasses import asdict, dataclass
 
-from team5.models import Team5City, Team5Media, Team5Place
+from django.db import transaction
+
+from team5.models import Team5City, Team5Media, Team5Place, Team5SeedState
 
 
 @dataclass(frozen=True)
@@ -182,7 +187,47 @@ OCCASION_MEDIA_IDS_BY_OCCASION: dict[str, list[str]] = {
 }
 
 
-def ensure_occasion_media_seeded() -> None:
+def seed_checksum(seeds: list[OccasionSeedMedia]) -> str:
+    payload = json.dumps([asdict(seed) for seed in seeds], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+OCCASION_SEED_NAME = "occasion_media"
+OCCASION_SEED_CHECKSUM = seed_checksum(OCCASION_SEED_MEDIA)
+
+# Checksum this process already confirmed in the database; later calls return without a query.
+_applied_checksum: str | None = None
+_seed_lock = threading.Lock()
+
+
+def forget_applied_seed() -> None:
+    """Make the next ``ensure_occasion_media_seeded`` check the database again (e.g. after its rows were deleted)."""
+    global _applied_checksum
+    with _seed_lock:
+        _applied_checksum = None
+
+
+def ensure_occasion_media_seeded() -> bool:
+    """Upsert ``OCCASION_SEED_MEDIA`` once per seed-list version; returns whether anything was written."""
+    global _applied_checksum
+    if _applied_checksum == OCCASION_SEED_CHECKSUM:
+        return False
+    with _seed_lock:
+        if _applied_checksum == OCCASION_SEED_CHECKSUM:
+            return False
+        applied = Team5SeedState.objects.filter(name=OCCASION_SEED_NAME, checksum=OCCASION_SEED_CHECKSUM).exists()
+        if not applied:
+            with transaction.atomic(using="team5"):
+                _upsert_occasion_media()
+                Team5SeedState.objects.update_or_create(
+                    name=OCCASION_SEED_NAME,
+                    defaults={"checksum": OCCASION_SEED_CHECKSUM},
+                )
+        _applied_checksum = OCCASION_SEED_CHECKSUM
+        return not applied
+
+
+def _upsert_occasion_media() -> None:
     for seed in OCCASION_SEED_MEDIA:
         Team5City.objects.update_or_create(
             city_id=seed.city_id,
@@ -3,7 +3,9 @@
 from collections import defaultdict
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta
+import math
 import random
+import time
 from uuid import UUID
 
 from .contracts import (
@@ -14,17 +16,29 @@ from .contracts import (
     MediaRecord,
     PlaceRecord,
 )
+from .catalog_cache import CatalogCache, CatalogSnapshot
+from .comment_signals import load_comment_signal
 from .data_provider import DataProvider
 from .occasions_catalog import OCCASION_MEDIA_IDS_BY_OCCASION
-from team5.models import Team5MediaComment, Team5MediaRating
-
-try:
-    from .ml.recommender_model import RecommenderModel, NotTrainedYetException
-except Exception:  # pragma: no cover - optional ML dependencies
-    RecommenderModel = None
-
-    class NotTrainedYetException(Exception):
-        pass
+from .spatial_index import EARTH_RADIUS_KM, haversine_km, record_coordinates
+from .ttl_cache import TTLCache
+from team5.models import Team5MediaRating
+
+from .ml import loader as ml_loader
+from .ml.exceptions import NotTrainedYetException
+
+DEFAULT_NEARBY_RADIUS_KM = 25.0
+NEARBY_DISTANCE_DECAY_KM = 5.0
+# Blend of exp(-distance / decay), overallRate / 5 and the ML score / 5 (overallRate when missing).
+NEARBY_WEIGHTS = (0.5, 0.3, 0.2)
+# Only the best pre-ranked candidates are sent to the ML model.
+NEARBY_ML_CANDIDATES_PER_RESULT = 3
+NEARBY_CELL_DEGREES = 0.1
+# After an empty or failed ALS fit, requests wait this long before fitting again.
+IMPLICIT_FIT_RETRY_SECONDS = 60.0
+# Any point of a cell is at most this far from its centre, so a cell-centred query
+# widened by it contains every place within ``radius`` of the actual point.
+_NEARBY_CELL_MARGIN_KM = math.radians(NEARBY_CELL_DEGREES) * EARTH_RADIUS_KM
 
 
 class RecommendationService:
@@ -40,17 +54,32 @@ class RecommendationService:
         self.popular_min_overall_rate = popular_min_overall_rate
         self.popular_min_votes = popular_min_votes
         self.personalized_min_user_rate = personalized_min_user_rate
-        self._ml_enabled = RecommenderModel is not None
-        self.personalized_place_recommender_model = RecommenderModel((0, 5)) if self._ml_enabled else None
-        self.personalized_media_recommender_model = RecommenderModel((0, 5)) if self._ml_enabled else None
+        # Models are built on first training so the ML stack is only imported when used.
+        self._ml_enabled = ml_loader.svd_available()
+        self._als_enabled = ml_loader.als_available()
+        self.personalized_place_recommender_model = None
+        self.personalized_media_recommender_model = None
         self._models_ready = False
+        self.implicit_media_recommender_model = None
+        self._implicit_model_ready = False
+        self._implicit_retry_at = 0.0
+        self.catalog_cache = CatalogCache(provider, _extract_keywords)
+        # Per-user comment signals; writes and background scoring invalidate entries, the TTL
+        # bounds staleness when another process did the write.
+        self.comment_signal_cache = TTLCache(max_entries=10_000, ttl_seconds=300.0)
+        # Nearby candidates per (catalog snapshot, grid cell, radius); popular cells stay hot.
+        self.nearby_cell_cache = TTLCache(max_entries=4096, ttl_seconds=600.0)
+        self._daily_sections: DailySections | None = None
+
+    def get_catalog(self) -> CatalogSnapshot:
+        return self.catalog_cache.get()
 
     def get_popular(
         self,
         limit: int = DEFAULT_LIMIT,
         excluded_media_ids: set[str] | None = None,
     ) -> list[MediaRecord]:
-        media = [dict(item) for item in self.provider.get_media()]
+        media = [dict(item) for item in self.get_catalog().media]
         excluded = excluded_media_ids or set()
         filtered = [
             item
@@ -76,7 +105,7 @@ class RecommendationService:
         user_id: str | None = None,
         excluded_media_ids: set[str] | None = None,
     ) -> list[MediaRecord]:
-        media = [dict(item) for item in self.provider.get_media()]
+        media = [dict(item) for item in self.get_catalog().media]
         excluded = excluded_media_ids or set()
         ratings_by_media = self._get_db_ratings_by_media(user_id) if user_id else {}
         candidates = [item for item in media if item["mediaId"] not in excluded]
@@ -96,12 +125,13 @@ class RecommendationService:
         user_id: str | None = None,
         excluded_media_ids: set[str] | None = None,
     ) -> list[MediaRecord]:
-        place_by_id = {place["placeId"]: place for place in self.provider.get_all_places()}
+        catalog = self.get_catalog()
+        place_by_id = catalog.place_by_id
         items: list[dict] = []
         excluded = excluded_media_ids or set()
         user_key = str(user_id).strip() if user_id else ""
 
-        for media in self.provider.get_media():
+        for media in catalog.media:
             if media["mediaId"] in excluded:
                 continue
             place = place_by_id.get(media["placeId"])
@@ -125,81 +155,133 @@ class RecommendationService:
             items.sort(key=lambda item: (float(item["overallRate"]), int(item["ratingsCount"])), reverse=True)
         return items[:limit]
 
-    def get_weather_recommendations(
+    def get_places_near(
         self,
+        latitude: float,
+        longitude: float,
         *,
+        radius_km: float | None = None,
+        limit: int = DEFAULT_LIMIT,
+    ) -> list[dict]:
+        """Catalog places closest to a coordinate (optionally within ``radius_km``), with ``distanceKm``."""
+        index = self.get_catalog().place_index()
+        if radius_km is None:
+            matches = index.nearest(latitude, longitude, k=limit)
+        else:
+            matches = index.within(latitude, longitude, radius_km, limit=limit)
+        return [{**place, "distanceKm": round(distance, 3)} for place, distance in matches]
+
+    def get_nearby(
+        self,
+        latitude: float,
+        longitude: float,
+        *,
+        radius_km: float = DEFAULT_NEARBY_RADIUS_KM,
         limit: int = DEFAULT_LIMIT,
         user_id: str | None = None,
         excluded_media_ids: set[str] | None = None,
-    ) -> dict:
-        now = datetime.now()
-        season_name, season_key = _season_from_month(now.month)
-        excluded = excluded_media_ids or set()
+    ) -> list[MediaRecord]:
+        """Media of places within ``radius_km``, ranked by distance decay, rating and ML score."""
+        import numpy as np
 
-        # Section 1: season-aware "best now" recommendations.
-        if season_key == "winter":
-            now_city_ids = ["kish", "qeshm", "bandarabbas", "shiraz"]
-            now_tip = "الان هوا زمستونی است؛ جنوب ایران معمولا مطبوع‌تره."
-        elif season_key == "summer":
-            now_city_ids = ["ardabil", "astara", "tonkabon", "tabriz"]
-            now_tip = "الان هوا گرمه؛ مناطق خنک شمال و شمال‌غرب بهترن."
-        elif season_key == "spring":
-            now_city_ids = ["shiraz", "isfahan", "mashhad", "tehran"]
-            now_tip = "بهار زمان خوبی برای شهرهای تاریخی و طبیعت‌گردیه."
-        else:
-            now_city_ids = ["shiraz", "isfahan", "kish", "qeshm"]
-            now_tip = "پاییز برای سفرهای شهری و جنوب ایران گزینه خوبیه."
+        catalog = self.get_catalog()
+        candidates = self._nearby_candidates(catalog, latitude, longitude, radius_km)
+        if candidates is None:
+            return []
+        media_indices, place_latitudes, place_longitudes, ratings = candidates
 
-        now_items = self._rank_weather_candidates(
-            self._filter_media_by_city_ids(city_ids=now_city_ids, excluded_media_ids=excluded),
-            user_id=user_id,
-            reason="weather_now",
-            limit=limit,
-        )
+        distances = haversine_km(math.radians(latitude), math.radians(longitude), place_latitudes, place_longitudes)
+        keep = distances <= radius_km
+        excluded = excluded_media_ids or set()
+        if excluded:
+            keep &= np.array([catalog.media[index]["mediaId"] not in excluded for index in media_indices.tolist()])
+        media_indices, distances, ratings = media_indices[keep], distances[keep], ratings[keep]
+        if not len(media_indices):
+            return []
 
-        # Section 2: for users who want cold/snow vibes.
-        snow_city_ids = ["tabriz", "ardabil", "astara", "gorgan", "tonkabon"]
-        snow_items = self._rank_weather_candidates(
-            self._filter_media_by_city_ids(city_ids=snow_city_ids, excluded_media_ids=excluded),
-            user_id=user_id,
-            reason="weather_snow",
-            limit=limit,
+        distance_weight, rating_weight, ml_weight = NEARBY_WEIGHTS
+        proximity = np.exp(-distances / NEARBY_DISTANCE_DECAY_KM)
+        rating_scores = np.clip(ratings / 5.0, 0.0, 1.0)
+        preference = rating_scores.copy()
+        ml_scores = np.full(len(media_indices), np.nan)
+
+        user_key = str(user_id).strip() if user_id else ""
+        if user_key:
+            prescore = distance_weight * proximity + (rating_weight + ml_weight) * rating_scores
+            shortlist = np.argsort(-prescore, kind="stable")[: max(1, limit) * NEARBY_ML_CANDIDATES_PER_RESULT]
+            predicted = self._get_ml_prediction_scores_for_media(
+                user_id=user_key,
+                media_ids=[catalog.media[index]["mediaId"] for index in media_indices[shortlist].tolist()],
+            )
+            for position in shortlist.tolist():
+                score = predicted.get(catalog.media[int(media_indices[position])]["mediaId"])
+                if score is not None:
+                    ml_scores[position] = score
+            known = ~np.isnan(ml_scores)
+            preference[known] = np.clip(ml_scores[known] / 5.0, 0.0, 1.0)
+
+        scores = distance_weight * proximity + rating_weight * rating_scores + ml_weight * preference
+        order = np.lexsort((distances, -scores))[: max(1, limit)]
+
+        items: list[MediaRecord] = []
+        for position in order.tolist():
+            item = dict(catalog.media[int(media_indices[position])])
+            item["matchReason"] = "nearby"
+            item["distanceKm"] = round(float(distances[position]), 3)
+            item["nearbyScore"] = round(float(scores[position]), 4)
+            if not np.isnan(ml_scores[position]):
+                item["mlScore"] = round(float(ml_scores[position]), 3)
+            items.append(item)
+        return items
+
+    def _nearby_candidates(self, catalog: CatalogSnapshot, latitude: float, longitude: float, radius_km: float):
+        """(media index, place lat/lon in radians, overallRate) arrays for the query's grid cell."""
+        import numpy as np
+
+        cell = (math.floor(latitude / NEARBY_CELL_DEGREES), math.floor(longitude / NEARBY_CELL_DEGREES))
+        key = (catalog.built_at, catalog.version, cell, float(radius_km))
+        cached = self.nearby_cell_cache.get(key)
+        if cached is not None:
+            return cached or None
+
+        centre = ((cell[0] + 0.5) * NEARBY_CELL_DEGREES, (cell[1] + 0.5) * NEARBY_CELL_DEGREES)
+        places = catalog.place_index().within(centre[0], centre[1], radius_km + _NEARBY_CELL_MARGIN_KM)
+        coordinates = {
+            place["placeId"]: tuple(map(math.radians, record_coordinates(place))) for place, _ in places
+        }
+        media_indices = [index for index, item in enumerate(catalog.media) if item["placeId"] in coordinates]
+        if not media_indices:
+            self.nearby_cell_cache.set(key, ())
+            return None
+
+        place_coordinates = [coordinates[catalog.media[index]["placeId"]] for index in media_indices]
+        candidates = (
+            np.asarray(media_indices, dtype=np.int64),
+            np.asarray([coordinate[0] for coordinate in place_coordinates]),
+            np.asarray([coordinate[1] for coordinate in place_coordinates]),
+            np.asarray([float(catalog.media[index]["overallRate"]) for index in media_indices]),
         )
+        self.nearby_cell_cache.set(key, candidates)
+        return candidates
 
-        # Section 3: cool choices for summer.
-        summer_city_ids = ["ardabil", "astara", "tonkabon", "tabriz"]
-        summer_items = self._rank_weather_candidates(
-            self._filter_media_by_city_ids(city_ids=summer_city_ids, excluded_media_ids=excluded),
+    def get_weather_recommendations(
+        self,
+        *,
+        limit: int = DEFAULT_LIMIT,
+        user_id: str | None = None,
+        excluded_media_ids: set[str] | None = None,
+    ) -> dict:
+        daily = self.get_daily_sections()
+        sections = self._personalize_sections(
+            daily.weather,
             user_id=user_id,
-            reason="weather_summer",
             limit=limit,
+            excluded_media_ids=excluded_media_ids or set(),
         )
-
-        sections = [
-            {
-                "id": "go-now",
-                "title": "1) الان برو...",
-                "subtitle": f"امروز {now.strftime('%Y-%m-%d')} است و فصل فعلی: {season_name}. {now_tip}",
-                "items": now_items,
-            },
-            {
-                "id": "snow-cold",
-                "title": "2) اگه برف و سرما میخوای...",
-                "subtitle": "پیشنهادهایی از شهرهای سردتر و برفی‌تر مثل تبریز، اردبیل، آستارا و شمال.",
-                "items": snow_items,
-            },
-            {
-                "id": "summer-cool",
-                "title": "3) تابستون که شد...",
-                "subtitle": "برای روزهای گرم، مقصدهای خنک‌تر مثل اردبیل و آستارا انتخاب‌های خوبی هستن.",
-                "items": summer_items,
-            },
-        ]
-
         return {
             "kind": "weather",
-            "today": now.strftime("%Y-%m-%d"),
-            "season": season_name,
+            "today": daily.day.strftime("%Y-%m-%d"),
+            "season": daily.season_name,
             "sections": sections,
         }
 
@@ -210,39 +292,88 @@ class RecommendationService:
         user_id: str | None = None,
         excluded_media_ids: set[str] | None = None,
     ) -> dict:
-        now = datetime.now().date()
-        excluded = excluded_media_ids or set()
-        selected: list[OccasionDefinition] = []
+        daily = self.get_daily_sections()
+        sections = self._personalize_sections(
+            daily.occasions,
+            user_id=user_id,
+            limit=limit,
+            excluded_media_ids=excluded_media_ids or set(),
+        )
+        return {
+            "kind": "occasions",
+            "today": daily.day.strftime("%Y-%m-%d"),
+            "sections": [section for section in sections if section.get("items")],
+        }
 
-        for definition in OCCASION_DEFINITIONS:
-            if definition.always_show or _is_occasion_near_today(definition, now):
-                selected.append(definition)
+    def get_daily_sections(self) -> "DailySections":
+        """Weather and occasion section candidates for today, built once per (date, catalog snapshot)."""
+        today = datetime.now().date()
+        catalog = self.get_catalog()
+        cached = self._daily_sections
+        if cached is not None and cached.day == today and cached.catalog_built_at == catalog.built_at:
+            return cached
+        daily = self._build_daily_sections(catalog, today)
+        self._daily_sections = daily
+        return daily
+
+    def _build_daily_sections(self, catalog: CatalogSnapshot, today: date) -> "DailySections":
+        season_name, season_key = _season_from_month(today.month)
+        now_city_ids, now_tip = WEATHER_NOW_BY_SEASON[season_key]
+        weather = (
+            SectionTemplate(
+                id="go-now",
+                title="1) الان برو...",
+                subtitle=f"امروز {today.strftime('%Y-%m-%d')} است و فصل فعلی: {season_name}. {now_tip}",
+                reason="weather_now",
+                candidate_ids=self._rated_media_ids_in_cities(catalog, now_city_ids),
+            ),
+            SectionTemplate(
+                id="snow-cold",
+                title="2) اگه برف و سرما میخوای...",
+                subtitle="پیشنهادهایی از شهرهای سردتر و برفی‌تر مثل تبریز، اردبیل، آستارا و شمال.",
+                reason="weather_snow",
+                candidate_ids=self._rated_media_ids_in_cities(catalog, WEATHER_SNOW_CITY_IDS),
+            ),
+            SectionTemplate(
+                id="summer-cool",
+                title="3) تابستون که شد...",
+                subtitle="برای روزهای گرم، مقصدهای خنک‌تر مثل اردبیل و آستارا انتخاب‌های خوبی هستن.",
+                reason="weather_summer",
+                candidate_ids=self._rated_media_ids_in_cities(catalog, WEATHER_SUMMER_CITY_IDS),
+            ),
+        )
 
         # Keep stable order and avoid duplicate sections.
-        deduped: list[OccasionDefinition] = []
+        occasions: list[SectionTemplate] = []
         seen_ids: set[str] = set()
-        for definition in selected:
+        for definition in OCCASION_DEFINITIONS:
             if definition.id in seen_ids:
                 continue
-            deduped.append(definition)
+            if not (definition.always_show or _is_occasion_near_today(definition, today)):
+                continue
             seen_ids.add(definition.id)
-
-        sections = [
-            self._build_occasion_section(
-                definition=definition,
-                user_id=user_id,
-                limit=limit,
-                excluded_media_ids=excluded,
+            occasions.append(
+                SectionTemplate(
+                    id=definition.id,
+                    title=definition.title,
+                    subtitle=definition.subtitle,
+                    reason=definition.reason,
+                    curated_ids=tuple(
+                        media_id
+                        for media_id in OCCASION_MEDIA_IDS_BY_OCCASION.get(definition.id, [])
+                        if media_id in catalog.media_by_id
+                    ),
+                    candidate_ids=self._rated_media_ids_in_cities(catalog, definition.city_ids),
+                )
             )
-            for definition in deduped
-        ]
-        sections = [section for section in sections if section.get("items")]
 
-        return {
-            "kind": "occasions",
-            "today": now.strftime("%Y-%m-%d"),
-            "sections": sections,
-        }
+        return DailySections(
+            day=today,
+            catalog_built_at=catalog.built_at,
+            season_name=season_name,
+            weather=weather,
+            occasions=tuple(occasions),
+        )
 
     def get_personalized(
         self,
@@ -250,7 +381,7 @@ class RecommendationService:
         limit: int = DEFAULT_LIMIT,
         excluded_media_ids: set[str] | None = None,
     ) -> list[MediaRecord]:
-        media = [dict(item) for item in self.provider.get_media()]
+        media = [dict(item) for item in self.get_catalog().media]
         media_by_id = {item["mediaId"]: item for item in media}
         scored: list[tuple[float, float, int, dict]] = []
         ratings_by_media = self._get_db_ratings_by_media(user_id)
@@ -375,37 +506,20 @@ class RecommendationService:
             output.append(item)
         return output[:limit]
 
+    def invalidate_comment_signals(self, user_ids) -> None:
+        for user_id in user_ids:
+            self.comment_signal_cache.invalidate(str(user_id).strip())
+
     def _get_comment_sentiment_signal(self, *, user_id: str) -> dict:
-        user_uuid = _parse_uuid(user_id)
-        if user_uuid is None:
-            return {
-                "positive_media_ids": set(),
-                "negative_media_ids": set(),
-                "positive_comment_by_media": {},
-            }
+        key = str(user_id).strip()
+        signal = self.comment_signal_cache.get(key)
+        if signal is None:
+            signal = self._load_comment_sentiment_signal(user_id=key)
+            self.comment_signal_cache.set(key, signal)
+        return signal
 
-        rows = (
-            Team5MediaComment.objects.filter(user_id=user_uuid)
-            .only("media_id", "sentiment_label", "body", "updated_at", "created_at")
-            .order_by("-updated_at", "-created_at", "-id")
-        )
-        positive_media_ids: set[str] = set()
-        negative_media_ids: set[str] = set()
-        positive_comment_by_media: dict[str, str] = {}
-        for row in rows:
-            media_id = str(row.media_id)
-            label = str(row.sentiment_label or "").strip().lower()
-            if label == "positive":
-                positive_media_ids.add(media_id)
-                if media_id not in positive_comment_by_media:
-                    positive_comment_by_media[media_id] = str(row.body or "").strip()
-            elif label == "negative":
-                negative_media_ids.add(media_id)
-        return {
-            "positive_media_ids": positive_media_ids,
-            "negative_media_ids": negative_media_ids,
-            "positive_comment_by_media": positive_comment_by_media,
-        }
+    def _load_comment_sentiment_signal(self, *, user_id: str) -> dict:
+        return load_comment_signal(user_id)
 
     def _expand_related_media_ids(
         self,
@@ -417,7 +531,8 @@ class RecommendationService:
         if not seed_media_ids:
             return set()
 
-        place_by_id = {place["placeId"]: place for place in self.provider.get_all_places()}
+        catalog = self.get_catalog()
+        place_by_id = catalog.place_by_id
         all_items = list(media_by_id.values())
         blocked: set[str] = set()
 
@@ -425,7 +540,7 @@ class RecommendationService:
             seed = media_by_id.get(seed_id)
             if not seed:
                 continue
-            seed_keywords = _extract_keywords(f"{seed.get('title', '')} {seed.get('caption', '')}")
+            seed_keywords = _media_keywords(catalog, seed)
             seed_place = place_by_id.get(seed.get("placeId"))
             seed_city = seed_place["cityId"] if seed_place else ""
             picked = 0
@@ -436,9 +551,7 @@ class RecommendationService:
                 same_place = str(candidate.get("placeId")) == str(seed.get("placeId"))
                 candidate_place = place_by_id.get(candidate.get("placeId"))
                 same_city = bool(candidate_place and seed_city and candidate_place.get("cityId") == seed_city)
-                candidate_keywords = _extract_keywords(
-                    f"{candidate.get('title', '')} {candidate.get('caption', '')}"
-                )
+                candidate_keywords = _media_keywords(catalog, candidate)
                 has_overlap = bool(seed_keywords.intersection(candidate_keywords))
                 if same_place or same_city or has_overlap:
                     blocked.add(candidate_id)
@@ -448,14 +561,15 @@ class RecommendationService:
         return blocked
 
     def get_user_interest_distribution(self, user_id: str) -> dict:
-        place_by_id = {place["placeId"]: place for place in self.provider.get_all_places()}
+        catalog = self.get_catalog()
+        place_by_id = catalog.place_by_id
         city_counts: dict[str, int] = defaultdict(int)
         place_counts: dict[str, int] = defaultdict(int)
         ratings_by_media = self._get_db_ratings_by_media(user_id)
         if not ratings_by_media:
             return {"userId": user_id, "cityInterests": [], "placeInterests": []}
 
-        for item in self.provider.get_media():
+        for item in catalog.media:
             user_rate = ratings_by_media.get(item["mediaId"])
             if user_rate is None or user_rate < self.personalized_min_user_rate:
                 continue
@@ -478,10 +592,10 @@ class RecommendationService:
         }
 
     def get_place_lookup(self) -> dict[str, PlaceRecord]:
-        return {place["placeId"]: place for place in self.provider.get_all_places()}
+        return dict(self.get_catalog().place_by_id)
 
     def get_user_ratings(self, user_id: str) -> list[dict]:
-        media_by_id = {item["mediaId"]: item for item in self.provider.get_media()}
+        media_by_id = self.get_catalog().media_by_id
         user_uuid = _parse_uuid(user_id)
         if user_uuid is None:
             return []
@@ -501,7 +615,7 @@ class RecommendationService:
         ]
 
     def get_media_feed(self, user_id: str | None = None) -> dict:
-        items = [dict(item) for item in self.provider.get_media()]
+        items = [dict(item) for item in self.get_catalog().media]
         rated_high: list[dict] = []
         rated_low: list[dict] = []
         user_ratings_map = self._get_db_ratings_by_media(user_id) if user_id else {}
@@ -539,25 +653,25 @@ class RecommendationService:
         if not based_on_items:
             return []
 
-        all_items = [dict(item) for item in self.provider.get_media()]
-        place_by_id = {place["placeId"]: place for place in self.provider.get_all_places()}
+        catalog = self.get_catalog()
+        place_by_id = catalog.place_by_id
         scores: dict[str, float] = defaultdict(float)
         reasons: dict[str, str] = {}
 
         seed_keywords = set()
         seed_city_ids = set()
         for item in based_on_items:
-            seed_keywords |= _extract_keywords(item["title"] + " " + item.get("caption", ""))
+            seed_keywords |= _media_keywords(catalog, item)
             place = place_by_id.get(item["placeId"])
             if place:
                 seed_city_ids.add(place["cityId"])
 
-        for candidate in all_items:
+        for candidate in catalog.media:
             media_id = candidate["mediaId"]
             if media_id in excluded_media_ids:
                 continue
             place = place_by_id.get(candidate["placeId"])
-            candidate_keywords = _extract_keywords(candidate["title"] + " " + candidate.get("caption", ""))
+            candidate_keywords = catalog.keywords_by_media[media_id]
             overlap = seed_keywords.intersection(candidate_keywords)
             if overlap:
                 scores[media_id] += 2.5
@@ -568,109 +682,73 @@ class RecommendationService:
             scores[media_id] += float(candidate.get("overallRate", 0)) / 10.0
 
         ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)[:limit]
-        media_by_id = {item["mediaId"]: item for item in all_items}
         output = []
         for media_id, _ in ranked:
-            item = media_by_id[media_id]
+            item = dict(catalog.media_by_id[media_id])
             item["matchReason"] = reasons.get(media_id, "similar")
             output.append(item)
         return output
 
-    def _filter_media_by_city_ids(
-        self,
-        *,
-        city_ids: list[str],
-        excluded_media_ids: set[str],
-    ) -> list[dict]:
-        place_by_id = {place["placeId"]: place for place in self.provider.get_all_places()}
+    def _rated_media_ids_in_cities(self, catalog: CatalogSnapshot, city_ids: list[str]) -> tuple[str, ...]:
+        """Media ids of places in ``city_ids``, best ``(overallRate, ratingsCount)`` first."""
+        place_by_id = catalog.place_by_id
         target_city_ids = {str(city_id).strip().lower() for city_id in city_ids if str(city_id).strip()}
-        output: list[dict] = []
-        for media in self.provider.get_media():
-            media_id = str(media["mediaId"])
-            if media_id in excluded_media_ids:
-                continue
+        matches = []
+        for media in catalog.media:
             place = place_by_id.get(media["placeId"])
-            if not place:
-                continue
-            city_id = str(place["cityId"]).strip().lower()
-            if city_id in target_city_ids:
-                output.append(dict(media))
-        return output
+            if place and str(place["cityId"]).strip().lower() in target_city_ids:
+                matches.append(media)
+        matches.sort(key=lambda item: (float(item["overallRate"]), int(item["ratingsCount"])), reverse=True)
+        return tuple(str(media["mediaId"]) for media in matches)
 
-    def _rank_weather_candidates(
+    def _personalize_sections(
         self,
-        items: list[dict],
+        templates: tuple["SectionTemplate", ...],
         *,
         user_id: str | None,
-        reason: str,
         limit: int,
+        excluded_media_ids: set[str],
     ) -> list[dict]:
-        if not items:
-            return []
-
+        """Fill cached section templates for one user with a single ML call over all candidates."""
+        media_by_id = self.get_catalog().media_by_id
         user_key = str(user_id).strip() if user_id else ""
-        if user_key:
-            ml_scores = self._get_ml_prediction_scores_for_media(
-                user_id=user_key,
-                media_ids=[item["mediaId"] for item in items],
-            )
-            for item in items:
-                if item["mediaId"] in ml_scores:
-                    item["mlScore"] = round(float(ml_scores[item["mediaId"]]), 3)
-
-        for item in items:
-            item["matchReason"] = reason
-
-        items.sort(key=lambda item: (float(item["overallRate"]), int(item["ratingsCount"])), reverse=True)
-        if user_key:
-            items.sort(key=lambda item: float(item.get("mlScore", -1)), reverse=True)
-        return items[:limit]
-
-    def _build_occasion_section(
-        self,
-        *,
-        definition: "OccasionDefinition",
-        user_id: str | None,
-        limit: int,
-        excluded_media_ids: set[str],
-    ) -> dict:
-        all_media = [dict(item) for item in self.provider.get_media()]
-        media_by_id = {item["mediaId"]: item for item in all_media}
-        curated_ids = OCCASION_MEDIA_IDS_BY_OCCASION.get(definition.id, [])
-        curated_items: list[dict] = []
-        seen_media_ids: set[str] = set()
-
-        for media_id in curated_ids:
-            item = media_by_id.get(media_id)
-            if not item or media_id in excluded_media_ids:
-                continue
-            prepared = dict(item)
-            prepared["matchReason"] = definition.reason
-            curated_items.append(prepared)
-            seen_media_ids.add(media_id)
-            if len(curated_items) >= limit:
-                break
 
-        fallback_items: list[dict] = []
-        if len(curated_items) < limit:
-            filtered = self._filter_media_by_city_ids(
-                city_ids=definition.city_ids,
-                excluded_media_ids=excluded_media_ids.union(seen_media_ids),
-            )
-            fallback_items = self._rank_weather_candidates(
-                filtered,
-                user_id=user_id,
-                reason=definition.reason,
-                limit=max(0, limit - len(curated_items)),
+        curated_by_section = []
+        to_score: dict[str, None] = {}
+        for template in templates:
+            curated = [media_id for media_id in template.curated_ids if media_id not in excluded_media_ids][:limit]
+            curated_by_section.append(curated)
+            if user_key and len(curated) < limit:
+                to_score.update(
+                    dict.fromkeys(media_id for media_id in template.candidate_ids if media_id not in excluded_media_ids)
+                )
+        ml_scores: dict[str, float] = {}
+        if to_score:
+            predicted = self._get_ml_prediction_scores_for_media(user_id=user_key, media_ids=list(to_score))
+            ml_scores = {media_id: round(float(score), 3) for media_id, score in predicted.items()}
+
+        sections = []
+        for template, curated in zip(templates, curated_by_section):
+            items = [{**media_by_id[media_id], "matchReason": template.reason} for media_id in curated]
+            if len(items) < limit:
+                taken = set(curated)
+                candidates = [
+                    media_id
+                    for media_id in template.candidate_ids
+                    if media_id not in excluded_media_ids and media_id not in taken
+                ]
+                if user_key:
+                    # Stable, so equal ML scores keep the rating order.
+                    candidates.sort(key=lambda media_id: ml_scores.get(media_id, -1), reverse=True)
+                for media_id in candidates[: limit - len(items)]:
+                    item = {**media_by_id[media_id], "matchReason": template.reason}
+                    if media_id in ml_scores:
+                        item["mlScore"] = ml_scores[media_id]
+                    items.append(item)
+            sections.append(
+                {"id": template.id, "title": template.title, "subtitle": template.subtitle, "items": items}
             )
-
-        items = (curated_items + fallback_items)[:limit]
-        return {
-            "id": definition.id,
-            "title": definition.title,
-            "subtitle": definition.subtitle,
-            "items": items,
-        }
+        return sections
 
     def _get_db_ratings_by_media(self, user_id: str) -> dict[str, float]:
         user_uuid = _parse_uuid(user_id)
@@ -681,16 +759,72 @@ class RecommendationService:
             for item in Team5MediaRating.objects.filter(user_id=user_uuid)
         }
 
-    def train(self):
+    def get_als(
+        self,
+        user_id: str,
+        limit: int = DEFAULT_LIMIT,
+        excluded_media_ids: set[str] | None = None,
+    ) -> list[MediaRecord]:
+        user_key = str(user_id).strip()
+        if limit <= 0 or not user_key or not self._ensure_implicit_model_ready():
+            return []
+        excluded = excluded_media_ids or set()
+        try:
+            predictions = self.implicit_media_recommender_model.recommend(
+                user_key,
+                top_n=limit + len(excluded),
+                show_already_seen_items=False,
+            )
+        except NotTrainedYetException:
+            return []
+
+        media_by_id = self.get_catalog().media_by_id
+        output: list[MediaRecord] = []
+        for media_id, score in predictions:
+            media = media_by_id.get(media_id)
+            if not media or media_id in excluded:
+                continue
+            item = dict(media)
+            item["matchReason"] = "als_implicit"
+            item["mlScore"] = round(float(score), 3)
+            output.append(item)
+            if len(output) >= limit:
+                break
+        return output
+
+    def train(self, *, budget_seconds: float | None = None):
+        self._train_implicit_media_recommender_model()
+        return self._train_svd_models(budget_seconds=budget_seconds)
+
+    def _train_svd_models(self, *, budget_seconds: float | None = None):
         if not self._ml_enabled:
             self._models_ready = False
             return False
-        self._train_personalized_place_recommender_model()
-        self._train_personalized_media_recommender_model()
+        self._train_personalized_place_recommender_model(budget_seconds=budget_seconds)
+        self._train_personalized_media_recommender_model(budget_seconds=budget_seconds)
         return self._models_ready
 
-    def _train_personalized_place_recommender_model(self):
-        if self.personalized_place_recommender_model is None:
+    def export_models(self) -> dict:
+        """Trained models keyed by role, for persisting as warmup artifacts."""
+        models = {
+            "media": self.personalized_media_recommender_model,
+            "place": self.personalized_place_recommender_model,
+            "implicit": self.implicit_media_recommender_model,
+        }
+        return {name: model for name, model in models.items() if model is not None and model.is_trained}
+
+    def install_models(self, models: dict) -> None:
+        if models.get("media") is not None and self._ml_enabled:
+            self.personalized_media_recommender_model = models["media"]
+            self._models_ready = True
+        if models.get("place") is not None and self._ml_enabled:
+            self.personalized_place_recommender_model = models["place"]
+        if models.get("implicit") is not None and self._als_enabled:
+            self.implicit_media_recommender_model = models["implicit"]
+            self._implicit_model_ready = True
+
+    def _train_personalized_place_recommender_model(self, *, budget_seconds: float | None = None):
+        if not self._ml_enabled:
             return
         try:
             user_place_ratings = self._to_training_triples(
@@ -700,33 +834,64 @@ class RecommendationService:
                 rating_key="rate",
             )
             if user_place_ratings:
-                self.personalized_place_recommender_model.train(user_place_ratings)
+                if self.personalized_place_recommender_model is None:
+                    self.personalized_place_recommender_model = ml_loader.new_svd_model((0, 5))
+                self.personalized_place_recommender_model.train(user_place_ratings, budget_seconds=budget_seconds)
         except Exception:
             return
 
-    def _train_personalized_media_recommender_model(self):
-        if self.personalized_media_recommender_model is None:
+    def _train_personalized_media_recommender_model(self, *, budget_seconds: float | None = None):
+        try:
+            user_media_ratings = ml_loader.load_rating_arrays(self.provider.iter_media_rating_rows())
+            if len(user_media_ratings) and self.personalized_media_recommender_model is None:
+                self.personalized_media_recommender_model = ml_loader.new_svd_model((0, 5))
+        except ImportError:
+            self._ml_enabled = False
             self._models_ready = False
             return
-        user_media_ratings = self._to_training_triples(
-            rows=self.provider.get_all_media_ratings(),
-            user_key="userId",
-            item_key="mediaId",
-            rating_key="rate",
-        )
-        if user_media_ratings:
-            self.personalized_media_recommender_model.train(user_media_ratings)
+        if len(user_media_ratings):
+            self.personalized_media_recommender_model.train_arrays(user_media_ratings, budget_seconds=budget_seconds)
             self._models_ready = True
         else:
             self._models_ready = False
 
+    def _train_implicit_media_recommender_model(self):
+        if not self._als_enabled:
+            self._implicit_model_ready = False
+            return
+        try:
+            interactions = ml_loader.load_rating_arrays(
+                ml_loader.implicit_feedback_rows(
+                    self.provider.iter_media_rating_rows(),
+                    self.provider.iter_feedback_rows(),
+                )
+            )
+            if len(interactions):
+                if self.implicit_media_recommender_model is None:
+                    self.implicit_media_recommender_model = ml_loader.new_implicit_model()
+                self.implicit_media_recommender_model.train_arrays(interactions)
+                self._implicit_model_ready = True
+            else:
+                self._implicit_model_ready = False
+        except Exception:
+            self._implicit_model_ready = False
+        self._implicit_retry_at = 0.0 if self._implicit_model_ready else time.monotonic() + IMPLICIT_FIT_RETRY_SECONDS
+
+    def _ensure_implicit_model_ready(self) -> bool:
+        if not self._als_enabled:
+            return False
+        if not self._implicit_model_ready and time.monotonic() >= self._implicit_retry_at:
+            self._train_implicit_media_recommender_model()
+        return self._implicit_model_ready
+
     def _ensure_models_ready(self) -> bool:
-        if not self._ml_enabled or self.personalized_media_recommender_model is None:
+        if not self._ml_enabled:
             return False
         if self._models_ready:
             return True
         try:
-            return bool(self.train())
+            # The ALS model has its own lazy fit with backoff; only the SVD models are retried here.
+            return bool(self._train_svd_models())
         except Exception:
             self._models_ready = False
             return False
@@ -831,13 +996,24 @@ class RecommendationService:
         media_model_items = 0
         place_model_users = 0
         place_model_items = 0
+        implicit_model_users = 0
+        implicit_model_items = 0
+        media_model_training = None
+        place_model_training = None
 
         if self.personalized_media_recommender_model is not None:
             media_model_items = len(self.personalized_media_recommender_model.items)
-            media_model_users = len(self.personalized_media_recommender_model.user_item_rating_matrix.index)
+            media_model_users = self.personalized_media_recommender_model.user_count
+            if self.personalized_media_recommender_model.last_training is not None:
+                media_model_training = self.personalized_media_recommender_model.last_training.as_dict()
         if self.personalized_place_recommender_model is not None:
             place_model_items = len(self.personalized_place_recommender_model.items)
-            place_model_users = len(self.personalized_place_recommender_model.user_item_rating_matrix.index)
+            place_model_users = self.personalized_place_recommender_model.user_count
+            if self.personalized_place_recommender_model.last_training is not None:
+                place_model_training = self.personalized_place_recommender_model.last_training.as_dict()
+        if self.implicit_media_recommender_model is not None:
+            implicit_model_items = len(self.implicit_media_recommender_model.items)
+            implicit_model_users = self.implicit_media_recommender_model.user_count
 
         return {
             "mlEnabled": bool(self._ml_enabled),
@@ -848,6 +1024,11 @@ class RecommendationService:
             "mediaModelItems": media_model_items,
             "placeModelUsers": place_model_users,
             "placeModelItems": place_model_items,
+            "mediaModelTraining": media_model_training,
+            "placeModelTraining": place_model_training,
+            "implicitModelReady": bool(self._implicit_model_ready),
+            "implicitModelUsers": implicit_model_users,
+            "implicitModelItems": implicit_model_items,
         }
 
 
@@ -858,6 +1039,13 @@ def _parse_uuid(value: str) -> UUID | None:
         return None
 
 
+def _media_keywords(catalog: CatalogSnapshot, item: dict) -> frozenset[str] | set[str]:
+    keywords = catalog.keywords_by_media.get(item.get("mediaId"))
+    if keywords is None:
+        keywords = _extract_keywords(f"{item.get('title', '')} {item.get('caption', '')}")
+    return keywords
+
+
 def _extract_keywords(text: str) -> set[str]:
     text = text.lower()
     keywords = set()
@@ -886,6 +1074,39 @@ def _season_from_month(month: int) -> tuple[str, str]:
     return "پاییز", "autumn"
 
 
+# Season -> (city ids, tip) for the "go now" weather section.
+WEATHER_NOW_BY_SEASON: dict[str, tuple[list[str], str]] = {
+    "winter": (["kish", "qeshm", "bandarabbas", "shiraz"], "الان هوا زمستونی است؛ جنوب ایران معمولا مطبوع‌تره."),
+    "summer": (["ardabil", "astara", "tonkabon", "tabriz"], "الان هوا گرمه؛ مناطق خنک شمال و شمال‌غرب بهترن."),
+    "spring": (["shiraz", "isfahan", "mashhad", "tehran"], "بهار زمان خوبی برای شهرهای تاریخی و طبیعت‌گردیه."),
+    "autumn": (["shiraz", "isfahan", "kish", "qeshm"], "پاییز برای سفرهای شهری و جنوب ایران گزینه خوبیه."),
+}
+WEATHER_SNOW_CITY_IDS = ["tabriz", "ardabil", "astara", "gorgan", "tonkabon"]
+WEATHER_SUMMER_CITY_IDS = ["ardabil", "astara", "tonkabon", "tabriz"]
+
+
+@dataclass(frozen=True)
+class SectionTemplate:
+    """Non-personalized part of a weather/occasion section."""
+
+    id: str
+    title: str
+    subtitle: str
+    reason: str
+    candidate_ids: tuple[str, ...]
+    # Hand-picked media shown before the ranked candidates (occasions only).
+    curated_ids: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class DailySections:
+    day: date
+    catalog_built_at: float
+    season_name: str
+    weather: tuple[SectionTemplate, ...]
+    occasions: tuple[SectionTemplate, ...]
+
+
 @dataclass(frozen=True)
 class OccasionDefinition:
     id: str
@@ -0,0 +1,72 @@
+"""Cached, batched text sentiment backed by the team5 database."""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Iterable
+
+from team5.models import Team5TextSentiment
+
+from .ml.text_sentiment import classify_batch, get_classifier, label_for_score, normalize_text
+
+
+DEFAULT_BATCH_SIZE = 64
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class SentimentService:
+    """Scores texts once: results persist in ``Team5TextSentiment`` keyed by normalized-text hash."""
+
+    def __init__(self, *, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.batch_size = max(1, int(batch_size))
+
+    def classifier_available(self) -> bool:
+        return get_classifier() is not None
+
+    def score(self, text: str) -> float:
+        return self.score_many([text]).get(text, 0.0)
+
+    def score_many(self, texts: Iterable[str]) -> dict[str, float]:
+        """Return ``{text: signed score}``; only texts missing from the cache reach the classifier."""
+        texts = list(texts)
+        hash_by_text: dict[str, str] = {}
+        normalized_by_hash: dict[str, str] = {}
+        for text in texts:
+            normalized = normalize_text(text)
+            if text in hash_by_text or not normalized:
+                continue
+            digest = text_hash(normalized)
+            hash_by_text[text] = digest
+            normalized_by_hash[digest] = normalized
+
+        score_by_hash: dict[str, float] = {}
+        hashes = list(normalized_by_hash)
+        for start in range(0, len(hashes), self.batch_size):
+            batch = hashes[start:start + self.batch_size]
+            cached = Team5TextSentiment.objects.filter(text_hash__in=batch).values_list("text_hash", "score")
+            score_by_hash.update({digest: float(score) for digest, score in cached})
+            missing = [digest for digest in batch if digest not in score_by_hash]
+            if missing:
+                score_by_hash.update(self._classify_and_store(missing, normalized_by_hash))
+
+        return {text: score_by_hash.get(hash_by_text.get(text, ""), 0.0) for text in texts}
+
+    def _classify_and_store(self, hashes: list[str], normalized_by_hash: dict[str, str]) -> dict[str, float]:
+        scores = classify_batch([normalized_by_hash[digest] for digest in hashes])
+        result = dict(zip(hashes, scores))
+        # Without a classifier every score is a placeholder 0.0; keep it out of the cache.
+        if get_classifier() is not None:
+            Team5TextSentiment.objects.bulk_create(
+                [
+                    Team5TextSentiment(text_hash=digest, score=score, label=label_for_score(score))
+                    for digest, score in result.items()
+                ],
+                ignore_conflicts=True,
+            )
+        return result
+
+
+sentiment_service = SentimentService()
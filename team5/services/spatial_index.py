@@ -0,0 +1,162 @@
+"""k-nearest and radius queries over city/place coordinates.
+
+Points are stored as unit vectors on the sphere, where straight-line (chord)
+order matches great-circle order, so a ``scipy.spatial.cKDTree`` over them
+answers nearest and within-radius queries exactly. Final distances are
+haversine kilometres computed with NumPy for the candidates only. Without SciPy
+the same queries fall back to a vectorized scan over all points.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable
+
+EARTH_RADIUS_KM = 6371.0
+
+
+class SpatialIndex:
+    """Immutable index over records carrying ``coordinates`` (or ``latitude``/``longitude``)."""
+
+    def __init__(self, records: list[dict], latitudes: list[float], longitudes: list[float]):
+        import numpy as np
+
+        self.records = records
+        self._latitudes = np.radians(np.asarray(latitudes, dtype=np.float64))
+        self._longitudes = np.radians(np.asarray(longitudes, dtype=np.float64))
+        self._points = _unit_vectors(self._latitudes, self._longitudes)
+        self._tree = _build_tree(self._points) if records else None
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict]) -> "SpatialIndex":
+        """Index every record with usable coordinates; the others are skipped."""
+        kept, latitudes, longitudes = [], [], []
+        for record in records:
+            coordinates = record_coordinates(record)
+            if coordinates is None:
+                continue
+            kept.append(record)
+            latitudes.append(coordinates[0])
+            longitudes.append(coordinates[1])
+        return cls(kept, latitudes, longitudes)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        *,
+        k: int = 1,
+        max_distance_km: float | None = None,
+    ) -> list[tuple[dict, float]]:
+        """Up to ``k`` ``(record, distance_km)`` pairs, closest first."""
+        k = min(max(1, int(k)), len(self.records))
+        if not k:
+            return []
+        point = _unit_vectors(math.radians(latitude), math.radians(longitude))
+        if self._tree is not None:
+            _, indices = self._tree.query(point, k=k)
+            indices = [int(index) for index in ([indices] if k == 1 else indices)]
+        else:
+            indices = self._closest_by_scan(point, k)
+        return self._with_distances(latitude, longitude, indices, max_distance_km)
+
+    def within(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        *,
+        limit: int | None = None,
+    ) -> list[tuple[dict, float]]:
+        """``(record, distance_km)`` pairs within ``radius_km``, closest first."""
+        if not self.records or radius_km < 0:
+            return []
+        point = _unit_vectors(math.radians(latitude), math.radians(longitude))
+        if self._tree is not None:
+            indices = self._tree.query_ball_point(point, r=_chord_length(radius_km))
+        else:
+            indices = self._within_by_scan(point, _chord_length(radius_km))
+        matches = self._with_distances(latitude, longitude, [int(index) for index in indices], radius_km)
+        return matches if limit is None else matches[: max(0, int(limit))]
+
+    def _with_distances(
+        self,
+        latitude: float,
+        longitude: float,
+        indices: list[int],
+        max_distance_km: float | None,
+    ) -> list[tuple[dict, float]]:
+        if not indices:
+            return []
+        distances = haversine_km(
+            math.radians(latitude),
+            math.radians(longitude),
+            self._latitudes[indices],
+            self._longitudes[indices],
+        )
+        pairs = sorted(zip(distances.tolist(), indices))
+        return [
+            (self.records[index], distance)
+            for distance, index in pairs
+            if max_distance_km is None or distance <= max_distance_km
+        ]
+
+    def _closest_by_scan(self, point, k: int) -> list[int]:
+        import numpy as np
+
+        squared = ((self._points - point) ** 2).sum(axis=1)
+        candidates = np.argpartition(squared, k - 1)[:k] if k < len(squared) else np.arange(len(squared))
+        return candidates[np.argsort(squared[candidates])].tolist()
+
+    def _within_by_scan(self, point, chord: float) -> list[int]:
+        import numpy as np
+
+        squared = ((self._points - point) ** 2).sum(axis=1)
+        return np.flatnonzero(squared <= chord * chord).tolist()
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km; arguments are radians and may be NumPy arrays."""
+    import numpy as np
+
+    a = np.sin((lat2 - lat1) / 2.0) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def record_coordinates(record: dict) -> tuple[float, float] | None:
+    coordinates = record.get("coordinates") or []
+    if not coordinates and "latitude" in record and "longitude" in record:
+        coordinates = [record["latitude"], record["longitude"]]
+    if len(coordinates) != 2:
+        return None
+    try:
+        latitude, longitude = float(coordinates[0]), float(coordinates[1])
+    except (TypeError, ValueError):
+        return None
+    if not (math.isfinite(latitude) and math.isfinite(longitude)):
+        return None
+    return latitude, longitude
+
+
+def _unit_vectors(latitudes, longitudes):
+    import numpy as np
+
+    cos_lat = np.cos(latitudes)
+    return np.stack([cos_lat * np.cos(longitudes), cos_lat * np.sin(longitudes), np.sin(latitudes)], axis=-1)
+
+
+def _chord_length(distance_km: float) -> float:
+    # Radii past half the circumference cover the whole sphere (chord 2).
+    angle = min(float(distance_km) / EARTH_RADIUS_KM, math.pi)
+    return 2.0 * math.sin(angle / 2.0) + 1e-12
+
+
+def _build_tree(points):
+    try:
+        from scipy.spatial import cKDTree
+    except ImportError:
+        return None
+    return cKDTree(points)
@@ -0,0 +1,156 @@
+"""Worker warmup: get models, catalog and strategies hot before serving traffic."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+
+from .geoip import get_geoip_database
+from .model_artifacts import load_models, save_models
+from .occasions_catalog import ensure_occasion_media_seeded
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WARMUP_BUDGET_SECONDS = 30.0
+
+
+class WarmupState:
+    """Per-process warmup progress, reported by ``/team5/api/ready``."""
+
+    COLD = "cold"
+    WARMING = "warming"
+    READY = "ready"
+    FAILED = "failed"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.status = self.COLD
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.steps: dict[str, float] = {}
+        self.model_source = ""
+        self.error = ""
+
+    @property
+    def ready(self) -> bool:
+        return self.status == self.READY
+
+    def begin(self) -> bool:
+        """Claim the warmup; False when another thread already started or finished it."""
+        with self._lock:
+            if self.status in (self.WARMING, self.READY):
+                return False
+            self.status = self.WARMING
+            self.started_at = time.time()
+            self.finished_at = None
+            self.steps = {}
+            self.error = ""
+            return True
+
+    def finish(self, *, error: str = "") -> None:
+        with self._lock:
+            self.status = self.FAILED if error else self.READY
+            self.error = error
+            self.finished_at = time.time()
+
+    def as_dict(self) -> dict:
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = round((self.finished_at or time.time()) - self.started_at, 3)
+        return {
+            "ready": self.ready,
+            "status": self.status,
+            "elapsedSeconds": elapsed,
+            "steps": {name: round(seconds, 3) for name, seconds in self.steps.items()},
+            "modelSource": self.model_source,
+            "error": self.error,
+        }
+
+
+warmup_state = WarmupState()
+
+
+def warm_up(service, *, state: WarmupState = warmup_state) -> bool:
+    """Run every warmup step synchronously; returns whether the worker ended up ready."""
+    if not state.begin():
+        return state.ready
+    try:
+        _timed(state, "catalog", lambda: _warm_catalog(service))
+        _timed(state, "geoip", get_geoip_database)
+        _timed(state, "models", lambda: _prepare_models(service, state))
+        _timed(state, "strategies", lambda: _exercise_strategies(service))
+    except Exception as exc:
+        logger.exception("team5 warmup failed")
+        state.finish(error=f"{type(exc).__name__}: {exc}")
+    else:
+        state.finish()
+    return state.ready
+
+
+def start_warmup(service, *, state: WarmupState = warmup_state) -> bool:
+    """Warm up in a daemon thread; returns False when a warmup already ran or is running."""
+    if state.status in (WarmupState.WARMING, WarmupState.READY):
+        return False
+    thread = threading.Thread(target=_warm_up_in_thread, args=(service, state), name="team5-warmup", daemon=True)
+    thread.start()
+    return True
+
+
+def _warm_up_in_thread(service, state: WarmupState) -> None:
+    try:
+        warm_up(service, state=state)
+    finally:
+        connections.close_all()
+
+
+def _timed(state: WarmupState, name: str, step) -> None:
+    started = time.perf_counter()
+    step()
+    state.steps[name] = time.perf_counter() - started
+
+
+def _warm_catalog(service) -> None:
+    # Built-in occasion media are part of the catalog; a no-op once this seed version is applied.
+    ensure_occasion_media_seeded()
+    catalog = service.get_catalog()
+    catalog.city_resolver()
+    catalog.place_index()
+
+
+def _prepare_models(service, state: WarmupState) -> None:
+    artifact_dir = getattr(settings, "TEAM5_MODEL_ARTIFACT_DIR", "")
+    fresh = load_models(service, artifact_dir) if artifact_dir else None
+    if fresh:
+        state.model_source = "artifact"
+        return
+    budget = getattr(settings, "TEAM5_WARMUP_BUDGET_SECONDS", DEFAULT_WARMUP_BUDGET_SECONDS)
+    service.train(budget_seconds=budget)
+    state.model_source = "artifact+fit" if fresh is False else "fit"
+    persist_models(service)
+
+
+def persist_models(service) -> None:
+    """Save the service's models when ``TEAM5_MODEL_ARTIFACT_DIR`` is configured."""
+    artifact_dir = getattr(settings, "TEAM5_MODEL_ARTIFACT_DIR", "")
+    if artifact_dir:
+        save_models(service, artifact_dir)
+
+
+def _exercise_strategies(service) -> None:
+    """Call each strategy once so lazy imports, query plans and model caches are hot."""
+    user_id = next((str(row[0]) for row in service.provider.iter_media_rating_rows(chunk_size=1)), "")
+    catalog = service.get_catalog()
+    city_id = catalog.places[0]["cityId"] if catalog.places else ""
+    service.get_popular(limit=1)
+    service.get_random(limit=1, user_id=user_id or None)
+    service.get_weather_recommendations(limit=1, user_id=user_id or None)
+    service.get_occasion_recommendations(limit=1, user_id=user_id or None)
+    if city_id:
+        service.get_nearest_by_city(city_id, limit=1, user_id=user_id or None)
+    if user_id:
+        service.get_personalized(user_id, limit=1)
+        service.get_als(user_id, limit=1)
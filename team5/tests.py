@@ -1,7 +1,67 @@
+import json
+import math
+import os
+import random
+import runpy
+import tempfile
+from io import StringIO
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.management import CommandError, call_command
+from django.db import connections
+from django.db.models import QuerySet
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
-from team5.models import Team5City, Team5Media, Team5MediaRating, Team5Place, Team5RecommendationFeedback
+from core.jwt_utils import create_access_token
+from team5.apps import PRELOAD_WARMUP_ENV
+from team5.management.commands.serve_team5 import GUNICORN_CONFIG, gunicorn_argv
+from team5.management.commands.team5_import_times import measure_import
+from team5.models import (
+    Team5City,
+    Team5CityAlias,
+    Team5FeedbackDaily,
+    Team5FeedbackExclusion,
+    Team5Media,
+    Team5MediaComment,
+    Team5MediaRating,
+    Team5Place,
+    Team5RecommendationFeedback,
+    Team5TextSentiment,
+    Team5UserCommentSignal,
+)
+from team5.services.batch_worker import BatchWorkerPool
+from team5.services.catalog_cache import CatalogCache
+from team5.services.city_resolver import CityResolver, normalize_city_name
+from team5.services.comment_sentiment import classify_pending_comments, comment_batch_handler
+from team5.services.comment_signals import SNIPPET_LENGTH, load_comment_signal, rebuild_comment_signals
+from team5.services.db_provider import DatabaseProvider
+from team5.services.evaluation import EvaluationConfig, load_evaluation_data, run_evaluation
+from team5.services.feedback_archive import iter_archived_feedback
+from team5.services.feedback_store import (
+    load_excluded_media_ids,
+    rebuild_daily_rollups,
+    record_feedback,
+    write_feedback_batch,
+)
+from team5.services.geo_cache import GeoLookupCache, cache_key
+from team5.services.geoip import GeoIPDatabase, compile_geoip_csv
+from team5.services.hll import HyperLogLog
+from team5.services.location_service import geo_cache, resolve_client_city
+from team5.services.occasions_catalog import ensure_occasion_media_seeded
+from team5.services import occasions_catalog
+from team5.services.ml.blocked_scoring import score_top_k
+from team5.services.ml.implicit_als import ImplicitALSModel, implicit_feedback_rows
+from team5.services.ml.recommender_model import RecommenderModel
+from team5.services.ml.training_data import build_trainset, load_rating_arrays
+from team5.services.recommendation_service import RecommendationService
+from team5.views import recommendation_service
+from team5.services.spatial_index import SpatialIndex
+from team5.services.warmup import WarmupState, warm_up
 
 User = get_user_model()
 
@@ -82,6 +142,12 @@ class Team5RecommendationApiTests(TestCase):
                 liked=True,
             )
 
+    def setUp(self):
+        # The views' service outlives each test's data; don't let a cached catalog leak between tests.
+        recommendation_service.catalog_cache.invalidate()
+        # The process-wide "occasion media already seeded" flag outlives each test's rollback.
+        occasions_catalog.forget_applied_seed()
+
     def test_cities_contract(self):
         res = self.client.get("/team5/api/cities/")
         self.assertEqual(res.status_code, 200)
@@ -120,6 +186,71 @@ class Team5RecommendationApiTests(TestCase):
         self.assertGreaterEqual(payload["count"], 1)
         self.assertTrue(all(item["matchReason"] == "your_nearest" for item in payload["items"]))
 
+    def test_nearby_recommendations_are_limited_by_radius_and_ranked_by_distance(self):
+        res = self.client.get("/team5/api/recommendations/nearby/?lat=35.70&lon=51.34&radiusKm=3")
+        self.assertEqual(res.status_code, 200)
+        payload = res.json()
+        self.assertEqual(payload["kind"], "nearby")
+        self.assertEqual([item["mediaId"] for item in payload["items"]], ["m3"])
+        self.assertLess(payload["items"][0]["distanceKm"], 1.0)
+
+        res = self.client.get("/team5/api/recommendations/nearby/?lat=35.75&lon=51.37&radiusKm=20")
+        items = res.json()["items"]
+        self.assertEqual([item["mediaId"] for item in items], ["m9", "m3"])
+        self.assertTrue(all(item["matchReason"] == "nearby" for item in items))
+
+        self.assertEqual(self.client.get("/team5/api/recommendations/nearby/?lat=95&lon=51").status_code, 400)
+        self.assertEqual(
+            self.client.get("/team5/api/recommendations/nearby/?lat=35.7&lon=51.3&radiusKm=0").status_code, 400
+        )
+
+    def test_city_resolver_is_built_from_the_alias_table(self):
+        Team5CityAlias.objects.create(city_id="tehran", alias="تهران", language="fa")
+        resolver = CatalogCache(DatabaseProvider(), lambda text: set()).get().city_resolver()
+
+        self.assertEqual(resolver.by_name("تهران")["cityId"], "tehran")
+        self.assertEqual(resolver.by_name(" TEHRAN ")["cityId"], "tehran")
+        self.assertEqual(resolver.by_id("Tehran")["cityName"], "Tehran")
+        self.assertEqual(resolver.nearest(35.70, 51.40)["cityId"], "tehran")
+
+    def test_occasions_endpoint_seeds_once_and_then_only_reads(self):
+        self.assertTrue(ensure_occasion_media_seeded())
+        self.assertTrue(Team5Media.objects.filter(media_id="occasion-22bahman-azadi").exists())
+
+        # A fresh worker only checks the stored checksum; nothing is written on the read path.
+        occasions_catalog.forget_applied_seed()
+        with CaptureQueriesContext(connections["team5"]) as queries:
+            res = self.client.get("/team5/api/recommendations/occasions/")
+        self.assertEqual(res.status_code, 200)
+        writes = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].lstrip().split(" ", 1)[0].upper() in {"INSERT", "UPDATE", "DELETE"}
+        ]
+        self.assertEqual(writes, [])
+        self.assertFalse(ensure_occasion_media_seeded())
+
+    def test_daily_sections_are_built_once_and_scored_in_one_ml_call(self):
+        service = RecommendationService(DatabaseProvider())
+        service.get_weather_recommendations(limit=5)
+        daily = service.get_daily_sections()
+
+        with mock.patch.object(service, "_rated_media_ids_in_cities") as rebuild, mock.patch.object(
+            service, "_get_ml_prediction_scores_for_media", return_value={"m9": 4.9, "m3": 1.0}
+        ) as ml_scores:
+            payload = service.get_occasion_recommendations(limit=5, user_id=str(self.user_main.id))
+            weather = service.get_weather_recommendations(limit=5, excluded_media_ids={"m9"})
+        rebuild.assert_not_called()
+        self.assertIs(service.get_daily_sections(), daily)
+        self.assertEqual(ml_scores.call_count, 1)
+
+        bahman = next(section for section in payload["sections"] if section["id"] == "bahman22")
+        fallback = [item for item in bahman["items"] if item["mediaId"] in {"m3", "m9"}]
+        self.assertEqual([item["mediaId"] for item in fallback], ["m9", "m3"])
+        self.assertTrue(
+            all(item["mediaId"] != "m9" for section in weather["sections"] for item in section["items"])
+        )
+
     def test_nearest_recommendations_requires_resolvable_location(self):
         res = self.client.get("/team5/api/recommendations/nearest/")
         self.assertEqual(res.status_code, 400)
@@ -204,12 +335,108 @@ class Team5RecommendationApiTests(TestCase):
         self.assertEqual(payload["storedMediaCount"], 2)
         self.assertEqual(Team5RecommendationFeedback.objects.count(), 1)
 
+    def test_ab_summary_reads_daily_rollups(self):
+        for user, version, liked in (
+            (self.user_main, "B", True),
+            (self.user_main, "B", False),
+            (self.user_second, "A", True),
+        ):
+            res = self.client.post(
+                "/team5/api/recommendations/feedback/",
+                data={"userId": str(user.id), "action": "popular", "liked": liked, "version": version},
+                content_type="application/json",
+            )
+            self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            sorted(Team5RecommendationFeedback.objects.values_list("ab_group", flat=True)), ["A", "B", "B"]
+        )
+
+        with self.assertNumQueries(1, using="team5"):
+            payload = self.client.get("/team5/api/recommendations/ab/summary/?days=7").json()
+
+        self.assertEqual(
+            payload["groups"]["B"],
+            {"impressions": 2, "likes": 1, "dislikes": 1, "uniqueUsers": 1, "likeRatePercent": 50.0},
+        )
+        self.assertEqual(payload["groups"]["A"]["likeRatePercent"], 100.0)
+        self.assertEqual(payload["deltaLikeRatePercent"], -50.0)
+        self.assertEqual(payload["byAction"]["popular"]["B"], {"impressions": 2, "likes": 1, "likeRate": 50.0})
+
+    def test_feedback_rollup_backfill_matches_incremental_rows(self):
+        for user, liked in ((self.user_main, True), (self.user_second, False), (self.user_main, True)):
+            self.client.post(
+                "/team5/api/recommendations/feedback/",
+                data={"userId": str(user.id), "action": "weather", "liked": liked, "version": "A"},
+                content_type="application/json",
+            )
+        incremental = list(Team5FeedbackDaily.objects.values_list("day", "ab_group", "action", "impressions", "likes"))
+        sketch = bytes(Team5FeedbackDaily.objects.get().users_sketch)
+
+        call_command("team5_backfill_feedback_rollups", stdout=StringIO())
+
+        rebuilt = Team5FeedbackDaily.objects.get()
+        self.assertEqual(incremental, [(rebuilt.day, "A", "weather", 3, 2)])
+        self.assertEqual(bytes(rebuilt.users_sketch), sketch)
+        self.assertEqual(HyperLogLog.from_bytes(sketch).count(), 2)
+
+    def test_feedback_batch_endpoint_queues_valid_events_for_bulk_write(self):
+        events = [
+            {"userId": str(self.user_main.id), "action": "popular", "liked": True, "version": "A"},
+            {"userId": "not-a-uuid", "action": "popular", "liked": True},
+            {"userId": str(self.user_second.id), "action": "popular", "liked": False, "version": "A"},
+        ]
+        with mock.patch("team5.views.feedback_writer") as writer:
+            res = self.client.post(
+                "/team5/api/recommendations/feedback/batch/",
+                data={"events": events},
+                content_type="application/json",
+            )
+
+        self.assertEqual(res.status_code, 202)
+        self.assertEqual(res.json()["accepted"], 2)
+        self.assertEqual([entry["index"] for entry in res.json()["rejected"]], [1])
+        queued = [call.args[0] for call in writer.submit.call_args_list]
+        self.assertEqual(Team5RecommendationFeedback.objects.count(), 0)
+
+        with CaptureQueriesContext(connections["team5"]) as captured:
+            write_feedback_batch(queued)
+
+        inserts = [
+            query["sql"]
+            for query in captured.captured_queries
+            if query["sql"].startswith('INSERT INTO "team5_team5recommendationfeedback"')
+        ]
+        self.assertEqual(len(inserts), 1)
+
+        self.assertEqual(Team5RecommendationFeedback.objects.count(), 2)
+        rollup = Team5FeedbackDaily.objects.get()
+        self.assertEqual((rollup.ab_group, rollup.impressions, rollup.likes), ("A", 2, 1))
+
+    def test_feedback_batch_drops_only_the_row_that_cannot_be_written(self):
+        rows = [
+            Team5RecommendationFeedback(user_id=self.user_main.id, action="popular", liked=True, ab_group="A"),
+            Team5RecommendationFeedback(user_id="not-a-uuid", action="popular", liked=True, ab_group="A"),
+            Team5RecommendationFeedback(user_id=self.user_second.id, action="popular", liked=False, ab_group="A"),
+        ]
+
+        with self.assertLogs("team5.services.feedback_store", level="WARNING"):
+            dropped = write_feedback_batch(rows)
+
+        self.assertEqual(dropped, 1)
+        self.assertEqual(
+            set(Team5RecommendationFeedback.objects.values_list("user_id", flat=True)),
+            {self.user_main.id, self.user_second.id},
+        )
+        rollup = Team5FeedbackDaily.objects.get()
+        self.assertEqual((rollup.impressions, rollup.likes), (2, 1))
+
     def test_popular_excludes_previous_disliked_set_on_next_click(self):
-        Team5RecommendationFeedback.objects.create(
+        record_feedback(
             user_id=self.user_main.id,
             action="popular",
             liked=False,
             shown_media_ids=["m3"],
+            ab_group="A",
         )
         res = self.client.get(f"/team5/api/recommendations/popular/?userId={self.user_main.id}&limit=10")
         self.assertEqual(res.status_code, 200)
@@ -217,6 +444,117 @@ class Team5RecommendationApiTests(TestCase):
         returned_ids = [item["mediaId"] for item in payload["items"]]
         self.assertNotIn("m3", returned_ids)
 
+    def test_exclusions_follow_latest_feedback_per_user_and_action(self):
+        user_id = self.user_main.id
+        record_feedback(user_id=user_id, action="weather", liked=False, shown_media_ids=["m3", "m9"], ab_group="A")
+        write_feedback_batch(
+            [
+                Team5RecommendationFeedback(user_id=user_id, action="weather", liked=False, shown_media_ids=["m9"]),
+                Team5RecommendationFeedback(user_id=user_id, action="nearest", liked=True, shown_media_ids=["m3"]),
+            ]
+        )
+
+        with self.assertNumQueries(1, using="team5"):
+            excluded = load_excluded_media_ids(user_id=self.user_main.id, action="weather")
+        self.assertEqual(excluded, {"m9"})
+        self.assertEqual(load_excluded_media_ids(user_id=self.user_main.id, action="nearest"), set())
+        self.assertEqual(load_excluded_media_ids(user_id=self.user_second.id, action="weather"), set())
+        self.assertEqual(Team5FeedbackExclusion.objects.count(), 2)
+
+    def test_exclusion_insert_race_is_retried_as_update(self):
+        user_id = self.user_main.id
+        Team5FeedbackExclusion.objects.create(
+            user_id=user_id,
+            action="weather",
+            excluded_media_ids=["m1"],
+            feedback_created_at=timezone.now() - timedelta(minutes=1),
+        )
+        real_select_for_update = QuerySet.select_for_update
+        reads = []
+
+        def first_read_misses(queryset, *args, **kwargs):
+            # The first read runs before the competing writer's row is committed.
+            reads.append(queryset)
+            locked = real_select_for_update(queryset, *args, **kwargs)
+            return locked.none() if len(reads) == 1 else locked
+
+        with mock.patch.object(QuerySet, "select_for_update", autospec=True, side_effect=first_read_misses):
+            feedback = record_feedback(
+                user_id=user_id, action="weather", liked=False, shown_media_ids=["m9"], ab_group="A"
+            )
+
+        self.assertEqual(len(reads), 2)
+        self.assertTrue(Team5RecommendationFeedback.objects.filter(pk=feedback.pk).exists())
+        self.assertEqual(load_excluded_media_ids(user_id=user_id, action="weather"), {"m9"})
+        self.assertEqual(Team5FeedbackExclusion.objects.count(), 1)
+
+    def test_archive_moves_old_feedback_to_daily_segments(self):
+        now = timezone.now()
+        for days_ago, liked in ((120, True), (100, False), (1, True)):
+            feedback = record_feedback(
+                user_id=self.user_main.id, action="popular", liked=liked, shown_media_ids=["m3"], ab_group="A"
+            )
+            Team5RecommendationFeedback.objects.filter(pk=feedback.pk).update(created_at=now - timedelta(days=days_ago))
+
+        with tempfile.TemporaryDirectory() as archive_dir:
+            call_command("team5_archive_feedback", older_than_days=30, archive_dir=archive_dir, stdout=StringIO())
+            call_command("team5_archive_feedback", older_than_days=30, archive_dir=archive_dir, stdout=StringIO())
+
+            self.assertEqual(Team5RecommendationFeedback.objects.count(), 1)
+            manifest = json.loads((Path(archive_dir) / "manifest.json").read_text(encoding="utf-8"))
+            self.assertEqual(len(manifest["segments"]), 2)
+            self.assertTrue(all(segment["rows"] == 1 for segment in manifest["segments"].values()))
+            archived = list(iter_archived_feedback(archive_dir))
+            self.assertEqual([event["liked"] for event in archived], [True, False])
+
+            data = load_evaluation_data(archive_dir=archive_dir)
+            self.assertEqual(len(data.feedback), 3)
+
+            rebuild_daily_rollups(archive_dir=archive_dir)
+            self.assertEqual(Team5FeedbackDaily.objects.count(), 3)
+            self.assertEqual(sum(Team5FeedbackDaily.objects.values_list("impressions", flat=True)), 3)
+
+    def test_als_strategy_uses_feedback_logs(self):
+        Team5RecommendationFeedback.objects.create(
+            user_id=self.user_main.id,
+            action="als",
+            liked=True,
+            shown_media_ids=["m3", "m9"],
+        )
+        res = self.client.get(
+            f"/team5/api/recommendations/?userId={self.user_second.id}&strategy=als&version=A&limit=5"
+        )
+        self.assertEqual(res.status_code, 200)
+        payload = res.json()
+        self.assertEqual(payload["metadata"]["applied_strategy"], "als")
+        self.assertEqual([item["mediaId"] for item in payload["data"]["items"]], ["m9"])
+        self.assertEqual(payload["data"]["items"][0]["matchReason"], "als_implicit")
+
+    def test_ready_endpoint_reports_cold_worker_and_starts_warmup(self):
+        with mock.patch("team5.views.warmup_state", WarmupState()), mock.patch("team5.views.start_warmup") as start:
+            res = self.client.get("/team5/api/ready")
+        self.assertEqual(res.status_code, 503)
+        self.assertFalse(res.json()["ready"])
+        start.assert_called_once()
+
+    def test_warmup_fits_persists_and_reloads_models(self):
+        with tempfile.TemporaryDirectory() as artifact_dir, override_settings(TEAM5_MODEL_ARTIFACT_DIR=artifact_dir):
+            state = WarmupState()
+            self.assertTrue(warm_up(RecommendationService(DatabaseProvider()), state=state))
+            self.assertEqual(state.model_source, "fit")
+            self.assertEqual(set(state.steps), {"catalog", "geoip", "models", "strategies"})
+
+            reloaded_state = WarmupState()
+            reloaded = RecommendationService(DatabaseProvider())
+            self.assertTrue(warm_up(reloaded, state=reloaded_state))
+            self.assertEqual(reloaded_state.model_source, "artifact")
+            self.assertTrue(reloaded.get_ml_status()["modelsReady"])
+
+            with mock.patch("team5.views.warmup_state", reloaded_state):
+                res = self.client.get("/team5/api/ready")
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.json()["ready"])
+
     def test_train(self):
         res = self.client.post("/team5/api/train")
         self.assertEqual(res.status_code, 200)
@@ -228,3 +566,680 @@ class Team5RecommendationApiTests(TestCase):
         self.assertIn("mlEnabled", payload)
         self.assertIn("modelsReady", payload)
         self.assertIn("mediaRatingsSamples", payload)
+
+    def test_ml_status_reports_training_epochs_and_budget(self):
+        self.client.post("/team5/api/train")
+        payload = self.client.get("/team5/api/ml/status").json()
+        training = payload["mediaModelTraining"]
+        self.assertGreater(training["epochs"], 0)
+        self.assertLessEqual(training["epochs"], training["maxEpochs"])
+        self.assertIn("budgetSeconds", training)
+        self.assertIn("stoppedBy", training)
+
+
+class Team5BlockedScoringTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        rows = [
+            (f"u{user}", f"m{(user * 7 + offset) % 40}", float(1 + (user + offset) % 5))
+            for user in range(30)
+            for offset in range(6)
+        ]
+        cls.model = RecommenderModel((0, 5))
+        cls.model.train(rows)
+        cls.snapshot = cls.model.factor_snapshot()
+
+    def test_blocked_scores_match_per_item_predict_loop(self):
+        results = score_top_k(self.snapshot, k=5, user_block_size=4, item_block_size=7, workers=1)
+        self.assertEqual(len(results), 30)
+        for user_id in ("u0", "u13", "u29"):
+            expected = self.model.recommend(user_id, top_n=5)
+            self.assertEqual(len(results[user_id]), 5)
+            for (_, got), (_, want) in zip(results[user_id], expected):
+                self.assertAlmostEqual(got, want, places=9)
+
+    def test_blocked_scores_exclude_seen_items(self):
+        results = score_top_k(self.snapshot, k=40, user_ids=["u3", "unknown"], workers=1)
+        self.assertEqual(set(results), {"u3"})
+        seen = {item for item in self.model.items if item not in {m for m, _ in results["u3"]}}
+        self.assertEqual(seen, self.model.seen_items("u3"))
+
+    def test_process_pool_matches_in_process_scoring(self):
+        in_process = score_top_k(self.snapshot, k=5, user_block_size=8, workers=1)
+        pooled = score_top_k(self.snapshot, k=5, user_block_size=8, workers=2)
+        self.assertEqual(in_process, pooled)
+
+
+class Team5ImplicitALSTests(SimpleTestCase):
+    def test_recommends_items_from_the_users_cluster(self):
+        ratings = [(f"a{user}", f"a-item{(user + offset) % 6}", 5.0) for user in range(12) for offset in range(3)]
+        ratings += [(f"b{user}", f"b-item{(user + offset) % 6}", 5.0) for user in range(12) for offset in range(3)]
+        feedback = [("a0", False, ["b-item0", "b-item1"])]
+        model = ImplicitALSModel(factors=4, iterations=15, random_state=7)
+        model.train(list(implicit_feedback_rows(ratings, feedback)))
+
+        recommended = [item for item, _ in model.recommend("a0", top_n=3)]
+        self.assertEqual(len(recommended), 3)
+        self.assertTrue(all(item.startswith("a-item") for item in recommended))
+        self.assertNotIn("a-item0", recommended)
+        self.assertEqual(model.recommend("unknown"), [])
+
+    def test_feedback_rows_become_signed_weights(self):
+        rows = list(implicit_feedback_rows([("u1", "m1", 4.5)], [("u1", True, ["m2"]), ("u2", False, ["m1"])]))
+        self.assertEqual(rows, [("u1", "m1", 1.5), ("u1", "m2", 1.0), ("u2", "m1", -1.0)])
+
+    def test_empty_fit_backs_off_and_svd_retry_skips_als(self):
+        provider = mock.MagicMock()
+        provider.iter_media_rating_rows.side_effect = lambda *args, **kwargs: iter([])
+        provider.iter_feedback_rows.side_effect = lambda *args, **kwargs: iter([])
+        provider.get_all_place_ratings.return_value = []
+        service = RecommendationService(provider)
+        if not service._als_enabled:
+            self.skipTest("ALS dependencies are not installed")
+
+        self.assertEqual(service.get_als("u1"), [])
+        self.assertEqual(service.get_als("u1"), [])
+        self.assertEqual(provider.iter_feedback_rows.call_count, 1)
+
+        service._ensure_models_ready()
+        self.assertEqual(provider.iter_feedback_rows.call_count, 1)
+
+
+class Team5WarmStartTrainingTests(SimpleTestCase):
+    @staticmethod
+    def _rows():
+        import numpy as np
+
+        rng = np.random.default_rng(1)
+        users, items = rng.normal(0, 1, (60, 3)), rng.normal(0, 1, (40, 3))
+        return [
+            (f"u{user}", f"m{item}", float(np.clip(round(3 + users[user] @ items[item]), 1, 5)))
+            for user in range(60)
+            for item in rng.choice(40, 15, replace=False)
+        ]
+
+    def test_cold_fit_stops_once_holdout_rmse_plateaus(self):
+        model = RecommenderModel((0, 5), n_factors=8, n_epochs=300, lr_all=0.02)
+        model.train(self._rows())
+        report = model.last_training
+        self.assertEqual(report.stopped_by, "converged")
+        self.assertLess(report.epochs, 300)
+        self.assertIsNotNone(report.holdout_rmse)
+
+    def test_popular_item_bias_matches_surprise_on_skewed_data(self):
+        import numpy as np
+        import pandas as pd
+        from surprise import SVD, Dataset, Reader
+
+        rng = np.random.default_rng(0)
+        rows = []
+        for user in range(3000):
+            # Every user rates the same popular item, so it fills most of each mini-batch.
+            rows.append((f"u{user}", "popular", float(rng.choice([4.0, 4.5, 5.0]))))
+            rows.append((f"u{user}", f"m{user % 300}", float(rng.choice([1.0, 2.0, 3.0, 4.0, 5.0]))))
+        model = RecommenderModel((0, 5))
+        model.train(rows)
+
+        frame = pd.DataFrame(rows, columns=["user_id", "item_id", "rating"])
+        trainset = Dataset.load_from_df(frame, Reader(rating_scale=(0, 5))).build_full_trainset()
+        reference = SVD(random_state=42)
+        reference.fit(trainset)
+
+        ours = model.algo.bi[model.algo.trainset.to_inner_iid("popular")]
+        expected = reference.bi[trainset.to_inner_iid("popular")]
+        self.assertAlmostEqual(ours, expected, delta=0.2)
+
+    def test_final_pass_trains_on_held_out_ratings(self):
+        from team5.services.ml import sgd_training
+
+        rows = self._rows()
+        model = RecommenderModel((0, 5), n_factors=8, n_epochs=5, lr_all=0.02)
+        with mock.patch.object(sgd_training, "_sgd_epoch", wraps=sgd_training._sgd_epoch) as epoch:
+            model.train(rows)
+
+        report = model.last_training
+        self.assertTrue(report.holdout_pass)
+        self.assertEqual(epoch.call_count, report.epochs + 1)
+        epoch_rows = [call.args[2].size for call in epoch.call_args_list]
+        self.assertTrue(all(size < len(rows) for size in epoch_rows[:-1]))
+        self.assertEqual(sorted(epoch.call_args_list[-1].args[2].tolist()), list(range(len(rows))))
+
+    def test_final_pass_is_dropped_when_it_hurts_the_holdout(self):
+        from team5.services.ml import sgd_training
+
+        rows = self._rows()
+        real_epoch = sgd_training._sgd_epoch
+
+        def diverging_final_pass(algo, arrays, order, params, global_mean, batch_size):
+            real_epoch(algo, arrays, order, params, global_mean, batch_size)
+            if order.size == len(rows):
+                params[3][:] += 10.0
+
+        model = RecommenderModel((0, 5), n_factors=8, n_epochs=5, lr_all=0.02)
+        with mock.patch.object(sgd_training, "_sgd_epoch", side_effect=diverging_final_pass):
+            model.train(rows)
+
+        report = model.last_training
+        self.assertFalse(report.holdout_pass)
+        self.assertLess(float(abs(model.algo.bi).max()), 10.0)
+        self.assertIn("bestEpochHoldoutRmse", report.as_dict())
+
+    def test_retrain_resumes_from_previous_factors(self):
+        rows = self._rows()
+        model = RecommenderModel((0, 5), n_factors=8, n_epochs=300, lr_all=0.02)
+        model.train(rows)
+        cold = model.last_training
+        model.train(rows + [("new-user", "m1", 4.0)])
+        warm = model.last_training
+        self.assertEqual((warm.warm_users, warm.warm_items), (60, 40))
+        self.assertLess(warm.epochs, cold.epochs)
+        self.assertLessEqual(warm.holdout_rmse, cold.holdout_rmse + 1e-6)
+
+    def test_time_budget_caps_epochs(self):
+        model = RecommenderModel((0, 5), training_budget_seconds=0.0, n_factors=8, n_epochs=300)
+        model.train(self._rows())
+        self.assertEqual(model.last_training.stopped_by, "budget")
+        self.assertEqual(model.last_training.epochs, 1)
+
+
+class Team5ImportTimeTests(SimpleTestCase):
+    # Loose enough for slow CI boxes; the heavy-module assertion is the precise guard.
+    VIEWS_IMPORT_BUDGET_SECONDS = 1.0
+
+    def test_views_import_skips_ml_stack_and_stays_within_budget(self):
+        entry = measure_import("team5.views")
+        self.assertEqual(entry["heavyLoaded"], [])
+        self.assertLess(entry["seconds"], self.VIEWS_IMPORT_BUDGET_SECONDS)
+
+
+class Team5TrainingDataTests(SimpleTestCase):
+    def test_rows_are_streamed_into_encoded_arrays(self):
+        rows = [("u1", "m1", 5), ("u2", "m1", "4.5"), ("", "m2", 3), ("u1", "m3", "bad"), ("u1", "m2", 2.0)]
+        arrays = load_rating_arrays(iter(rows), chunk_size=2, size_hint=1)
+        self.assertEqual(len(arrays), 3)
+        self.assertEqual(arrays.user_ids, ["u1", "u2"])
+        self.assertEqual(arrays.item_ids, ["m1", "m2"])
+        self.assertEqual(arrays.user_codes.tolist(), [0, 1, 0])
+        self.assertEqual(arrays.item_codes.tolist(), [0, 0, 1])
+        self.assertEqual(arrays.ratings.tolist(), [5.0, 4.5, 2.0])
+
+    def test_trainset_matches_surprise_dataset_loader(self):
+        import pandas as pd
+        from surprise import Dataset, Reader
+
+        rows = [(f"u{i % 7}", f"m{(i * 3) % 11}", float(1 + i % 5)) for i in range(60)]
+        expected = Dataset.load_from_df(
+            pd.DataFrame(rows, columns=["user_id", "item_id", "rating"]), Reader(rating_scale=(0, 5))
+        ).build_full_trainset()
+        trainset = build_trainset(load_rating_arrays(rows), (0, 5))
+
+        self.assertEqual(trainset.n_ratings, expected.n_ratings)
+        self.assertEqual(trainset._raw2inner_id_users, expected._raw2inner_id_users)
+        self.assertEqual(trainset._raw2inner_id_items, expected._raw2inner_id_items)
+        self.assertEqual(list(trainset.all_ratings()), list(expected.all_ratings()))
+        self.assertAlmostEqual(trainset.global_mean, expected.global_mean)
+
+
+class Team5SentimentCacheTests(TestCase):
+    databases = {"default", "team5"}
+
+    @classmethod
+    def setUpTestData(cls):
+        Team5City.objects.create(city_id="shiraz", city_name="Shiraz", latitude=29.59, longitude=52.58)
+        Team5Place.objects.create(
+            place_id="shiraz-hafezieh", city_id="shiraz", place_name="Hafezieh", latitude=29.62, longitude=52.55
+        )
+        for idx in range(3):
+            Team5Media.objects.create(media_id=f"h{idx}", place_id="shiraz-hafezieh", title="Hafez tomb at night")
+        for idx in range(4):
+            Team5MediaRating.objects.create(
+                user_id=f"00000000-0000-0000-0000-00000000000{idx}", media_id=f"h{idx % 3}", rate=4.5
+            )
+
+    def test_place_ratings_classify_each_distinct_title_once(self):
+        with mock.patch("team5.services.sentiment_service.get_classifier", return_value=object()), mock.patch(
+            "team5.services.sentiment_service.classify_batch", side_effect=lambda texts: [0.8] * len(texts)
+        ) as classify:
+            first = DatabaseProvider().get_all_place_ratings()
+            second = DatabaseProvider().get_all_place_ratings()
+
+        self.assertEqual(classify.call_count, 1)
+        self.assertEqual(classify.call_args.args[0], ["hafez tomb at night"])
+        self.assertEqual(Team5TextSentiment.objects.count(), 1)
+        self.assertEqual(len(first), 4)
+        self.assertEqual(first, second)
+        self.assertAlmostEqual(first[0]["rate"], 2.5 + 2.0 * 0.8)
+
+
+
+class Team5CommentSentimentTests(TestCase):
+    databases = {"default", "team5"}
+
+    @classmethod
+    def setUpTestData(cls):
+        Team5City.objects.create(city_id="yazd", city_name="Yazd", latitude=31.89, longitude=54.36)
+        Team5Place.objects.create(
+            place_id="yazd-amir", city_id="yazd", place_name="Amir Chakhmaq", latitude=31.89, longitude=54.37
+        )
+        Team5Media.objects.create(media_id="y1", place_id="yazd-amir", title="Amir Chakhmaq at dusk")
+        cls.user = User.objects.create_user(email="commenter@test.com", password="Pass1234!Strong")
+
+    def setUp(self):
+        self.client.cookies["access_token"] = create_access_token(self.user)
+
+    def test_comment_is_stored_neutral_and_queued_for_scoring(self):
+        with mock.patch("team5.views.comment_sentiment_worker") as worker:
+            res = self.client.post(
+                "/team5/api/media/y1/comments/",
+                data=json.dumps({"userId": str(self.user.id), "body": "What a beautiful evening"}),
+                content_type="application/json",
+            )
+            missing = self.client.post(
+                "/team5/api/media/unknown/comments/",
+                data=json.dumps({"userId": str(self.user.id), "body": "hello"}),
+                content_type="application/json",
+            )
+
+        self.assertEqual(res.status_code, 202)
+        self.assertEqual(missing.status_code, 404)
+        comment = Team5MediaComment.objects.get(user_id=self.user.id, media_id="y1")
+        self.assertEqual(comment.sentiment_label, "neutral")
+        self.assertTrue(comment.sentiment_pending)
+        self.assertEqual(comment.user_email, "commenter@test.com")
+        worker.submit.assert_called_once_with(comment.id)
+
+        listed = self.client.get("/team5/api/media/y1/comments/").json()
+        self.assertTrue(listed["items"][0]["sentimentPending"])
+
+    def test_comment_requires_login_and_cannot_be_posted_for_another_user(self):
+        other = User.objects.create_user(email="victim@test.com", password="Pass1234!Strong")
+        with mock.patch("team5.views.comment_sentiment_worker") as worker:
+            forged = self.client.post(
+                "/team5/api/media/y1/comments/",
+                data=json.dumps({"userId": str(other.id), "body": "Forged"}),
+                content_type="application/json",
+            )
+            self.client.cookies.pop("access_token")
+            anonymous = self.client.post(
+                "/team5/api/media/y1/comments/",
+                data=json.dumps({"userId": str(self.user.id), "body": "Anonymous"}),
+                content_type="application/json",
+            )
+
+        self.assertEqual(forged.status_code, 403)
+        self.assertEqual(anonymous.status_code, 401)
+        self.assertFalse(Team5MediaComment.objects.exists())
+        worker.submit.assert_not_called()
+
+    def test_worker_batch_scores_pending_comments_and_refreshes_signal(self):
+        comment = Team5MediaComment.objects.create(
+            user_id=self.user.id, media_id="y1", body="Loved it", sentiment_pending=True
+        )
+        before = recommendation_service._get_comment_sentiment_signal(user_id=str(self.user.id))
+        self.assertEqual(before["positive_media_ids"], set())
+
+        with mock.patch("team5.services.sentiment_service.get_classifier", return_value=object()), mock.patch(
+            "team5.services.sentiment_service.classify_batch", side_effect=lambda texts: [0.9] * len(texts)
+        ):
+            comment_batch_handler(recommendation_service.invalidate_comment_signals)([comment.id])
+
+        comment.refresh_from_db()
+        self.assertEqual(comment.sentiment_label, "positive")
+        self.assertFalse(comment.sentiment_pending)
+        signal = recommendation_service._get_comment_sentiment_signal(user_id=str(self.user.id))
+        self.assertEqual(signal["positive_media_ids"], {"y1"})
+
+    def test_comments_stay_pending_without_a_classifier(self):
+        Team5MediaComment.objects.create(user_id=self.user.id, media_id="y1", body="Nice", sentiment_pending=True)
+        with mock.patch("team5.services.sentiment_service.get_classifier", return_value=None):
+            self.assertEqual(classify_pending_comments(), set())
+        self.assertTrue(Team5MediaComment.objects.get(media_id="y1").sentiment_pending)
+
+    def test_signal_upsert_omits_conflict_target_where_unsupported(self):
+        features = connections["team5"].features
+        with mock.patch.object(features, "supports_update_conflicts_with_target", False), mock.patch.object(
+            Team5UserCommentSignal.objects, "bulk_create"
+        ) as bulk_create:
+            rebuild_comment_signals([self.user.id])
+        self.assertIsNone(bulk_create.call_args.kwargs["unique_fields"])
+        self.assertTrue(bulk_create.call_args.kwargs["update_conflicts"])
+
+    def test_stored_signal_is_rebuilt_on_write_and_read_without_comment_bodies(self):
+        Team5Media.objects.create(media_id="y2", place_id="yazd-amir", title="Dolat Abad garden")
+        Team5MediaComment.objects.create(
+            user_id=self.user.id, media_id="y1", body="x" * 1000, sentiment_label="positive", sentiment_score=0.7
+        )
+        comment = Team5MediaComment.objects.create(
+            user_id=self.user.id, media_id="y2", body="Too crowded", sentiment_label="negative", sentiment_score=-0.6
+        )
+        rebuild_comment_signals([self.user.id])
+
+        with self.assertNumQueries(1, using="team5"):
+            signal = load_comment_signal(str(self.user.id))
+        self.assertEqual(signal["positive_media_ids"], {"y1"})
+        self.assertEqual(signal["negative_media_ids"], {"y2"})
+        self.assertEqual(len(signal["positive_comment_by_media"]["y1"]), SNIPPET_LENGTH)
+
+        with mock.patch("team5.views.comment_sentiment_worker"):
+            self.client.post(
+                f"/team5/api/media/{comment.media_id}/comments/",
+                data=json.dumps({"userId": str(self.user.id), "body": "Actually fine"}),
+                content_type="application/json",
+            )
+        self.assertEqual(load_comment_signal(str(self.user.id))["negative_media_ids"], set())
+
+
+class Team5HyperLogLogTests(SimpleTestCase):
+    def test_estimates_distinct_values_and_merges(self):
+        first, second = HyperLogLog(), HyperLogLog()
+        for value in range(20_000):
+            first.add(f"user-{value}")
+        for value in range(10_000, 30_000):
+            second.add(f"user-{value}")
+
+        self.assertAlmostEqual(first.count(), 20_000, delta=20_000 * 0.05)
+        union = HyperLogLog.union([first, second])
+        self.assertAlmostEqual(union.count(), 30_000, delta=30_000 * 0.05)
+        first.merge(second)
+        self.assertEqual(first.to_bytes(), union.to_bytes())
+        self.assertFalse(second.add("user-10000"))
+
+
+class Team5GeoIPTests(SimpleTestCase):
+    CSV = (
+        "ip_start,ip_end,city,country,latitude,longitude\n"
+        "5.160.0.0,5.160.255.255,Tehran,Iran,35.6892,51.389\n"
+        "2.176.0.0,2.176.127.255,Shiraz,Iran,29.5918,52.5837\n"
+        "2a01:5ec0::,2a01:5ec0:ffff:ffff:ffff:ffff:ffff:ffff,Isfahan,Iran,32.6546,51.668\n"
+        "ffff:ffff:ffff:ffff:8000::,ffff:ffff:ffff:ffff:ffff:ffff:ffff:ffff,Yazd,Iran,31.89,54.36\n"
+        "not-an-ip,,,,,\n"
+    )
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        csv_path = Path(self.tmp.name) / "ranges.csv"
+        csv_path.write_text(self.CSV, encoding="utf-8")
+        self.db_path = Path(self.tmp.name) / "geoip.bin"
+        self.stats = compile_geoip_csv(csv_path, self.db_path)
+        geo_cache.clear()
+        self.addCleanup(geo_cache.clear)
+
+    def test_compiled_table_answers_ipv4_and_ipv6_lookups(self):
+        self.assertEqual((self.stats["ipv4Ranges"], self.stats["ipv6Ranges"], self.stats["skippedRows"]), (2, 2, 1))
+        database = GeoIPDatabase.open(self.db_path)
+
+        self.assertEqual(database.lookup("5.160.10.20")["city"], "Tehran")
+        self.assertEqual(database.lookup("::ffff:5.160.0.1")["city"], "Tehran")
+        self.assertEqual(database.lookup("2a01:5ec0::42")["city"], "Isfahan")
+        self.assertEqual(database.lookup("ffff:ffff:ffff:ffff:ffff::1")["latitude"], 31.89)
+        self.assertIsNone(database.lookup("2.176.200.1"))
+        self.assertIsNone(database.lookup("8.8.8.8"))
+        self.assertIsNone(database.lookup("ffff:ffff:ffff:ffff:1::"))
+        self.assertIsNone(database.lookup("garbage"))
+
+    def test_resolve_client_city_uses_local_table_without_network(self):
+        cities = [{"cityId": "shiraz", "cityName": "Shiraz", "coordinates": [29.59, 52.58]}]
+        with override_settings(TEAM5_GEOIP_DATABASE=str(self.db_path)), mock.patch(
+            "urllib.request.urlopen", side_effect=AssertionError("network used")
+        ):
+            resolved = resolve_client_city(cities=cities, client_ip="2.176.1.1")
+        self.assertEqual(resolved["source"], "ip_city_name")
+        self.assertEqual(resolved["city"]["cityId"], "shiraz")
+
+        geo_cache.clear()
+        with override_settings(TEAM5_GEOIP_DATABASE=""):
+            self.assertIsNone(resolve_client_city(cities=cities, client_ip="2.176.1.1"))
+
+
+class Team5GeoCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store_path = Path(self.tmp.name) / "cache" / "geo.sqlite3"
+        self.calls = []
+
+    def _lookup(self, client_ip):
+        self.calls.append(client_ip)
+        return None if client_ip.startswith("8.") else {"city": "Tehran", "latitude": 35.7, "longitude": 51.4}
+
+    def test_results_are_shared_per_network_and_survive_restarts(self):
+        self.assertEqual(cache_key("5.160.10.20"), "5.160.10.0/24")
+        self.assertEqual(cache_key("2a01:5ec0:1:2::1"), "2a01:5ec0:1::/48")
+        self.assertEqual(cache_key("::ffff:5.6.7.8"), "5.6.7.0/24")
+        self.assertEqual(cache_key("::ffff:91.99.1.2"), "91.99.1.0/24")
+        self.assertIsNone(cache_key("localhost"))
+
+        cache = GeoLookupCache(store_path=self.store_path)
+        self.assertEqual(cache.get_or_lookup("5.160.10.20", self._lookup)["city"], "Tehran")
+        self.assertEqual(cache.get_or_lookup("5.160.10.99", self._lookup)["city"], "Tehran")
+        self.assertEqual(self.calls, ["5.160.10.20"])
+
+        restarted = GeoLookupCache(store_path=self.store_path)
+        self.assertEqual(restarted.get_or_lookup("5.160.10.1", self._lookup)["city"], "Tehran")
+        self.assertEqual(self.calls, ["5.160.10.20"])
+        self.assertEqual(restarted.stats()["storeHits"], 1)
+
+    def test_failed_lookups_use_the_negative_ttl(self):
+        cache = GeoLookupCache(ttl_seconds=3600, negative_ttl_seconds=60)
+        with mock.patch("team5.services.ttl_cache.time.monotonic", return_value=1000.0):
+            self.assertIsNone(cache.get_or_lookup("8.8.8.8", self._lookup))
+            self.assertIsNone(cache.get_or_lookup("8.8.8.4", self._lookup))
+            cache.get_or_lookup("5.160.0.1", self._lookup)
+        with mock.patch("team5.services.ttl_cache.time.monotonic", return_value=1100.0):
+            self.assertIsNone(cache.get_or_lookup("8.8.8.8", self._lookup))
+            cache.get_or_lookup("5.160.0.1", self._lookup)
+
+        self.assertEqual(self.calls, ["8.8.8.8", "5.160.0.1", "8.8.8.8"])
+        stats = cache.stats()
+        self.assertEqual((stats["lookups"], stats["negativeHits"], stats["hits"]), (3, 1, 2))
+
+
+class Team5SpatialIndexTests(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.places = [
+            {"placeId": f"p{index}", "coordinates": [rng.uniform(25.0, 40.0), rng.uniform(44.0, 63.0)]}
+            for index in range(300)
+        ]
+        self.places.append({"placeId": "no-coordinates", "coordinates": []})
+
+    def _brute_force(self, latitude, longitude):
+        distances = []
+        for place in self.places[:-1]:
+            lat, lon = map(math.radians, place["coordinates"])
+            a = (
+                math.sin((lat - math.radians(latitude)) / 2) ** 2
+                + math.cos(math.radians(latitude)) * math.cos(lat) * math.sin((lon - math.radians(longitude)) / 2) ** 2
+            )
+            distances.append((2 * 6371.0 * math.asin(math.sqrt(a)), place["placeId"]))
+        return sorted(distances)
+
+    def test_nearest_and_radius_queries_match_haversine_scan(self):
+        expected = self._brute_force(35.6892, 51.389)
+        for index in (SpatialIndex.from_records(self.places), self._scan_index()):
+            self.assertEqual(len(index), 300)
+            nearest = index.nearest(35.6892, 51.389, k=5)
+            self.assertEqual([place["placeId"] for place, _ in nearest], [place_id for _, place_id in expected[:5]])
+            self.assertAlmostEqual(nearest[0][1], expected[0][0], places=6)
+
+            within = index.within(35.6892, 51.389, 250.0)
+            self.assertEqual(
+                [place["placeId"] for place, _ in within],
+                [place_id for distance, place_id in expected if distance <= 250.0],
+            )
+            self.assertEqual(index.nearest(35.6892, 51.389, max_distance_km=expected[0][0] - 1), [])
+
+    def _scan_index(self):
+        with mock.patch("team5.services.spatial_index._build_tree", return_value=None):
+            return SpatialIndex.from_records(self.places)
+
+    def test_catalog_rebuilds_indexes_when_version_changes(self):
+        provider = mock.Mock()
+        provider.get_catalog_version.return_value = 1
+        provider.get_cities.return_value = [{"cityId": "tehran", "coordinates": [35.6892, 51.389]}]
+        provider.get_city_aliases.return_value = []
+        provider.get_all_places.return_value = []
+        provider.get_media.return_value = []
+        cache = CatalogCache(provider, lambda text: set(), version_check_seconds=0.0)
+
+        first = cache.get().city_index()
+        self.assertIs(cache.get().city_index(), first)
+
+        provider.get_catalog_version.return_value = 2
+        provider.get_cities.return_value.append({"cityId": "shiraz", "coordinates": [29.5918, 52.5837]})
+        rebuilt = cache.get().city_index()
+        self.assertIsNot(rebuilt, first)
+        self.assertEqual(rebuilt.nearest(29.6, 52.5)[0][0]["cityId"], "shiraz")
+
+    def test_catalog_version_is_checked_once_per_interval(self):
+        provider = mock.Mock()
+        provider.get_catalog_version.return_value = 1
+        for method in ("get_cities", "get_city_aliases", "get_all_places", "get_media"):
+            getattr(provider, method).return_value = []
+        cache = CatalogCache(provider, lambda text: set(), version_check_seconds=60.0)
+
+        first = cache.get()
+        self.assertIs(cache.get(), first)
+        self.assertIs(cache.get(), first)
+        self.assertEqual(provider.get_catalog_version.call_count, 1)
+
+        provider.get_catalog_version.return_value = 2
+        cache.invalidate()
+        self.assertIsNot(cache.get(), first)
+        self.assertEqual(provider.get_catalog_version.call_count, 2)
+
+
+class Team5CityResolverTests(SimpleTestCase):
+    CITIES = [
+        {"cityId": "isfahan", "cityName": "Isfahan", "coordinates": [32.6546, 51.668]},
+        {"cityId": "mashhad", "cityName": "Mashhad", "coordinates": [36.2605, 59.6168]},
+    ]
+
+    def test_names_are_normalized_across_scripts_and_spellings(self):
+        self.assertEqual(normalize_city_name("Eşfahān"), "esfahan")
+        self.assertEqual(normalize_city_name("مشهد‌مقدس"), normalize_city_name("مشهدمقدس"))
+        self.assertEqual(normalize_city_name("كرمان"), normalize_city_name("کرمان"))
+
+        resolver = CityResolver(
+            self.CITIES,
+            [
+                {"cityId": "isfahan", "alias": "اصفهان", "language": "fa"},
+                {"cityId": "isfahan", "alias": "Esfahan", "language": "en"},
+                {"cityId": "unknown", "alias": "Nowhere", "language": "en"},
+            ],
+        )
+        self.assertEqual(resolver.by_name("Eşfahān")["cityId"], "isfahan")
+        self.assertEqual(resolver.by_name("اصفهان")["cityId"], "isfahan")
+        self.assertEqual(resolver.by_name("mashhad")["cityId"], "mashhad")
+        self.assertIsNone(resolver.by_name("Nowhere"))
+        self.assertEqual(resolver.nearest(36.3, 59.5, max_distance_km=300)["cityId"], "mashhad")
+        self.assertIsNone(resolver.nearest(0.0, 0.0, max_distance_km=300))
+
+
+class Team5ServeCommandTests(SimpleTestCase):
+    def test_gunicorn_argv_uses_config_module_and_overrides(self):
+        argv = gunicorn_argv(bind="127.0.0.1:9000", workers=3, threads=2)
+
+        self.assertEqual(argv[1:5], ["-m", "gunicorn", "--config", str(GUNICORN_CONFIG)])
+        self.assertEqual(argv[5:], ["--bind", "127.0.0.1:9000", "--workers", "3", "--threads", "2"])
+        with self.assertRaises(CommandError):
+            gunicorn_argv(workers=0)
+
+    def test_gunicorn_config_reads_team5_settings(self):
+        with override_settings(TEAM5_GUNICORN_WORKERS=3, TEAM5_GUNICORN_THREADS=2, TEAM5_GUNICORN_PRELOAD=False):
+            config = runpy.run_path(str(GUNICORN_CONFIG))
+        self.assertEqual((config["workers"], config["threads"]), (3, 2))
+        self.assertEqual(config["wsgi_app"], "app404.wsgi:application")
+        self.assertFalse(config["preload_app"])
+        self.assertNotIn(PRELOAD_WARMUP_ENV, os.environ)
+
+        with override_settings(TEAM5_GUNICORN_WORKERS=0), mock.patch.dict(os.environ):
+            config = runpy.run_path(str(GUNICORN_CONFIG))
+            self.assertEqual(os.environ[PRELOAD_WARMUP_ENV], "1")
+        self.assertEqual(config["workers"], config["default_workers"]())
+        self.assertTrue(config["preload_app"])
+
+
+class Team5BatchWorkerPoolTests(SimpleTestCase):
+    def test_items_are_handed_over_in_batches(self):
+        batches = []
+        pool = BatchWorkerPool(batches.append, workers=1, batch_size=3, max_wait_seconds=0.5)
+        for item in range(7):
+            pool.submit(item)
+
+        self.assertTrue(pool.join(timeout=5))
+        self.assertEqual(sorted(item for batch in batches for item in batch), list(range(7)))
+        self.assertTrue(all(len(batch) <= 3 for batch in batches))
+        stats = pool.stats()
+        self.assertEqual(stats["processed"], 7)
+        self.assertEqual(stats["queued"], 0)
+        self.assertGreaterEqual(stats["maxQueued"], 1)
+        self.assertGreaterEqual(stats["maxFlushSeconds"], stats["avgFlushSeconds"])
+
+    def test_items_the_handler_drops_are_counted_separately(self):
+        pool = BatchWorkerPool(lambda batch: sum(1 for item in batch if item < 0), workers=1, batch_size=10)
+        for item in (1, -1, 2, 3):
+            pool.submit(item)
+
+        self.assertTrue(pool.join(timeout=5))
+        stats = pool.stats()
+        self.assertEqual((stats["processed"], stats["dropped"], stats["failed"]), (3, 1, 0))
+
+
+class Team5EvaluationHarnessTests(TestCase):
+    databases = {"default", "team5"}
+
+    @classmethod
+    def setUpTestData(cls):
+        Team5City.objects.create(city_id="isfahan", city_name="Isfahan", latitude=32.65, longitude=51.67)
+        Team5Place.objects.create(
+            place_id="isfahan-naqsh", city_id="isfahan", place_name="Naqsh-e Jahan", latitude=32.65, longitude=51.67
+        )
+        for idx in range(12):
+            Team5Media.objects.create(media_id=f"e{idx}", place_id="isfahan-naqsh", title=f"Naqsh-e Jahan square {idx}")
+        start = timezone.now() - timedelta(days=60)
+        for user_idx in range(8):
+            user_id = f"00000000-0000-0000-0000-0000000000{user_idx:02d}"
+            for offset in range(6):
+                rating = Team5MediaRating.objects.create(
+                    user_id=user_id, media_id=f"e{(user_idx + offset * 2) % 12}", rate=float(2 + (user_idx + offset) % 4)
+                )
+                Team5MediaRating.objects.filter(pk=rating.pk).update(
+                    created_at=start + timedelta(days=offset * 10, hours=user_idx)
+                )
+        feedback = Team5RecommendationFeedback.objects.create(
+            user_id="00000000-0000-0000-0000-000000000001", action="popular", liked=False, shown_media_ids=["e1"]
+        )
+        Team5RecommendationFeedback.objects.filter(pk=feedback.pk).update(created_at=start)
+
+    def test_report_covers_strategies_and_grid(self):
+        config = EvaluationConfig(folds=2, k=5, svd_grid={"n_factors": [5, 10], "n_epochs": [5]})
+        report = run_evaluation(load_evaluation_data(), config)
+
+        self.assertEqual(len(report["folds"]), 2)
+        self.assertEqual(set(report["strategies"]), {"svd", "popular", "similar", "hybrid"})
+        for metrics in report["strategies"].values():
+            for key in ("precision@5", "recall@5", "ndcg@5", "catalogCoverage", "latencyMsMean"):
+                self.assertIn(key, metrics)
+        self.assertIsNotNone(report["strategies"]["svd"]["rmse"])
+        self.assertEqual(len(report["svdGrid"]), 2)
+        self.assertIn(report["bestSvdParams"]["n_factors"], (5, 10))
+
+    def test_management_command_writes_json_report_with_process_pool(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / "report.json"
+            call_command(
+                "team5_evaluate_recommenders",
+                folds=2,
+                k=5,
+                workers=2,
+                n_factors="5,8",
+                n_epochs="5",
+                output=str(output),
+                stdout=mock.MagicMock(),
+            )
+            report = json.loads(output.read_text(encoding="utf-8"))
+        self.assertEqual(report["config"]["workers"], 2)
+        self.assertIn("hybrid", report["strategies"])
@@ -1,23 +1,36 @@
 import json
 import hashlib
+import math
+from functools import partial
 from uuid import UUID
 from typing import List, Dict, Set, Optional, Any
 
+from django.conf import settings
 from django.http import JsonResponse, HttpRequest
 from django.shortcuts import render
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_GET, require_POST
 from django.contrib.auth import get_user_model
-from django.utils import timezone
 
 from core.auth import api_login_required
-from .models import Team5MediaComment, Team5RecommendationFeedback
+from core.principal_cache import principal_cache
+from .models import Team5Media, Team5MediaComment, Team5RecommendationFeedback
 from .serializers import Team5Serializer
+from .services.batch_worker import BatchWorkerPool
+from .services.comment_sentiment import comment_batch_handler
+from .services.comment_signals import rebuild_comment_signals
 from .services.contracts import DEFAULT_LIMIT
 from .services.db_provider import DatabaseProvider
-from .services.location_service import get_client_ip, resolve_client_city
+from .services.feedback_store import (
+    load_excluded_media_ids,
+    record_feedback,
+    summarize_ab_feedback,
+    write_feedback_batch,
+)
+from .services.location_service import geo_cache, get_client_ip, resolve_client_city
 from .services.occasions_catalog import ensure_occasion_media_seeded
-from .services.recommendation_service import RecommendationService
+from .services.recommendation_service import DEFAULT_NEARBY_RADIUS_KM, RecommendationService
+from .services.warmup import persist_models, start_warmup, warmup_state
 
 # --- Configuration & Constants ---
 TEAM_NAME = "team5"
@@ -26,12 +39,30 @@ User = get_user_model()
 # Dependency Injection
 provider = DatabaseProvider()
 recommendation_service = RecommendationService(provider)
+comment_sentiment_worker = BatchWorkerPool(
+    comment_batch_handler(recommendation_service.invalidate_comment_signals),
+    workers=getattr(settings, "TEAM5_COMMENT_SENTIMENT_WORKERS", 2),
+    name="team5-comment-sentiment",
+)
+# Single writer thread: the team5 database is write-bound, so batches are serialized and bulk-inserted.
+feedback_writer = BatchWorkerPool(
+    partial(write_feedback_batch, batch_size=getattr(settings, "TEAM5_FEEDBACK_BATCH_SIZE", 200)),
+    workers=1,
+    batch_size=getattr(settings, "TEAM5_FEEDBACK_BATCH_SIZE", 200),
+    max_wait_seconds=getattr(settings, "TEAM5_FEEDBACK_FLUSH_SECONDS", 1.0),
+    name="team5-feedback-writer",
+    shutdown_timeout=getattr(settings, "TEAM5_FEEDBACK_SHUTDOWN_SECONDS", 10.0),
+)
 
 # A/B Testing Constants
-FEEDBACK_ACTIONS = {"popular", "personalized", "nearest", "weather", "occasions", "random", "click", "view", "like",
-                    "dislike"}
-AB_ALLOWED_STRATEGIES = {"personalized", "popular", "nearest", "weather", "occasions", "random"}
+FEEDBACK_ACTIONS = {"popular", "personalized", "nearest", "nearby", "weather", "occasions", "random", "als", "click",
+                    "view", "like", "dislike"}
+AB_ALLOWED_STRATEGIES = {"personalized", "popular", "nearest", "weather", "occasions", "random", "als"}
 AB_ALLOWED_GROUPS = {"A", "B"}
+MAX_COMMENT_LENGTH = 2000
+MAX_FEEDBACK_BATCH_EVENTS = 500
+MAX_FEEDBACK_ACTION_LENGTH = 32
+MAX_NEARBY_RADIUS_KM = 200.0
 
 
 # --- Section 1: General & Utility Views ---
@@ -69,6 +100,14 @@ def get_media(request: HttpRequest):
     return JsonResponse(feed)
 
 
+@csrf_exempt
+def media_comments(request: HttpRequest, media_id: str):
+    """GET lists the comments of a media item, POST adds or replaces the caller's comment."""
+    if request.method == "POST":
+        return submit_media_comment(request, media_id)
+    return get_media_comments(request, media_id)
+
+
 @require_GET
 def get_media_comments(request: HttpRequest, media_id: str):
     """
@@ -78,7 +117,7 @@ def get_media_comments(request: HttpRequest, media_id: str):
     comments = list(
         Team5MediaComment.objects.filter(media_id=str(media_id))
         .order_by("-created_at")
-        .only("user_id", "user_email", "body", "sentiment_label", "sentiment_score", "created_at")
+        .only("user_id", "user_email", "body", "sentiment_label", "sentiment_score", "sentiment_pending", "created_at")
     )
 
     if not comments:
@@ -112,12 +151,66 @@ def get_media_comments(request: HttpRequest, media_id: str):
             "body": comment.body,
             "sentimentLabel": comment.sentiment_label,
             "sentimentScore": round(float(comment.sentiment_score), 3),
+            "sentimentPending": comment.sentiment_pending,
             "createdAt": comment.created_at.isoformat(),
         })
 
     return JsonResponse({"mediaId": media_id, "count": len(payload), "items": payload})
 
 
+@csrf_exempt
+@require_POST
+@api_login_required
+def submit_media_comment(request: HttpRequest, media_id: str):
+    """
+    Stores the caller's comment right away as neutral; the sentiment worker scores
+    it in the background and refreshes the user's comment signal afterwards.
+    """
+    try:
+        payload = json.loads(request.body or "{}")
+    except json.JSONDecodeError as e:
+        return JsonResponse({"detail": str(e)}, status=400)
+
+    user_uuid = request.user.id
+    if payload.get("userId") not in (None, "") and _parse_uuid(payload.get("userId")) != user_uuid:
+        return JsonResponse({"detail": "Comments can only be posted as the authenticated user."}, status=403)
+    body = str(payload.get("body") or "").strip()
+    if not body:
+        return JsonResponse({"detail": "Invalid payload: body is required."}, status=400)
+    if len(body) > MAX_COMMENT_LENGTH:
+        return JsonResponse({"detail": f"Comment body is limited to {MAX_COMMENT_LENGTH} characters."}, status=400)
+    if not Team5Media.objects.filter(media_id=str(media_id)).exists():
+        return JsonResponse({"detail": "Media not found."}, status=404)
+    user_email = request.user.email or ""
+
+    comment, created = Team5MediaComment.objects.update_or_create(
+        user_id=user_uuid,
+        media_id=str(media_id),
+        defaults={
+            "body": body,
+            "user_email": user_email,
+            "sentiment_label": "neutral",
+            "sentiment_score": 0.0,
+            "sentiment_pending": True,
+        },
+    )
+    # The old label no longer counts towards the user's signal; the worker refreshes it once scored.
+    rebuild_comment_signals([user_uuid])
+    recommendation_service.invalidate_comment_signals([str(user_uuid)])
+    comment_sentiment_worker.submit(comment.id)
+
+    return JsonResponse(
+        {
+            "mediaId": str(media_id),
+            "userId": str(user_uuid),
+            "created": created,
+            "sentimentLabel": comment.sentiment_label,
+            "sentimentPending": True,
+        },
+        status=202,
+    )
+
+
 # --- Section 3: Specific Strategy Endpoints ---
 
 @require_GET
@@ -166,10 +259,12 @@ def get_nearest_recommendations(request: HttpRequest):
     excluded = _load_excluded_media_ids(user_id=user_id, action="nearest")
 
     client_ip = get_client_ip(request, ip_override=request.GET.get("ip"))
+    catalog = recommendation_service.get_catalog()
     resolved = resolve_client_city(
-        cities=provider.get_cities(),
+        cities=catalog.cities,
         client_ip=client_ip,
-        preferred_city_id=request.GET.get("cityId")
+        preferred_city_id=request.GET.get("cityId"),
+        city_resolver=catalog.city_resolver(),
     )
 
     if not resolved:
@@ -189,6 +284,31 @@ def get_nearest_recommendations(request: HttpRequest):
     return JsonResponse(Team5Serializer.serialize_nearest(items, resolved, client_ip, limit, user_id))
 
 
+@require_GET
+def get_nearby_recommendations(request: HttpRequest):
+    latitude = _parse_float_param(request, "lat")
+    longitude = _parse_float_param(request, "lon")
+    if latitude is None or longitude is None or not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return JsonResponse({"detail": "lat and lon query params are required coordinates"}, status=400)
+    radius_km = _parse_float_param(request, "radiusKm")
+    if radius_km is None:
+        radius_km = DEFAULT_NEARBY_RADIUS_KM
+    if not 0 < radius_km <= MAX_NEARBY_RADIUS_KM:
+        return JsonResponse({"detail": f"radiusKm must be in (0, {MAX_NEARBY_RADIUS_KM:g}]"}, status=400)
+
+    limit = _parse_limit(request)
+    user_id = request.GET.get("userId")
+    items = recommendation_service.get_nearby(
+        latitude,
+        longitude,
+        radius_km=radius_km,
+        limit=limit,
+        user_id=user_id,
+        excluded_media_ids=_load_excluded_media_ids(user_id=user_id, action="nearby"),
+    )
+    return JsonResponse(Team5Serializer.serialize_nearby(items, latitude, longitude, radius_km, limit, user_id))
+
+
 @require_GET
 def get_personalized_recommendations(request: HttpRequest):
     limit = _parse_limit(request)
@@ -324,50 +444,60 @@ def submit_recommendation_feedback(request: HttpRequest):
     """
     try:
         payload = json.loads(request.body or "{}")
-
-        # Determine User ID
-        fallback_user_id = str(request.user.id) if getattr(request.user, "is_authenticated", False) else None
-        user_uuid = _parse_uuid(payload.get("userId")) or _parse_uuid(fallback_user_id)
-
-        action = str(payload.get("action") or "").strip().lower()
-        liked = payload.get("liked")
-
-        # Validate
-        if not user_uuid or not isinstance(liked, bool):
-            raise ValueError("Invalid payload: userId and liked status are required.")
-        if action not in FEEDBACK_ACTIONS and "action" in payload:
-            # Relaxed check: if action is missing/wrong, we might still want to log,
-            # but keeping strict for now as per previous logic.
-            pass
-
-            # A/B Logic
-        ab_version = _normalize_ab_version(payload.get("version"))
-        assigned_group = _resolve_ab_group(user_id=str(user_uuid), requested_version=ab_version)
-
-        # Parse Shown Media IDs uniquely
-        shown_ids = list(dict.fromkeys([
-            str(m).strip() for m in payload.get("shownMediaIds", []) if str(m).strip()
-        ]))
-
-        Team5RecommendationFeedback.objects.using("team5").create(
-            user_id=user_uuid,
-            action=action,
-            liked=liked,
-            shown_media_ids=shown_ids
-        )
+        fields, ab_version = _parse_feedback_event(payload, fallback_user_id=_request_user_id(request))
+        record_feedback(**fields)
 
         return JsonResponse({
             "ok": True,
-            "detail": f"Feedback successfully saved for version {assigned_group}",
+            "detail": f"Feedback successfully saved for version {fields['ab_group']}",
             "abTest": {
                 "requestedVersion": ab_version,
-                "assignedGroup": assigned_group,
+                "assignedGroup": fields["ab_group"],
             },
         })
     except (json.JSONDecodeError, ValueError) as e:
         return JsonResponse({"detail": str(e)}, status=400)
 
 
+@csrf_exempt
+@require_POST
+def submit_recommendation_feedback_batch(request: HttpRequest):
+    """
+    Accepts {"events": [...]} of feedback payloads and queues the valid ones for a
+    bulk insert; invalid events are reported back by index and dropped.
+    """
+    try:
+        payload = json.loads(request.body or "{}")
+    except json.JSONDecodeError as e:
+        return JsonResponse({"detail": str(e)}, status=400)
+
+    events = payload.get("events") if isinstance(payload, dict) else None
+    if not isinstance(events, list) or not events:
+        return JsonResponse({"detail": "Invalid payload: events must be a non-empty list."}, status=400)
+    if len(events) > MAX_FEEDBACK_BATCH_EVENTS:
+        return JsonResponse({"detail": f"At most {MAX_FEEDBACK_BATCH_EVENTS} events per batch."}, status=400)
+
+    fallback_user_id = _request_user_id(request)
+    rejected = []
+    for index, event in enumerate(events):
+        try:
+            if not isinstance(event, dict):
+                raise ValueError("Event must be an object.")
+            fields, _ = _parse_feedback_event(event, fallback_user_id=fallback_user_id)
+        except ValueError as e:
+            rejected.append({"index": index, "detail": str(e)})
+            continue
+        feedback_writer.submit(Team5RecommendationFeedback(**fields))
+
+    return JsonResponse({"ok": True, "accepted": len(events) - len(rejected), "rejected": rejected}, status=202)
+
+
+@require_GET
+def feedback_metrics(request: HttpRequest):
+    """Queue depth and flush latency of the buffered feedback writer in this worker."""
+    return JsonResponse(feedback_writer.stats())
+
+
 @require_GET
 def get_ab_test_summary(request: HttpRequest):
     """
@@ -380,73 +510,9 @@ def get_ab_test_summary(request: HttpRequest):
     except (TypeError, ValueError):
         days = 30
 
-    since = timezone.now() - timezone.timedelta(days=days)
-
-    feedback_qs = Team5RecommendationFeedback.objects.using("team5").filter(
-        created_at__gte=since
-    ).only("user_id", "action", "liked", "created_at")
-
-    if action_filter:
-        feedback_qs = feedback_qs.filter(action=action_filter)
-
-    # Use iterator for memory efficiency
-    rows = feedback_qs.iterator()
-
-    summary = {
-        "A": {"impressions": 0, "likes": 0, "dislikes": 0, "users": set()},
-        "B": {"impressions": 0, "likes": 0, "dislikes": 0, "users": set()},
-    }
-    by_action: dict = {}
-
-    for row in rows:
-        user_id_str = str(row.user_id)
-        group = _resolve_ab_group(user_id=user_id_str, requested_version="AUTO")
-        action = str(row.action or "").strip().lower() or "unknown"
-        liked_int = 1 if row.liked else 0
-
-        # Update Main Summary
-        bucket = summary[group]
-        bucket["impressions"] += 1
-        bucket["likes"] += liked_int
-        bucket["dislikes"] += 0 if row.liked else 1
-        bucket["users"].add(user_id_str)
-
-        # Update By-Action Summary
-        if action not in by_action:
-            by_action[action] = {
-                "A": {"impressions": 0, "likes": 0, "likeRate": 0.0},
-                "B": {"impressions": 0, "likes": 0, "likeRate": 0.0},
-            }
-
-        action_bucket = by_action[action][group]
-        action_bucket["impressions"] += 1
-        action_bucket["likes"] += liked_int
-
-    def _finalize_group_stats(data: dict) -> dict:
-        impressions = int(data["impressions"])
-        likes = int(data["likes"])
-        dislikes = int(data["dislikes"])
-        users_count = len(data["users"])
-        like_rate = round((likes / impressions) * 100, 2) if impressions else 0.0
-
-        return {
-            "impressions": impressions,
-            "likes": likes,
-            "dislikes": dislikes,
-            "uniqueUsers": users_count,
-            "likeRatePercent": like_rate,
-        }
-
-    group_a = _finalize_group_stats(summary["A"])
-    group_b = _finalize_group_stats(summary["B"])
-
-    # Finalize per-action stats
-    for action_data in by_action.values():
-        for group in ("A", "B"):
-            g_data = action_data[group]
-            imp = int(g_data["impressions"])
-            likes = int(g_data["likes"])
-            g_data["likeRate"] = round((likes / imp) * 100, 2) if imp else 0.0
+    summary = summarize_ab_feedback(days=days, action=action_filter or None)
+    group_a = summary["groups"]["A"]
+    group_b = summary["groups"]["B"]
 
     return JsonResponse({
         "status": "success",
@@ -454,7 +520,7 @@ def get_ab_test_summary(request: HttpRequest):
         "appliedActionFilter": action_filter or None,
         "groups": {"A": group_a, "B": group_b},
         "deltaLikeRatePercent": round(group_b["likeRatePercent"] - group_a["likeRatePercent"], 2),
-        "byAction": by_action,
+        "byAction": summary["byAction"],
     })
 
 
@@ -481,7 +547,31 @@ def get_user_ratings(request: HttpRequest, user_id: str):
 @csrf_exempt
 @require_POST
 def train(request: HttpRequest):
-    return JsonResponse({"trained": bool(recommendation_service.train())})
+    trained = bool(recommendation_service.train())
+    if trained:
+        persist_models(recommendation_service)
+    return JsonResponse({"trained": trained})
+
+
+@require_GET
+def ready(request: HttpRequest):
+    """Readiness probe: 200 once this worker is warm, 503 (and warmup kicked off) before that."""
+    if warmup_state.status in (warmup_state.COLD, warmup_state.FAILED):
+        start_warmup(recommendation_service)
+    return JsonResponse(warmup_state.as_dict(), status=200 if warmup_state.ready else 503)
+
+
+@require_GET
+def metrics(request: HttpRequest):
+    """Counters of the in-process caches and background writers of this worker."""
+    return JsonResponse({
+        "geoCache": geo_cache.stats(),
+        "principalCache": principal_cache.stats(),
+        "commentSignalCache": recommendation_service.comment_signal_cache.stats(),
+        "nearbyCellCache": recommendation_service.nearby_cell_cache.stats(),
+        "feedbackWriter": feedback_writer.stats(),
+        "commentSentimentWorker": comment_sentiment_worker.stats(),
+    })
 
 
 @require_GET
@@ -498,6 +588,14 @@ def _parse_limit(request: HttpRequest) -> int:
         return DEFAULT_LIMIT
 
 
+def _parse_float_param(request: HttpRequest, name: str) -> Optional[float]:
+    try:
+        value = float(request.GET.get(name, ""))
+    except (ValueError, TypeError):
+        return None
+    return value if math.isfinite(value) else None
+
+
 def _parse_uuid(value: Optional[str]) -> Optional[UUID]:
     try:
         return UUID(str(value)) if value else None
@@ -510,17 +608,42 @@ def _load_excluded_media_ids(*, user_id: Optional[str], action: str) -> Set[str]
     if not user_uuid:
         return set()
 
-    # Check only the most recent feedback to avoid staleness
-    latest = Team5RecommendationFeedback.objects.filter(
-        user_id=user_uuid, action=action
-    ).order_by("-created_at", "-id").first()
+    # Only the most recent feedback per (user, action) counts; the write path keeps it precomputed.
+    return load_excluded_media_ids(user_id=user_uuid, action=action)
+
+
+def _request_user_id(request: HttpRequest) -> Optional[str]:
+    return str(request.user.id) if getattr(request.user, "is_authenticated", False) else None
 
-    # If the user liked the last batch, we generally don't exclude them (let them see it again),
-    # unless logic dictates otherwise. Here we strictly follow existing logic.
-    if not latest or latest.liked:
-        return set()
 
-    return {str(m).strip() for m in latest.shown_media_ids or [] if str(m).strip()}
+def _parse_feedback_event(payload: Dict, *, fallback_user_id: Optional[str]) -> tuple[Dict, str]:
+    """Validate one feedback payload; returns the model fields and the requested A/B version."""
+    user_uuid = _parse_uuid(payload.get("userId")) or _parse_uuid(fallback_user_id)
+    action = str(payload.get("action") or "").strip().lower()
+    liked = payload.get("liked")
+
+    if not user_uuid or not isinstance(liked, bool):
+        raise ValueError("Invalid payload: userId and liked status are required.")
+    if len(action) > MAX_FEEDBACK_ACTION_LENGTH:
+        raise ValueError(f"Invalid payload: action is limited to {MAX_FEEDBACK_ACTION_LENGTH} characters.")
+    shown_media_ids = payload.get("shownMediaIds", [])
+    if not isinstance(shown_media_ids, list):
+        raise ValueError("Invalid payload: shownMediaIds must be a list.")
+
+    # A/B Logic
+    ab_version = _normalize_ab_version(payload.get("version"))
+    assigned_group = _resolve_ab_group(user_id=str(user_uuid), requested_version=ab_version)
+
+    # Parse Shown Media IDs uniquely
+    shown_ids = list(dict.fromkeys([str(m).strip() for m in shown_media_ids if str(m).strip()]))
+    fields = {
+        "user_id": user_uuid,
+        "action": action,
+        "liked": liked,
+        "shown_media_ids": shown_ids,
+        "ab_group": assigned_group,
+    }
+    return fields, ab_version
 
 
 def _normalize_ab_version(raw_value: Any) -> str:
@@ -563,6 +686,13 @@ def _get_items_for_strategy(
         return recommendation_service.get_random(
             limit=limit, user_id=user_id, excluded_media_ids=excluded_media_ids
         )
+    elif strategy == "als":
+        items = recommendation_service.get_als(
+            user_id=user_id, limit=limit, excluded_media_ids=excluded_media_ids
+        )
+        if items:
+            return items
+        return recommendation_service.get_popular(limit=limit, excluded_media_ids=excluded_media_ids)
 
     # Default fallback
     items = recommendation_service.get_personalized(